@@ -1,6 +1,7 @@
 __all__ = ["Result", "Watchdog"]
 
 import os
+import tempfile
 from typing import List, Dict, Any, Optional, Literal, Union
 from dbacademy.clients.databricks import DBAcademyRestClient
 
@@ -54,6 +55,7 @@ class Watchdog:
         from dbacademy.clients.databricks import accounts
 
         self.__results: List[Result] = list()
+        self.api_metrics = None
 
         self.__workspace_client: Optional[DBAcademyRestClient] = None
         self.__workspace: Optional[Dict[str, Any]] = None
@@ -65,6 +67,12 @@ class Watchdog:
                                                       username=self.username,
                                                       password=self.password)
 
+        # Each run re-lists only what its snapshot is too old to vouch for, see InventoryKind.max_age_seconds
+        from dbacademy.clients.databricks.inventory import FleetInventory, InventoryKind, DEFAULT_KINDS
+        kinds = dict(DEFAULT_KINDS)
+        kinds["mlflow_endpoints"] = InventoryKind("mlflow_endpoints", id_field="registered_model_name", fetch=lambda client: client.ml.mlflow_endpoints.list(), max_age_seconds=15 * 60)
+        self.inventory = FleetInventory(os.environ.get("WATCHDOG_INVENTORY_PATH", os.path.join(tempfile.gettempdir(), "dbacademy-watchdog-inventory.sqlite")), kinds=kinds)
+
     @property
     def username(self) -> str:
         return self.__username
@@ -87,20 +95,24 @@ class Watchdog:
 
     @property
     def workspace_domain(self) -> str:
-        if self.workspace_name == "survey-dashboards":
-            return "training-surveys"
-        elif self.workspace_name == "trainers":
-            return "training"
-        else:
-            return f"training-{self.workspace_name}"
+        return self.__domain_of(self.workspace_name)
 
     @property
     def workspace_endpoint(self) -> str:
         return f"https://{self.workspace_domain}.cloud.databricks.com"
 
+    @staticmethod
+    def __domain_of(workspace_name: str) -> str:
+        if workspace_name == "survey-dashboards":
+            return "training-surveys"
+        elif workspace_name == "trainers":
+            return "training"
+        else:
+            return f"training-{workspace_name}"
+
     def __analyse_serving_endpoints(self):
-        modern_endpoints = self.workspace_client.serving_endpoints.list()
-        mlflow_endpoints = self.workspace_client.ml.mlflow_endpoints.list()
+        modern_endpoints = self.inventory.resources("serving_endpoints", self.workspace_name)
+        mlflow_endpoints = self.inventory.resources("mlflow_endpoints", self.workspace_name)
         if len(modern_endpoints) > 0 or len(mlflow_endpoints) > 0:
             self.__log_error(f"Serving Endpoints: {len(modern_endpoints)} ({len(mlflow_endpoints)})", "ML-SERVING-RUNNING")
 
@@ -108,7 +120,8 @@ class Watchdog:
         from datetime import datetime
 
         max_hours = 4
-        jobs = self.workspace_client.jobs.list(expand_tasks=True)
+        jobs = self.inventory.resources("jobs", self.workspace_name)
+        paused = False
 
         for job in jobs:
             job_id = job.get("job_id")
@@ -168,16 +181,19 @@ class Watchdog:
 
             if schedule_failure is not None and _pause:
                 message += f"\n  | Paused schedule."
+                paused = True
                 self.workspace_client.jobs.update_schedule(_job_id=job_id,
                                                            _paused=True,
                                                            _quartz_cron_expression=None,
                                                            _timezone_id=None)
             if continuous_failure is not None and _pause:
                 message += f"\n  | Paused continuous."
+                paused = True
                 self.workspace_client.jobs.update_continuous(_job_id=job_id, _paused=True)
 
             if trigger_paused is not None and _pause:
                 message += f"\n  | Paused trigger."
+                paused = True
                 self.workspace_client.jobs.update_trigger(_job_id=job_id,
                                                           _paused=True,
                                                           _url=None,
@@ -187,11 +203,14 @@ class Watchdog:
             if failed:
                 self.__log_error(message, _scope="JOBS", _failures=failures)
 
+        if paused:
+            self.inventory.invalidate(self.workspace_name, "jobs")
+
     def __analyse_clusters(self, _terminate: bool):
         from datetime import datetime
         from dbacademy.dbhelper import dbh_constants
 
-        clusters = [c for c in self.workspace_client.clusters.list() if c.get("state") not in ["TERMINATED"]]
+        clusters = [c for c in self.inventory.resources("clusters", self.workspace_name) if c.get("state") not in ["TERMINATED"]]
         if len(clusters) > 0:
             for cluster in clusters:
                 cluster_name = cluster.get("cluster_name")
@@ -203,7 +222,7 @@ class Watchdog:
                 num_workers = cluster.get("num_workers")
                 cluster_source = cluster.get("cluster_source")
                 policy_id = cluster.get("policy_id")
-                policy = None if policy_id is None else self.workspace_client.cluster_policies.get_by_id(policy_id)
+                policy = None if policy_id is None else self.inventory.get(self.workspace_name, "cluster_policies", policy_id)
                 policy_name = None if policy is None else policy.get("name")
 
                 restarted_time_ep = cluster.get("last_restarted_time") / 1000
@@ -252,7 +271,7 @@ class Watchdog:
         import copy
 
         found_users = copy.deepcopy(_found_users)
-        users = self.workspace_client.scim.users.list()
+        users = self.inventory.resources("users", self.workspace_name)
 
         for user in users:
             username = user.get("userName")
@@ -272,9 +291,11 @@ class Watchdog:
                 admins = self.workspace_client.scim.groups.get_by_name("admins")
                 admin_id = admins.get("id")
                 self.workspace_client.scim.groups.add_member(admin_id, user_id)
+                self.inventory.invalidate(self.workspace_name, "users")
 
     def __analyse_workspace(self, *,
                             _workspace: Dict[str, Any],
+                            _workspace_client: DBAcademyRestClient,
                             _analyse_users: bool,
                             _analyse_serving_endpoints: bool,
                             _analyse_workflows: bool,
@@ -282,9 +303,8 @@ class Watchdog:
                             _analyse_clusters: bool,
                             _terminate_clusters: bool):
 
-        from dbacademy.clients import databricks
         self.__workspace = _workspace
-        self.__workspace_client = databricks.from_args(endpoint=self.workspace_endpoint, username=self.__username, password=self.__password)
+        self.__workspace_client = _workspace_client
 
         workspace_name = _workspace.get("workspace_name")
         print(f"* Processing workspace {workspace_name}")
@@ -334,19 +354,47 @@ class Watchdog:
         print(result)
 
     def analyse(self) -> None:
+        from dbacademy.clients.rest.instrumentation import ApiMetrics
+
+        with ApiMetrics() as self.api_metrics:
+            self.__analyse()
+
+        print("REST API calls by total wall-clock time:")
+        self.api_metrics.print_summary()
+
+    def __analyse(self) -> None:
         print()
 
+        from dbacademy.clients import databricks
+
         count = 0
         workspaces = self.accounts_client.workspaces.list()
         workspace_filter = None  # ["classroom-868-83vgw"]
 
+        clients: Dict[str, DBAcademyRestClient] = dict()
+        for workspace in workspaces:
+            workspace_name = workspace.get("workspace_name")
+            if not workspace_filter or workspace_name in workspace_filter:
+                endpoint = f"https://{self.__domain_of(workspace_name)}.cloud.databricks.com"
+                clients[workspace_name] = databricks.from_args(endpoint=endpoint, username=self.__username, password=self.__password)
+
+        # Bring the snapshot of every workspace up to date at once, the analyses below then read it without REST calls.
+        refreshed = self.inventory.refresh_fleet(clients.items())
+        failed = {r.workspace: r.error for r in refreshed if r.error is not None}
+        listed = [r for r in refreshed if r.error is None and not r.skipped]
+        print(f"Refreshed the inventory of {len(clients)} workspaces: {len(listed)} listings, {sum(r.added + r.changed + r.removed for r in listed)} resources changed.")
+
         for workspace in workspaces:
             count += 1
             workspace_name = workspace.get("workspace_name")
             if workspace_filter and workspace_name not in workspace_filter:
                 continue
+            elif workspace_name in failed:
+                print(f"* Skipping workspace {workspace_name}: {failed.get(workspace_name)}")
+                continue
 
             self.__analyse_workspace(_workspace=workspace,
+                                     _workspace_client=clients.get(workspace_name),
                                      _analyse_users=True,
                                      _analyse_serving_endpoints=True,
                                      _analyse_workflows=True,
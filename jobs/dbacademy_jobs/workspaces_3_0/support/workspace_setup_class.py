@@ -1,8 +1,12 @@
+import threading
 from typing import List, Optional, Callable, Dict, Any
 
 from dbacademy.dbhelper import dbh_constants
+from dbacademy.clients.airtable.record_cache import RecordCache
 from dbacademy.clients import databricks
 from dbacademy.clients.rest.common import DatabricksApiException
+from dbacademy.clients.rest.instrumentation import ApiMetrics
+from dbacademy.common.task_graph_class import TaskGraph, TaskResult
 from dbacademy_jobs.workspaces_3_0.support.workspace_config_classe import WorkspaceConfig
 
 
@@ -93,7 +97,11 @@ class WorkspaceSetup:
         # self.__accounts_api.dns_retry = True
         self.__run_workspace_setup = run_workspace_setup
 
-        self.__air_table_records: List[Dict[str, Any]] = list()
+        # The workspaces already recorded in Airtable, by URL, and the fields of those to record once setup completes.
+        self.__air_table_records: Optional[RecordCache] = None
+        self.__new_air_table_records: Dict[str, Dict[str, Any]] = dict()
+        self.__new_air_table_records_lock = threading.Lock()
+        self.api_metrics: Optional[ApiMetrics] = None
 
         self.airtable_client = airtable.from_environment(base_id="appNCMjJ2yMKUrTbo")
         self.airtable_table = self.airtable_client.table("tblF3cxlP8gcM9Rqr")
@@ -118,23 +126,6 @@ class WorkspaceSetup:
     def account_config(self) -> AccountConfig:
         return self.__account_config
 
-    @classmethod
-    def __for_each_workspace(cls, workspaces: List[WorkspaceTrio], some_action: Callable[[WorkspaceTrio], None]) -> None:
-        from multiprocessing.pool import ThreadPool
-        from dbacademy.clients.dougrest.accounts import workspaces as statuses
-
-        failed_workspaces = [w for w in workspaces if w.workspace_api.get("workspace_status") != statuses.STATUS_RUNNING]
-        running_workspaces = [w for w in workspaces if w.workspace_api.get("workspace_status") == statuses.STATUS_RUNNING]
-
-        count_running_workspaces = len(running_workspaces)
-        count_failed_workspaces = len(failed_workspaces)
-        count_workspaces = len(workspaces)
-
-        assert count_running_workspaces + count_failed_workspaces == count_workspaces, f"The count of failed ({count_failed_workspaces}) & running ({count_running_workspaces}) workspaces does not equal the total number of workspaces, {count_workspaces}."
-
-        with ThreadPool(len(running_workspaces)) as pool:
-            pool.map(some_action, running_workspaces)
-
     @classmethod
     def __get_metastore(cls, workspace_api: Workspace, workspace_name: str) -> Optional[Dict[str, Any]]:
 
@@ -279,9 +270,30 @@ class WorkspaceSetup:
             self.__remove_metastore(trio)
             self.__delete_workspace(trio)
 
-    def create_workspaces(self, *, remove_users: bool, remove_metastore: bool, uninstall_courseware: bool = False):
+    def create_workspaces(self, *, remove_users: bool, remove_metastore: bool, uninstall_courseware: bool = False, max_workers: int = 32, max_attempts: int = 3, state_file: str = None):
+        """
+        Creates and configures every workspace, each advancing through its own setup tasks independently of the others.
+
+        Args:
+            remove_users: Remove all users before adding the configured ones.
+            remove_metastore: Delete each workspace's metastore before configuring it.
+            uninstall_courseware: Remove all courseware before installing it.
+            max_workers: The maximum number of setup tasks run concurrently across all workspaces.
+            max_attempts: The number of times each idempotent setup task is attempted before it is considered to have failed.
+            state_file: A JSON file recording completed tasks; re-running with the same file skips them.
+        """
+        with ApiMetrics() as self.api_metrics:
+            self.__create_workspaces(remove_users=remove_users, remove_metastore=remove_metastore, uninstall_courseware=uninstall_courseware, max_workers=max_workers, max_attempts=max_attempts, state_file=state_file)
 
-        self.__air_table_records = self.airtable_table.query()
+        print("-"*100)
+        print("REST API calls by total wall-clock time:")
+        self.api_metrics.print_summary()
+
+    def __create_workspaces(self, *, remove_users: bool, remove_metastore: bool, uninstall_courseware: bool, max_workers: int, max_attempts: int, state_file: Optional[str]):
+
+        self.__air_table_records = self.airtable_table.cache(key_field="AWS Workspace URL")
+        self.__air_table_records.refresh()
+        self.__new_air_table_records.clear()
 
         naming_pattern = self.account_config.workspace_config_template.workspace_name_pattern
         not_using_classroom = not naming_pattern.startswith("classroom-")
@@ -311,90 +323,34 @@ class WorkspaceSetup:
             print(workspace_config.name)
 
         #############################################################
-        from multiprocessing.pool import ThreadPool
+        from dbacademy.common import FleetExecutor
         print("-"*100)
         print("Initializing REST APIs.")
 
         # Should be empty, reset anyway
         self.__workspaces: List[WorkspaceTrio] = list()
 
-        with ThreadPool(len(self.account_config.workspaces)) as pool:
-            pool.map(self.__create_workspace, self.account_config.workspaces)
-
-        #############################################################
-        # Workspaces were all created synchronously, blocking here until we confirm that all workspaces are created.
-        for workspace in self.__workspaces:
-            print(f"""Waiting for the creation of workspace "{workspace.workspace_config.name}" to finish provisioning...""")
-            if not workspace.workspace_api.wait_until_ready():
-                print(f"""Workspace "{workspace.workspace_config.name}" failed to provision.""")
+        FleetExecutor(max_workers=max_workers).map(self.__create_workspace, self.account_config.workspaces)
 
         #############################################################
-        # Remove any users before doing anything like adding them.
         print("-"*100)
         if remove_users:
             print("Removing all users from each workspaces.")
-            self.__for_each_workspace(self.__workspaces, self.__remove_users)
-        else:
-            print("Skipping removal of users")
-
-        #############################################################
-        print("-"*100)
-        print(f"""Configuring the entitlements for the group "users" in each workspace.""")
-        self.__for_each_workspace(self.__workspaces, self.__update_entitlements)
-
-        #############################################################
-        print("-"*100)
-        print(f"""Configuring users in each workspace.""")
-        self.__for_each_workspace(self.__workspaces, self.__create_users)
-
-        #############################################################
-        print("-"*100)
-        print(f"""Configuring groups in each workspace.""")
-        self.__for_each_workspace(self.__workspaces, self.__create_group)
-
-        #############################################################
-        print("-"*100)
         if remove_metastore:
             print(f"""Deleting the metastore in each workspace.""")
-            self.__for_each_workspace(self.__workspaces, self.__remove_metastore)
-        else:
-            print("Skipping removal of metastore")
-
-        #############################################################
-        print("-"*100)
-        print(f"""Configuring the metastore in each workspace.""")
-        self.__for_each_workspace(self.__workspaces, self.__create_metastore)
-
-        #############################################################
-        print("-"*100)
-        print(f"""Configuring features in each workspace.""")
-        self.__for_each_workspace(self.__workspaces, self.__enable_features)
-
-        #############################################################
-        print("-"*100)
         if uninstall_courseware:
             print(f"""Uninstalling courseware for all users in each workspace.""")
-            self.__for_each_workspace(self.__workspaces, self.__uninstall_courseware)
-        else:
-            print("Skipping uninstall of courseware")
-
-        #############################################################
-        print("-"*100)
-        print(f"""Installing courseware for all users in each workspace.""")
-        self.__for_each_workspace(self.__workspaces, self.__install_courseware)
+        if not self.run_workspace_setup:
+            print("Skipping workspace validation, the Workspace-Setup job will not be run.")
+        print(f"""Configuring {len(self.__workspaces)} workspaces, each proceeding as soon as its own prior steps complete.""")
 
-        #############################################################
-        print("-"*100)
-        print(f"""Starting the Workspace-Setup job in each workspace.""")
-        self.__for_each_workspace(self.__workspaces, self.__run_workspace_setup_job)
+        graph = TaskGraph(max_workers=max_workers, state_file=state_file, on_complete=self.__on_task_complete)
+        for trio in self.__workspaces:
+            self.__add_workspace_tasks(graph, trio, remove_users=remove_users, remove_metastore=remove_metastore, uninstall_courseware=uninstall_courseware, max_attempts=max_attempts)
 
-        #############################################################
-        print("-"*100)
-        if self.run_workspace_setup:
-            print(f"""Validating select indicators in each workspace.""")
-            self.__for_each_workspace(self.__workspaces, self.__validate_workspace_setup)
-        else:
-            print("Skipping workspace validation, the Workspace-Setup job has not been run.")
+        results = graph.run()
+        self.__print_task_timings(results)
+        self.__record_new_workspaces()
 
         #############################################################
         print("-" * 100)
@@ -407,6 +363,58 @@ class WorkspaceSetup:
                 print(error)
                 print("-"*100)
 
+    def __add_workspace_tasks(self, graph: TaskGraph, trio: WorkspaceTrio, *, remove_users: bool, remove_metastore: bool, uninstall_courseware: bool, max_attempts: int) -> None:
+        """
+        Adds the setup tasks of a single workspace, each depending only on the tasks whose results it needs.
+
+        The idempotent tasks, those that skip whatever already exists, are attempted up to max_attempts times; the removals
+        and the Workspace-Setup job, which would be run again from the start, are attempted once.
+        """
+
+        def task(step: str, action: Callable[[WorkspaceTrio], None], depends_on: List[Optional[str]], idempotent: bool = False) -> str:
+            return graph.add(f"{trio.number:03d}/{step}", lambda: action(trio), depends_on=depends_on, max_attempts=max_attempts if idempotent else 1)
+
+        ready = task("ready", self.__wait_until_ready, [], idempotent=True)
+        removed_users = task("remove-users", self.__remove_users, [ready]) if remove_users else None
+        entitlements = task("entitlements", self.__update_entitlements, [ready], idempotent=True)
+        users = task("users", self.__create_users, [ready, removed_users], idempotent=True)
+        groups = task("groups", self.__create_group, [users], idempotent=True)
+        removed_metastore = task("remove-metastore", self.__remove_metastore, [ready]) if remove_metastore else None
+        metastore = task("metastore", self.__create_metastore, [ready, removed_metastore], idempotent=True)
+        features = task("features", self.__enable_features, [ready], idempotent=True)
+        uninstalled = task("uninstall-courseware", self.__uninstall_courseware, [users]) if uninstall_courseware else None
+        courseware = task("courseware", self.__install_courseware, [users, uninstalled], idempotent=True)
+        job = task("workspace-setup-job", self.__run_workspace_setup_job, [entitlements, groups, metastore, features, courseware])
+
+        if self.run_workspace_setup:
+            task("validate", self.__validate_workspace_setup, [job])
+
+    @staticmethod
+    def __wait_until_ready(trio: WorkspaceTrio) -> None:
+        print(f"""Waiting for the creation of workspace "{trio.workspace_config.name}" to finish provisioning...""")
+        if not trio.workspace_api.wait_until_ready():
+            raise Exception(f"""Workspace "{trio.workspace_config.name}" failed to provision.""")
+
+    def __on_task_complete(self, result: TaskResult) -> None:
+        if result.status == TaskResult.SUCCEEDED:
+            print(f"""Completed {result.key} in {result.elapsed_seconds:.1f} seconds.""")
+        elif result.status == TaskResult.FAILED:
+            print(self.log_error(f"""Failed {result.key} after {result.attempts} attempt(s): {result.error}"""))
+        elif result.status == TaskResult.SKIPPED:
+            print(self.log_error(f"""Skipped {result.key}, a task it depends on did not succeed."""))
+
+    @staticmethod
+    def __print_task_timings(results: Dict[str, TaskResult]) -> None:
+        steps: Dict[str, List[float]] = dict()
+        for key, result in results.items():
+            if result.status == TaskResult.SUCCEEDED:
+                steps.setdefault(key.split("/", 1)[1], list()).append(result.elapsed_seconds)
+
+        print("-"*100)
+        print(f"{'Step':<25} {'Count':>6} {'Mean(s)':>9} {'Max(s)':>9}")
+        for step, durations in steps.items():
+            print(f"{step:<25} {len(durations):>6} {sum(durations)/len(durations):>9.1f} {max(durations):>9.1f}")
+
     def __create_workspace(self, workspace_config: WorkspaceConfig):
         from dbacademy.clients.classrooms.classroom import Classroom
 
@@ -430,39 +438,15 @@ class WorkspaceSetup:
 
     @classmethod
     def __install_courseware(cls, trio: WorkspaceTrio):
-        import os
         from dbacademy.dbhelper.supporting.workspace_helper import WorkspaceHelper
 
+        courses = list()
         for course_def in trio.workspace_config.course_definitions:
+            url, course, version, artifact, token = WorkspaceHelper.parse_course_args(course_def)
+            courses.append((course, WorkspaceHelper.compose_courseware_url(url, course, version, artifact, trio.workspace_config.cds_api_token)))
 
-            for username in trio.workspace_config.usernames:
-                print(f"Installing the course {course_def} for {username}")
-
-                url, course, version, artifact, token = WorkspaceHelper.parse_course_args(course_def)
-                download_url = WorkspaceHelper.compose_courseware_url(url, course, version, artifact, trio.workspace_config.cds_api_token)
-
-                if trio.workspace_config.courseware_subdirectory is None:
-                    install_dir = f"/Users/{username}/{course}"
-                else:
-                    install_dir = f"/Users/{username}/{trio.workspace_config.courseware_subdirectory}/{course}"
-
-                print(f" - {install_dir}")
-
-                files = trio.client.workspace.ls(install_dir)
-                count = 0 if files is None else len(files)
-                if count > 0:
-                    print(f" - Skipping, course already exists.")
-                else:
-                    files = [f.lower() for f in os.listdir("/")]
-                    if "tmp" in files:
-                        local_file_path = "/tmp/download.dbc"
-                    elif "temp" in files:
-                        local_file_path = "/temp/download.dbc"
-                    else:
-                        local_file_path = "/download.dbc"
-
-                    trio.client.workspace.import_dbc_files(install_dir, download_url, local_file_path=local_file_path)
-                    print(f" - Installed.")
+        # Each course is downloaded once for all of this workspace's users, raising once all were attempted should any fail.
+        WorkspaceHelper(trio.client).install_courses(courses, trio.workspace_config.courseware_subdirectory, trio.workspace_config.usernames)
 
     @classmethod
     def __uninstall_courseware(cls, trio: WorkspaceTrio):
@@ -534,44 +518,23 @@ class WorkspaceSetup:
         remaining_count = max_users-len(existing_usernames)+1
         print(f"""Configuring {remaining_count} of {max_users+1} users for "{name}".""")
 
-        for username in trio.workspace_config.usernames:
-            if username in existing_usernames:
-                user = trio.get_by_username(username)
-            else:
-                try:
-                    user = trio.client.scim.users.create(username)
-                except DatabricksApiException as e:
-                    user = trio.client.scim.users.get_by_username(username)
-                    if user is None:
-                        user = trio.client.scim.users.create(username)
-                        print(f"| {e.message}|")
-                        print("F$@# LIARS !!!")
-                    elif e.http_code == 409:
-                        existing = username in existing_usernames
-                        print("-"*100)
-                        print(f"409 creating user {username}, existing: {existing}")
-                        print(f"| {e.message}|")
-                        print("-"*100)
-                    else:
-                        raise Exception(f"Failed to create user {username} for {name}") from e
+        # Students are stripped of these direct entitlements; the admin is only created if missing.
+        revoked = {"allow-cluster-create": False, "databricks-sql-access": False, "workspace-access": False}
+        admins = [u for u in trio.workspace_config.usernames if u == self.account_config.username]
+        students = [u for u in trio.workspace_config.usernames if u != self.account_config.username]
 
-            if username != self.account_config.username:
-                self.__remove_entitlement(trio, user, "allow-cluster-create")
-                self.__remove_entitlement(trio, user, "databricks-sql-access")
-                self.__remove_entitlement(trio, user, "workspace-access")
+        results = trio.client.scim.users.provision(admins, existing_users=trio.existing_users)
+        results.extend(trio.client.scim.users.provision(students, entitlements=revoked, existing_users=trio.existing_users))
+
+        failures = [r for r in results if not r.succeeded]
+        for failure in failures:
+            print(f"| Failed to provision user {failure.username} for {name}: {failure.error}")
 
         # Force a reload
         trio.existing_users = None
 
-    @staticmethod
-    def __remove_entitlement(trio: WorkspaceTrio, user: Dict[str, Any], entitlement: str):
-        username = user.get("userName")
-        entitlements = [e.get("value") for e in user.get("entitlements", list())]
-        if entitlement in entitlements:
-            try:
-                trio.client.scim.users.remove_entitlement(user.get("id"), entitlement)
-            except Exception as e:
-                raise Exception(f"Exception removing entitlement {entitlement} from {username}") from e
+        if len(failures) > 0:
+            raise Exception(f"Failed to provision {len(failures)} of {len(results)} users for {name}") from failures[0].error
 
     @staticmethod
     def __update_entitlements(trio: WorkspaceTrio):
@@ -628,18 +591,25 @@ class WorkspaceSetup:
 
         new_url = f"""https://training-{trio.name}.cloud.databricks.com"""
 
-        for record in self.__air_table_records:
-            old_url = record.get("fields", dict()).get("AWS Workspace URL")
-            if str(new_url).lower().strip() == str(old_url).lower().strip(old_url):
-                break
-        else:
+        if new_url not in self.__air_table_records:
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             comments = f"{now}: Created workspace via automation script."
 
-            self.airtable_table.insert({
-                "AWS Workspace URL": new_url,
-                "Comments": comments
-            })
+            # Recorded in batches by __record_new_workspaces() once every workspace has been validated.
+            with self.__new_air_table_records_lock:
+                self.__new_air_table_records[new_url] = {
+                    "AWS Workspace URL": new_url,
+                    "Comments": comments
+                }
+
+    def __record_new_workspaces(self) -> None:
+        with self.__new_air_table_records_lock:
+            new_records = list(self.__new_air_table_records.values())
+            self.__new_air_table_records.clear()
+
+        if len(new_records) > 0:
+            print(f"""Recording {len(new_records)} new workspaces in Airtable.""")
+            self.airtable_table.insert_many(new_records)
 
     def __validate_pool_and_policies(self, trio: WorkspaceTrio) -> List[str]:
 
@@ -754,35 +724,27 @@ class WorkspaceSetup:
         job_id = trio.client.jobs.create_from_dict(config)
         return job_id
 
-    def __wait_for_job_run(self, trio: WorkspaceTrio, job_id: str, run_id: str):
-        import time
+    @staticmethod
+    def __wait_for_job_run(trio: WorkspaceTrio, job_id: str, run_id: str):
+        from dbacademy.clients.databricks.run_watcher import RunWatcher
 
-        wait = 15
-        new_run = trio.client.runs.get(run_id)
+        while True:
+            watcher = RunWatcher()
+            watcher.watch(trio.client.runs, run_id)
+            new_run = watcher.wait_all()[run_id]
 
-        life_cycle_state = new_run.get("state", dict()).get("life_cycle_state")
+            if new_run.get("state", dict()).get("life_cycle_state") != "SKIPPED":
+                return new_run
 
-        if life_cycle_state == "SKIPPED":
             # For some reason, the job was aborted and then restarted.
             # Rather than simply reporting skipped, we want to get the
             # current run_id and resume monitoring from there.
-            runs = trio.client.runs.list_by_job_id(job_id)
-            for past_runs in runs:
-                life_cycle_state = past_runs.get("state", dict()).get("life_cycle_state")
-                if life_cycle_state == "RUNNING":
-                    return self.__wait_for_job_run(trio, job_id, past_runs.get("run_id"))
-
-            return new_run
-
-        elif life_cycle_state != "TERMINATED" and life_cycle_state != "INTERNAL_ERROR":
-            if life_cycle_state == "PENDING" or life_cycle_state == "RUNNING":
-                time.sleep(wait)
+            for past_run in trio.client.runs.iter_list_by_job_id(job_id):
+                if past_run.get("state", dict()).get("life_cycle_state") == "RUNNING":
+                    run_id = past_run.get("run_id")
+                    break
             else:
-                time.sleep(5)
-
-            return self.__wait_for_job_run(trio, job_id, run_id)
-
-        return new_run
+                return new_run
 
     def __create_metastore(self, trio: WorkspaceTrio):
 
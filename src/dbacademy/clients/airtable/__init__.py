@@ -1,7 +1,9 @@
 __all__ = ["from_args", "from_environment", "from_workspace", "TableConfig"]
 
-from typing import Optional
-from dbacademy.clients.rest.common import ApiClient
+import threading
+from typing import Optional, Dict
+from dbacademy.clients.rest.common import ApiClient, HttpMethod
+from dbacademy.clients.rest.rate_limiter import TokenBucket
 from dbacademy.clients.airtable.tables_api import TablesAPI
 from dbacademy.clients import ClientErrorHandler
 from dbacademy.clients.airtable.at_utils import AirTableUtils
@@ -26,8 +28,16 @@ class TableConfig:
 class AirTableRestClient(ApiClient):
     """"
     AirTable Rest API AirTableRestClient
+
+    Airtable allows 5 requests per second per base, so every client of the same base, and so every table of it, shares
+    one limiter in addition to the process-wide, per-host pacing of ApiClient.
     """
 
+    BASE_QPS = 5
+
+    __base_limiters: Dict[str, TokenBucket] = dict()
+    __base_limiters_lock = threading.Lock()
+
     def __init__(self, *,
                  base_id: str,
                  access_token: str,
@@ -61,6 +71,23 @@ class AirTableRestClient(ApiClient):
     def base_id(self) -> str:
         return self.__base_id
 
+    @property
+    def base_limiter(self) -> TokenBucket:
+        """The limiter shared by every client of this base."""
+        with AirTableRestClient.__base_limiters_lock:
+            limiter = AirTableRestClient.__base_limiters.get(self.base_id)
+            if limiter is None:
+                limiter = TokenBucket(self.BASE_QPS, self.BASE_QPS)
+                AirTableRestClient.__base_limiters[self.base_id] = limiter
+            return limiter
+
+    def _rate_limit_delay(self, endpoint: str, http_method: HttpMethod) -> float:
+        return max(super()._rate_limit_delay(endpoint, http_method), self.base_limiter.reserve())
+
+    def _rate_limit_exceeded(self, endpoint: str, http_method: HttpMethod) -> None:
+        super()._rate_limit_exceeded(endpoint, http_method)
+        self.base_limiter.drain()
+
     def table(self, table_id: str) -> TablesAPI:
         return TablesAPI(self, table_id, self.at_utils)
 
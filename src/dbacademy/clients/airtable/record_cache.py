@@ -0,0 +1,138 @@
+__all__ = ["RecordCache"]
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class RecordCache:
+    """
+    A local copy of an Airtable table's records, by record id and optionally by the value of a key field.
+
+    Airtable has no If-Modified-Since, instead each refresh after the first requests only the records whose
+    LAST_MODIFIED_TIME() is after the previous refresh.  Such a delta cannot see records deleted by others, so a full
+    refresh is made once `full_refresh_seconds` have passed since the last one; writes made through the TablesAPI that
+    created the cache, deletions included, are applied to it as they are made.
+
+    Example:
+        workspaces = tables_api.cache(key_field="Workspace Name")
+        workspaces.refresh()
+        record = workspaces.get("classroom-001")
+    """
+
+    # Tolerates the difference between our clock and Airtable's.
+    CLOCK_SKEW_SECONDS = 5
+
+    def __init__(self, tables_api: Any, *, key_field: str = None, filter_by_formula: str = None, full_refresh_seconds: float = 60 * 60):
+        self.__tables_api = tables_api
+        self.__key_field = key_field
+        self.__filter_by_formula = filter_by_formula
+        self.__full_refresh_seconds = full_refresh_seconds
+
+        self.__lock = threading.Lock()
+        self.__records: Dict[str, Dict[str, Any]] = dict()
+        self.__keys: Dict[Any, str] = dict()
+        self.__refreshed: Optional[float] = None
+        self.__fully_refreshed: Optional[float] = None
+
+    @property
+    def key_field(self) -> Optional[str]:
+        return self.__key_field
+
+    @property
+    def refreshed(self) -> Optional[float]:
+        """The epoch time of the last refresh, None if never refreshed."""
+        return self.__refreshed
+
+    def __len__(self) -> int:
+        return len(self.__records)
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key) is not None
+
+    def records(self) -> List[Dict[str, Any]]:
+        with self.__lock:
+            return list(self.__records.values())
+
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        """Returns the record with the given value of the key field, or else with the given id, without any request."""
+        with self.__lock:
+            record_id = self.__keys.get(key, key)
+            return self.__records.get(record_id)
+
+    def get_by_id(self, record_id: str) -> Optional[Dict[str, Any]]:
+        with self.__lock:
+            return self.__records.get(record_id)
+
+    @property
+    def filter_by_formula(self) -> Optional[str]:
+        return self.__filter_by_formula
+
+    def put_all(self, records: Iterable[Dict[str, Any]], *, held_only: bool = False) -> None:
+        """
+        Adds or replaces the given records.
+
+        Args:
+            held_only: Replaces only the records already in the cache, ignoring the others, e.g. for a cache restricted
+                by a formula that cannot be evaluated locally.
+        """
+        with self.__lock:
+            for record in records:
+                if not held_only or record.get("id") in self.__records:
+                    self.__put(record)
+
+    def __put(self, record: Dict[str, Any]) -> None:
+        record_id = record.get("id")
+        previous = self.__records.get(record_id)
+
+        if previous is not None:
+            # Airtable returns the whole record, even from partial updates, omitting only the empty fields.
+            self.__keys.pop(self.__key_of(previous), None)
+
+        self.__records[record_id] = record
+        key = self.__key_of(record)
+        if key is not None:
+            self.__keys[key] = record_id
+
+    def __key_of(self, record: Dict[str, Any]) -> Any:
+        return None if self.__key_field is None else record.get("fields", dict()).get(self.__key_field)
+
+    def remove_all(self, record_ids: Iterable[str]) -> None:
+        with self.__lock:
+            for record_id in record_ids:
+                record = self.__records.pop(record_id, None)
+                if record is not None:
+                    self.__keys.pop(self.__key_of(record), None)
+
+    def refresh(self, *, full: bool = False) -> int:
+        """
+        Brings the cache up to date, returning the number of records fetched.
+
+        Args:
+            full: Re-reads every record, dropping those deleted since, instead of only those modified.
+        """
+        import time
+        from datetime import datetime, timezone
+
+        started = time.time()
+        full = full or self.__fully_refreshed is None or started - self.__fully_refreshed >= self.__full_refresh_seconds
+
+        if full:
+            formula = self.__filter_by_formula
+        else:
+            since = datetime.fromtimestamp(self.__refreshed - self.CLOCK_SKEW_SECONDS, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            formula = f"IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{since}'))"
+            if self.__filter_by_formula is not None:
+                formula = f"AND({self.__filter_by_formula}, {formula})"
+
+        records = list(self.__tables_api.iter_query(filter_by_formula=formula))
+
+        with self.__lock:
+            if full:
+                self.__records.clear()
+                self.__keys.clear()
+                self.__fully_refreshed = started
+            for record in records:
+                self.__put(record)
+            self.__refreshed = started
+
+        return len(records)
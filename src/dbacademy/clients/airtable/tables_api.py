@@ -1,13 +1,17 @@
 __all__ = ["TablesAPI"]
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 from dbacademy.clients.rest.common import ApiClient
 from dbacademy.clients.airtable.at_utils import AirTableUtils
 from dbacademy.clients.rest.common import ApiContainer
+from dbacademy.clients.airtable.record_cache import RecordCache
 
 
 class TablesAPI(ApiContainer):
 
+    BATCH_SIZE = 10    # The most records Airtable accepts in a single create, update or delete.
+    BATCH_WORKERS = 4  # Batches sent at once, the base's limiter paces them to Airtable's limit.
+
     def __init__(self, client: ApiClient, table_id: str, at_utils: AirTableUtils):
         from dbacademy.common import validate
         from dbacademy.clients import airtable
@@ -16,6 +20,7 @@ class TablesAPI(ApiContainer):
         self.__table_id = validate.str_value(table_id=table_id)
         self.__at_utils: AirTableUtils = validate.any_value(AirTableUtils, at_utils=at_utils, required=True)
         self.__table_url = f"{client.endpoint}/{table_id}"
+        self.__caches = list()
 
     @property
     def at_utils(self) -> AirTableUtils:
@@ -26,27 +31,32 @@ class TablesAPI(ApiContainer):
         return self.__table_id
 
     def query(self, view_id: str = None, filter_by_formula: str = None, sort_by: str = None, sort_asc: bool = True, records: List[Dict[str, Any]] = None, offset: str = None) -> List[Dict[str, Any]]:
-        import requests
-
         records = records or list()
+        records.extend(self.iter_query(view_id=view_id, filter_by_formula=filter_by_formula, sort_by=sort_by, sort_asc=sort_asc, offset=offset))
+        return records
 
-        error_message = "Exception reading records from the database"
-        url = self.__build_query(view_id=view_id, filter_by_formula=filter_by_formula, sort_by=sort_by, sort_asc=sort_asc, offset=offset)
+    def iter_query(self, view_id: str = None, filter_by_formula: str = None, sort_by: str = None, sort_asc: bool = True, offset: str = None, prefetch: bool = False) -> Iterator[Dict[str, Any]]:
+        """Lazily yields every matching record, requesting each page of 100 records only as it is needed."""
+        from dbacademy.clients.rest.paging import iter_pages
+
+        def fetch_page(page_offset: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+            url = self.__build_query(view_id=view_id, filter_by_formula=filter_by_formula, sort_by=sort_by, sort_asc=sort_asc, offset=page_offset or None)
+            response_data = self.__send("GET", url, None, "Exception reading records from the database")
+            return response_data.get("records", list()), response_data.get("offset")
+
+        # An empty offset requests the first page, None ends the iteration.
+        return iter_pages(fetch_page, offset or "", prefetch=prefetch)
+
+    def __send(self, method: str, url: str, payload: Optional[Dict[str, Any]], error_message: str) -> Dict[str, Any]:
+        import requests
 
         for attempt in self.at_utils.ATTEMPTS:
-            response = self.__client.api("GET", url, _result_type=requests.Response)
+            response = self.__client.api(method, url, payload, _result_type=requests.Response)
 
             if not self.at_utils.is_rate_limited(response, attempt):
                 # We are not being rate limited, go ahead and validate the response.
                 self.at_utils.validate_response(response, error_message, response.status_code)
-
-                response_data = response.json()
-                records.extend(response_data.get("records", list()))
-                next_offset = response_data.get("offset")
-                if next_offset is None:
-                    return records
-                else:
-                    return self.query(view_id=view_id, filter_by_formula=filter_by_formula, sort_by=sort_by, sort_asc=sort_asc, records=records, offset=next_offset)
+                return response.json()
 
         self.at_utils.raise_rate_limit_failure(error_message)
 
@@ -79,56 +89,94 @@ class TablesAPI(ApiContainer):
         return url
 
     def update_by_id(self, record_id: str, *, fields: Dict[str, Any]):
-        import requests
-
-        error_message = "Exception updating database record"
-
         payload = {
             "typecast": True,
             "fields": fields
         }
-
-        for attempt in self.at_utils.ATTEMPTS:
-            response = self.__client.api("PATCH", f"{self.__table_url}/{record_id}", _data=payload, _result_type=requests.Response)
-
-            if not self.at_utils.is_rate_limited(response, attempt):
-                # We are not being rate limited, go ahead and validate the response.
-                self.at_utils.validate_response(response, error_message, response.status_code)
-                return response.json()
-
-        self.at_utils.raise_rate_limit_failure(error_message)
+        record = self.__send("PATCH", f"{self.__table_url}/{record_id}", payload, "Exception updating database record")
+        self.__on_written([record])
+        return record
 
     def insert(self, fields: Dict[str, Any]) -> Dict[str, Any]:
-        import requests
-
         payload = {
             "typecast": True,
             "fields": fields
         }
-        error_message = "Exception inserting records to the database"
-
-        for attempt in self.at_utils.ATTEMPTS:
-            response = self.__client.api("POST", self.__table_url, payload, _result_type=requests.Response)
-
-            if not self.at_utils.is_rate_limited(response, attempt):
-                # We are not being rate limited, go ahead and validate the response.
-                self.at_utils.validate_response(response, error_message, response.status_code)
-                return response.json()
-
-        self.at_utils.raise_rate_limit_failure(error_message)
+        record = self.__send("POST", self.__table_url, payload, "Exception inserting records to the database")
+        self.__on_written([record])
+        return record
 
     def delete_by_id(self, record_id: str):
-        import requests
-
-        error_message = "Exception deleting records from the database"
-        url = f"{self.__table_url}/{record_id}"
-
-        for attempt in self.at_utils.ATTEMPTS:
-            response = self.__client.api("DELETE", url, _result_type=requests.Response)
-
-            if not self.at_utils.is_rate_limited(response, attempt):
-                # We are not being rate limited, go ahead and validate the response.
-                self.at_utils.validate_response(response, error_message, response.status_code)
-                return response.json()
-
-        self.at_utils.raise_rate_limit_failure(error_message)
+        response = self.__send("DELETE", f"{self.__table_url}/{record_id}", None, "Exception deleting records from the database")
+        self.__on_deleted([record_id])
+        return response
+
+    def __for_each_batch(self, items: List[Any], send_batch) -> List[Dict[str, Any]]:
+        from dbacademy.common import FleetExecutor
+
+        batches = [items[i:i + self.BATCH_SIZE] for i in range(0, len(items), self.BATCH_SIZE)]
+        results = FleetExecutor(max_workers=self.BATCH_WORKERS).map(send_batch, batches)
+        return [record for batch in results for record in batch]
+
+    def insert_many(self, fields: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Inserts one record per dictionary of fields, ten per request, returning the records created in order."""
+        def insert_batch(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            payload = {
+                "typecast": True,
+                "records": [{"fields": f} for f in batch]
+            }
+            return self.__send("POST", self.__table_url, payload, "Exception inserting records to the database").get("records", list())
+
+        records = self.__for_each_batch(list(fields), insert_batch)
+        self.__on_written(records)
+        return records
+
+    def update_many(self, updates: Union[Dict[str, Dict[str, Any]], Iterable[Tuple[str, Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """
+        Updates the given fields of many records, ten per request, returning the records updated in order.
+
+        Args:
+            updates: The fields to update by record id, as a dictionary or as (record id, fields) pairs.
+        """
+        def update_batch(batch: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+            payload = {
+                "typecast": True,
+                "records": [{"id": record_id, "fields": f} for record_id, f in batch]
+            }
+            return self.__send("PATCH", self.__table_url, payload, "Exception updating database record").get("records", list())
+
+        records = self.__for_each_batch(list(updates.items() if isinstance(updates, dict) else updates), update_batch)
+        self.__on_written(records)
+        return records
+
+    def delete_many(self, record_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Deletes many records, ten per request, returning Airtable's {"id", "deleted"} confirmation of each."""
+        def delete_batch(batch: List[str]) -> List[Dict[str, Any]]:
+            url = f"{self.__table_url}?" + "&".join(f"records[]={record_id}" for record_id in batch)
+            return self.__send("DELETE", url, None, "Exception deleting records from the database").get("records", list())
+
+        record_ids = list(record_ids)
+        results = self.__for_each_batch(record_ids, delete_batch)
+        self.__on_deleted(record_ids)
+        return results
+
+    def cache(self, key_field: str = None, filter_by_formula: str = None) -> RecordCache:
+        """
+        Returns a local copy of the table's records, kept up to date by this TablesAPI's writes and by refresh().
+
+        Args:
+            key_field: The field records are looked up by in addition to their id.
+            filter_by_formula: Restricts the cache to the matching records.
+        """
+        cache = RecordCache(self, key_field=key_field, filter_by_formula=filter_by_formula)
+        self.__caches.append(cache)
+        return cache
+
+    def __on_written(self, records: List[Dict[str, Any]]) -> None:
+        for cache in self.__caches:
+            # Whether a new record matches a cache's formula is only known to Airtable, it is picked up by the next refresh.
+            cache.put_all(records, held_only=cache.filter_by_formula is not None)
+
+    def __on_deleted(self, record_ids: List[str]) -> None:
+        for cache in self.__caches:
+            cache.remove_all(record_ids)
@@ -1,7 +1,7 @@
 __all__ = ["Classroom"]
 
 import re
-from dbacademy.clients.dougrest import DatabricksApi
+from dbacademy.clients.dougrest import DatabricksApi, DatabricksApiException
 
 
 class Classroom(object):
@@ -100,23 +100,48 @@ class Classroom(object):
             folder_path = f"/Users/{user_name}/{folder_name}"
             self.databricks.workspace.delete(folder_path)
 
-    def upload_dbc(self, source_url, folder_name=None, last_student=None, first_student=0):
+    def upload_dbc(self, source_url, folder_name=None, last_student=None, first_student=0, max_workers=8):
         """
         Upload courseware.
 
+        The DBC is downloaded once and imported for up to max_workers students at a time, students who already have
+        the folder are skipped.  Returns the status of each student, "Installed" or "Skipped"; should any import fail,
+        the failures are reported once every student was attempted and a DatabricksApiException is raised.
+
         >>> classroom = Classroom()
         >>> classroom.upload_dbc("https://files.training.databricks.com/courses/spark-ilt/Lessons.dbc", \
         ... "Spark-ILT")
         """
+        from dbacademy.common import FleetExecutor
+
         if folder_name is None:
             folder_name = self.extract_filename(source_url)
         if last_student is None:
             last_student = self.num_students
         content = self.databricks.workspace.read_data_from_url(source_url, format="DBC")
-        for i in range(first_student, last_student + 1):
-            user_name = self.username_pattern.format(student_number=i)
+
+        def upload(student_number):
+            user_name = self.username_pattern.format(student_number=student_number)
             folder_path = f"/Users/{user_name}/{folder_name}"
-            self.databricks.workspace.import_from_data(content, folder_path, format="DBC", if_exists="ignore")
+            try:
+                result = self.databricks.workspace.import_from_data(content, folder_path, format="DBC", if_exists="ignore")
+                return user_name, "Skipped" if result is None else "Installed"
+            except DatabricksApiException as e:
+                return user_name, f"Failed: {e.message}"
+
+        report = dict(FleetExecutor(max_workers=max_workers, max_per_host=FleetExecutor.MAX_PER_WORKSPACE).map(upload, range(first_student, last_student + 1), host=lambda _: self.databricks.endpoint))
+
+        for status in ("Installed", "Skipped"):
+            print(f"{status}: {len([s for s in report.values() if s == status])}")
+        for user_name, status in report.items():
+            if status.startswith("Failed"):
+                print(f"{user_name}: {status}")
+
+        failed = [user_name for user_name, status in report.items() if status.startswith("Failed")]
+        if failed:
+            raise DatabricksApiException(f"Failed to upload {folder_name} for {len(failed)} of {len(report)} students: {', '.join(failed)}")
+
+        return report
 
     def create_users(self, last_student=None, first_student=0, allow_cluster_create=False):
         """
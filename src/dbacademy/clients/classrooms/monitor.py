@@ -3,6 +3,7 @@ __all__ = ["Commands", "scan_workspaces", "find_workspace"]
 from typing import Dict, Any, List, Callable, cast, Optional
 from dbacademy.clients.dougrest import DatabricksApi
 from dbacademy.clients.dougrest.accounts.workspaces import Workspace
+from dbacademy.clients.databricks.inventory import FleetInventory
 from dbacademy.clients.rest.common import DatabricksApiException
 
 
@@ -25,20 +26,34 @@ class Commands(object):
         return len([u for u in users if "odl_instructor" in u])
 
     @staticmethod
-    def courseware_verify(courseware_spec: Dict, fix: bool = False, only_students: bool = False):
+    def courseware_verify(courseware_spec: Dict, fix: bool = False, only_students: bool = False, max_workers: int = 8):
         def do_courseware_verify(ws: Workspace):
             """Compares each user's home folder to the courseware_spec defined above."""
-            users = ws.users.list_usernames()
+            from dbacademy.common import FleetExecutor
+
+            users = [u for u in ws.users.list_usernames() if not only_students or "odl_user" in u]  # Skip instructors
+            folder_name = courseware_spec['folder']
+
+            def count_files(user_name: str) -> Optional[int]:
+                try:
+                    return sum(1 for _ in ws.workspace.walk(f"/Users/{user_name}/{folder_name}", max_workers=4))
+                except DatabricksApiException:
+                    return None  # Not imported
+
+            # Walk every user's folder up front, concurrently, the fixes below are then applied in order.
+            if "dbc" in courseware_spec:
+                file_counts = dict(zip(users, FleetExecutor(max_workers=max_workers, max_per_host=FleetExecutor.MAX_PER_WORKSPACE).map(count_files, users, host=lambda _: ws.endpoint)))
+            else:
+                file_counts = dict()
+
             results = []
             correct_file_count = -1
+            dbc_content = None  # Downloaded once, for the first user that needs it
             for user in users:
-                if only_students and "odl_user" not in user:
-                    continue  # Skip instructors
-                folder_name = courseware_spec['folder']
                 if "dbc" in courseware_spec:
                     workspace_path = f"/Users/{user}/{folder_name}"
-                    try:
-                        file_count = len(list(ws.workspace.walk(workspace_path)))
+                    file_count = file_counts[user]
+                    if file_count is not None:
                         if correct_file_count < 0:
                             correct_file_count = file_count
                             continue
@@ -53,10 +68,10 @@ class Commands(object):
                                 ws.workspace.delete(workspace_path, recursive=True)
                             else:
                                 continue
-                    except DatabricksApiException:
-                        pass
                     if fix:
-                        ws.workspace.import_from_url(courseware_spec["dbc"], workspace_path)
+                        if dbc_content is None:
+                            dbc_content = ws.workspace.read_data_from_url(courseware_spec["dbc"])
+                        ws.workspace.import_from_data(dbc_content, workspace_path)
                     results.append(user)
                 if "repo" in courseware_spec:
                     workspace_path = f"/Repos/{user}/{folder_name}"
@@ -529,6 +544,19 @@ class Commands(object):
                 count += 1
         return count
 
+    @staticmethod
+    def inventory_refresh(inventory: FleetInventory, kinds: List[str] = None, max_age_seconds: float = None):
+        """
+        Refreshes each workspace's snapshot of clusters, jobs, warehouses, users... in the inventory, listing only the
+        kinds whose snapshot is too old; reports then query inventory.resources() instead of every workspace.
+        """
+        def do_inventory_refresh(ws: Workspace):
+            # Through refresh_fleet() so that a workspace that could not be listed reports its error, not "0 changed".
+            results = inventory.refresh_fleet([(ws["workspace_name"], ws)], kinds=kinds, max_age_seconds=max_age_seconds, max_workers=1)
+            return [{"kind": r.kind, "added": r.added, "changed": r.changed, "removed": r.removed, "skipped": r.skipped,
+                     "error": None if r.error is None else str(r.error)} for r in results]
+        return do_inventory_refresh
+
     @staticmethod
     def instructors_add(instructors: List[str]):
         def do_add_instructors(ws: Workspace):
@@ -993,9 +1021,8 @@ class Commands(object):
             except Exception as ex:
                 return {"Cluster": cluster["cluster_name"], "Error": str(ex)}
 
-        from multiprocessing.pool import ThreadPool
-        with ThreadPool(100) as pool:
-            results = pool.map(update_cluster, ws.clusters.list())
+        from dbacademy.common import FleetExecutor
+        results = FleetExecutor(max_workers=32, max_per_host=FleetExecutor.MAX_PER_WORKSPACE).map(update_cluster, ws.clusters.list(), host=lambda _: ws.endpoint)
         return [r for r in results if r is not None]
 
     @staticmethod
@@ -1066,9 +1093,8 @@ def scan_workspaces(function: Callable[[Workspace], Any], workspaces: List[Datab
     #     except Exception as e:
     #       yield (w, None, e)
 
-    from multiprocessing.pool import ThreadPool
-    with ThreadPool(500) as pool:
-        map_results = pool.map(lambda w: list(check_workspace(w)), workspaces)
+    from dbacademy.common import FleetExecutor
+    map_results = FleetExecutor(max_workers=64, max_per_host=FleetExecutor.MAX_PER_WORKSPACE).map(lambda w: list(check_workspace(w)), workspaces, host=lambda w: w.endpoint)
 
     # Determine the schema for the results and turn it into a pretty dataframe cs
     example = OrderedDict()
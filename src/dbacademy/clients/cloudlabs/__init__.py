@@ -22,19 +22,29 @@ class Tenant(ApiClient):
         from dbacademy.clients.cloudlabs.templates import Templates
         self.templates = Templates(self)
 
+    @property
+    def executor(self):
+        return self.cloudlabs.executor
+
     @property
     def threadpool(self):
-        return self.cloudlabs.threadpool
+        """The former name of executor, kept for existing callers of threadpool.map()."""
+        return self.executor
 
     def do_batch(self, f, items):
-        return self.threadpool.map(f, items)
+        return self.executor.map(f, items)
 
 
 class CloudlabsApi(ApiClient):
     def __init__(self, token):
         super().__init__("https://api.cloudlabs.ai", token=token)
-        from multiprocessing.pool import ThreadPool
-        self.threadpool = ThreadPool(100)
+        from dbacademy.common import FleetExecutor
+        self.executor = FleetExecutor(max_workers=100)
+
+    @property
+    def threadpool(self):
+        """The former name of executor, kept for existing callers of threadpool.map()."""
+        return self.executor
 
     @cached_property
     def tenants(self) -> Dict[str, Tenant]:
@@ -1,7 +1,8 @@
 __all__ = ["AccountScimUsersApi", "Operation"]
 
-from typing import Dict, Any, Union, List, Optional, Literal
+from typing import Dict, Any, Union, List, Optional, Iterable, Literal
 from dbacademy.clients.rest.common import ApiContainer, ApiClient
+from dbacademy.clients.databricks.scim.provisioning import UserProvisioningResult
 
 
 class Operation:
@@ -120,6 +121,28 @@ class AccountScimUsersApi(ApiContainer):
         except Exception as e:
             raise e
 
+    def provision(self,
+                  usernames: Iterable[str],
+                  *,
+                  entitlements: Dict[str, bool] = None,
+                  existing_users: List[Dict[str, Any]] = None,
+                  chunk_size: int = 25,
+                  max_workers: int = 8) -> List[UserProvisioningResult]:
+        """
+        Creates the missing users and sets their direct entitlements in at most one request per user, processing chunks
+        of users concurrently; see dbacademy.clients.databricks.scim.provisioning.provision_users
+
+        Returns:
+            One UserProvisioningResult per username, in the order specified.
+        """
+        from dbacademy.clients.databricks.scim.provisioning import provision_users
+
+        return provision_users(self, usernames,
+                               entitlements=entitlements,
+                               existing_users=existing_users,
+                               chunk_size=chunk_size,
+                               max_workers=max_workers)
+
     def to_users_list(self, users: Union[None, str, Dict[str, Any]]) -> List[Dict[str, Any]]:
 
         # One way or the other, we will use the full list
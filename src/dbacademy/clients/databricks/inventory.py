@@ -0,0 +1,338 @@
+"""
+A local snapshot of the clusters, jobs, warehouses, users and other resources of every workspace of a fleet.
+
+Audits and reports query the snapshot instead of re-listing every resource of every workspace on each run; each
+refresh re-lists only the kinds of resources whose snapshot is older than that kind's maximum age and rewrites only the
+rows whose content differs from the last refresh.
+"""
+from __future__ import annotations
+
+__all__ = ["FleetInventory", "InventoryKind", "RefreshResult", "DEFAULT_KINDS"]
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class InventoryKind(object):
+    """Describes how to list one kind of resource and how to tell whether a listed resource has changed."""
+
+    def __init__(self, name: str, *,
+                 id_field: str,
+                 fetch: Callable[[Any], Iterable[Dict[str, Any]]],
+                 version_fields: Sequence[str] = None,
+                 max_age_seconds: float = 0):
+        """
+        Args:
+            name: The name of the kind, e.g. "clusters".
+            id_field: The field uniquely identifying a resource within its workspace.
+            fetch: Lists every resource of this kind given the workspace's client.
+            version_fields: The fields whose change counts the resource as changed, such as a modified time or a state;
+                when None, the resource's entire content is compared instead. Either way the snapshot's copy of the
+                resource is kept current, e.g. after a rename that leaves these fields as they were.
+            max_age_seconds: A snapshot younger than this is not refreshed; 0 refreshes on every call.
+        """
+        self.name = name
+        self.id_field = id_field
+        self.fetch = fetch
+        self.version_fields = version_fields
+        self.max_age_seconds = max_age_seconds
+
+    def version_of(self, resource: Dict[str, Any]) -> str:
+        import json
+        import hashlib
+
+        if self.version_fields is None:
+            content = json.dumps(resource, sort_keys=True, default=str)
+        else:
+            content = json.dumps([resource.get(f) for f in self.version_fields], default=str)
+
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _list_serving_endpoints(client: Any) -> List[Dict[str, Any]]:
+    return client.api("GET", "/api/2.0/serving-endpoints").get("endpoints", list())
+
+
+# Defined against the attributes shared by DBAcademyRestClient and the dougrest DatabricksApi.
+DEFAULT_KINDS: Dict[str, InventoryKind] = {kind.name: kind for kind in [
+    InventoryKind("clusters", id_field="cluster_id", fetch=lambda client: client.clusters.list(),
+                  version_fields=["state", "last_restarted_time", "last_state_loss_time", "num_workers", "autotermination_minutes", "policy_id"]),
+    InventoryKind("cluster_policies", id_field="policy_id", fetch=lambda client: client.api("GET", "/api/2.0/policies/clusters/list").get("policies", list()),
+                  max_age_seconds=60 * 60),
+    InventoryKind("jobs", id_field="job_id", fetch=lambda client: client.jobs.list(),
+                  max_age_seconds=15 * 60),
+    InventoryKind("warehouses", id_field="id", fetch=lambda client: client.sql.warehouses.list()),
+    InventoryKind("users", id_field="id", fetch=lambda client: client.scim.users.list(),
+                  max_age_seconds=60 * 60),
+    InventoryKind("serving_endpoints", id_field="name", fetch=_list_serving_endpoints,
+                  version_fields=["last_updated_timestamp", "state"], max_age_seconds=15 * 60),
+]}
+
+
+class RefreshResult(object):
+    """The outcome of refreshing one kind of resource of one workspace."""
+
+    def __init__(self, workspace: str, kind: str, *, added: int = 0, changed: int = 0, removed: int = 0, unchanged: int = 0, skipped: bool = False, error: Exception = None):
+        self.__workspace = workspace
+        self.__kind = kind
+        self.__added = added
+        self.__changed = changed
+        self.__removed = removed
+        self.__unchanged = unchanged
+        self.__skipped = skipped
+        self.__error = error
+
+    @property
+    def workspace(self) -> str:
+        return self.__workspace
+
+    @property
+    def kind(self) -> str:
+        return self.__kind
+
+    @property
+    def added(self) -> int:
+        return self.__added
+
+    @property
+    def changed(self) -> int:
+        return self.__changed
+
+    @property
+    def removed(self) -> int:
+        return self.__removed
+
+    @property
+    def unchanged(self) -> int:
+        return self.__unchanged
+
+    @property
+    def skipped(self) -> bool:
+        """True if the snapshot was recent enough that the resources were not listed at all."""
+        return self.__skipped
+
+    @property
+    def error(self) -> Optional[Exception]:
+        return self.__error
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"RefreshResult({self.workspace}/{self.kind}, error={self.error!r})"
+        return f"RefreshResult({self.workspace}/{self.kind}, added={self.added}, changed={self.changed}, removed={self.removed}, unchanged={self.unchanged}, skipped={self.skipped})"
+
+
+class FleetInventory(object):
+    """
+    A SQLite snapshot of the resources of many workspaces.
+
+    SQLite ships with Python, so the snapshot needs no additional dependency and may be queried directly with SQL:
+    the "resources" table holds one row per (workspace, kind, id) with the resource's JSON in "data", and "refreshes"
+    records when each kind of each workspace was last listed.
+
+    Example:
+        inventory = FleetInventory("/tmp/fleet.sqlite")
+        inventory.refresh_fleet((w["workspace_name"], client_of(w)) for w in workspaces)
+        running = [c for c in inventory.resources("clusters") if c["state"] == "RUNNING"]
+    """
+
+    def __init__(self, path: str = ":memory:", *, kinds: Dict[str, InventoryKind] = None):
+        """
+        Args:
+            path: The SQLite database file, created if missing; the default keeps the snapshot in memory only.
+            kinds: The kinds of resources to snapshot, DEFAULT_KINDS by default.
+        """
+        import sqlite3
+
+        self.__path = path
+        self.__kinds = dict(DEFAULT_KINDS if kinds is None else kinds)
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.executescript("""
+            CREATE TABLE IF NOT EXISTS resources (
+                workspace TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                updated REAL NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (workspace, kind, id)
+            );
+            CREATE TABLE IF NOT EXISTS refreshes (
+                workspace TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                refreshed REAL NOT NULL,
+                PRIMARY KEY (workspace, kind)
+            );
+        """)
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def kinds(self) -> Dict[str, InventoryKind]:
+        return self.__kinds
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
+
+    def __enter__(self) -> FleetInventory:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def last_refreshed(self, workspace: str, kind: str) -> Optional[float]:
+        """Returns the epoch time at which the kind was last listed for the workspace, or None if it never was."""
+        with self.__lock:
+            row = self.__connection.execute("SELECT refreshed FROM refreshes WHERE workspace = ? AND kind = ?", (workspace, kind)).fetchone()
+        return None if row is None else row[0]
+
+    def invalidate(self, workspace: str, kind: str = None) -> None:
+        """Forces the next refresh of the workspace to list the kind, or every kind, again; typically after modifying it."""
+        with self.__lock, self.__connection:
+            if kind is None:
+                self.__connection.execute("DELETE FROM refreshes WHERE workspace = ?", (workspace,))
+            else:
+                self.__connection.execute("DELETE FROM refreshes WHERE workspace = ? AND kind = ?", (workspace, kind))
+
+    def refresh(self, workspace: str, client: Any, *, kinds: Iterable[str] = None, max_age_seconds: float = None) -> List[RefreshResult]:
+        """
+        Brings the snapshot of one workspace up to date.
+
+        Args:
+            workspace: The name under which the workspace's resources are recorded.
+            client: The workspace's client, a DBAcademyRestClient or a dougrest DatabricksApi.
+            kinds: The kinds to refresh, all by default.
+            max_age_seconds: Overrides each kind's maximum age; 0 forces every kind to be listed.
+        Raises:
+            Exception: Any error listing the resources, in which case the snapshot of that kind is left as it was.
+        """
+        import time
+
+        results = list()
+
+        for name in self.__kinds if kinds is None else kinds:
+            kind = self.__kinds[name]
+            max_age = kind.max_age_seconds if max_age_seconds is None else max_age_seconds
+            refreshed = self.last_refreshed(workspace, name)
+
+            if refreshed is not None and time.time() - refreshed < max_age:
+                results.append(RefreshResult(workspace, name, skipped=True))
+                continue
+
+            # List outside the lock, the REST calls being what refreshes spend their time on.
+            now = time.time()
+            listed = {str(r.get(kind.id_field)): r for r in kind.fetch(client)}
+            results.append(self.__update(workspace, kind, listed, now))
+
+        return results
+
+    def __update(self, workspace: str, kind: InventoryKind, listed: Dict[str, Dict[str, Any]], now: float) -> RefreshResult:
+        import json
+
+        with self.__lock, self.__connection:
+            rows = self.__connection.execute("SELECT id, version, updated, data FROM resources WHERE workspace = ? AND kind = ?", (workspace, kind.name))
+            snapshot = {row[0]: row[1:] for row in rows}
+
+            upserts = list()
+            changed = 0
+            for resource_id, resource in listed.items():
+                version = kind.version_of(resource)
+                data = json.dumps(resource, sort_keys=True, default=str)
+                old_version, updated, old_data = snapshot.get(resource_id, (None, None, None))
+
+                if old_version is not None and old_version != version:
+                    changed += 1
+                    upserts.append((workspace, kind.name, resource_id, version, now, data))
+                elif old_version is None:
+                    upserts.append((workspace, kind.name, resource_id, version, now, data))
+                elif old_data != data:
+                    # The same version, yet some other field changed, e.g. a rename; keep the copy current but not as a change.
+                    upserts.append((workspace, kind.name, resource_id, version, updated, data))
+
+            removed = snapshot.keys() - listed.keys()
+            added = len(listed.keys() - snapshot.keys())
+
+            self.__connection.executemany("INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?, ?)", upserts)
+            self.__connection.executemany("DELETE FROM resources WHERE workspace = ? AND kind = ? AND id = ?",
+                                          [(workspace, kind.name, resource_id) for resource_id in removed])
+            self.__connection.execute("INSERT OR REPLACE INTO refreshes VALUES (?, ?, ?)", (workspace, kind.name, now))
+
+        return RefreshResult(workspace, kind.name,
+                             added=added,
+                             changed=changed,
+                             removed=len(removed),
+                             unchanged=len(listed) - added - changed)
+
+    def refresh_fleet(self, clients: Iterable[Tuple[str, Any]], *, kinds: Iterable[str] = None, max_age_seconds: float = None, max_workers: int = 32) -> List[RefreshResult]:
+        """
+        Refreshes many workspaces concurrently.  A workspace that cannot be listed does not stop the others, its error
+        being reported in its results instead.
+
+        Args:
+            clients: The (workspace name, client) of each workspace, possibly a generator creating clients lazily.
+            kinds: The kinds to refresh, all by default.
+            max_age_seconds: Overrides each kind's maximum age; 0 forces every kind to be listed.
+            max_workers: The maximum number of workspaces refreshed at once.
+        """
+        from dbacademy.common import FleetExecutor
+
+        kinds = list(self.__kinds if kinds is None else kinds)
+
+        def refresh_workspace(entry: Tuple[str, Any]) -> List[RefreshResult]:
+            workspace, client = entry
+            try:
+                return self.refresh(workspace, client, kinds=kinds, max_age_seconds=max_age_seconds)
+            except Exception as e:
+                return [RefreshResult(workspace, ",".join(kinds), error=e)]
+
+        results = FleetExecutor(max_workers=max_workers).map(refresh_workspace, clients)
+        return [r for workspace_results in results for r in workspace_results]
+
+    def workspaces(self) -> List[str]:
+        """Returns the names of the workspaces in the snapshot."""
+        with self.__lock:
+            return [row[0] for row in self.__connection.execute("SELECT DISTINCT workspace FROM refreshes ORDER BY workspace")]
+
+    def resources(self, kind: str, workspace: str = None, *, changed_since: float = None) -> List[Dict[str, Any]]:
+        """
+        Returns the snapshot of a kind of resource, without any REST call.
+
+        Args:
+            kind: The kind of resource, e.g. "clusters".
+            workspace: Restricts the resources to one workspace, else those of every workspace are returned.
+            changed_since: Restricts the resources to those added or changed since this epoch time.
+        """
+        import json
+
+        query = "SELECT data FROM resources WHERE kind = ?"
+        params: List[Any] = [kind]
+        if workspace is not None:
+            query += " AND workspace = ?"
+            params.append(workspace)
+        if changed_since is not None:
+            query += " AND updated >= ?"
+            params.append(changed_since)
+
+        with self.__lock:
+            return [json.loads(row[0]) for row in self.__connection.execute(f"{query} ORDER BY workspace, id", params)]
+
+    def get(self, workspace: str, kind: str, resource_id: Any) -> Optional[Dict[str, Any]]:
+        """Returns one resource of the snapshot, or None if the workspace has no such resource."""
+        import json
+
+        with self.__lock:
+            row = self.__connection.execute("SELECT data FROM resources WHERE workspace = ? AND kind = ? AND id = ?", (workspace, kind, str(resource_id))).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Returns the number of resources of each kind, by workspace."""
+        with self.__lock:
+            rows = self.__connection.execute("SELECT workspace, kind, COUNT(*) FROM resources GROUP BY workspace, kind").fetchall()
+
+        counts = dict()
+        for workspace, kind, count in rows:
+            counts.setdefault(workspace, dict())[kind] = count
+        return counts
@@ -1,6 +1,6 @@
 __all__ = ["JobsClient"]
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator, List, Tuple
 from dbacademy.clients.rest.common import ApiClient, ApiContainer
 from dbacademy.clients.databricks.jobs.job_config_classes import JobConfig
 
@@ -69,20 +69,21 @@ class JobsClient(ApiContainer):
         return response.get("jobs", list())
 
     def list(self, expand_tasks: bool = False):
-        offset = 0  # Start with zero
-        limit = 100  # Our default maximum
+        return list(self.iter_list(expand_tasks=expand_tasks))
 
+    def iter_list(self, expand_tasks: bool = False, prefetch: bool = False) -> Iterator[Dict[str, Any]]:
+        """Lazily yields every job, requesting each page of 100 jobs only as it is needed."""
+        from dbacademy.clients.rest.paging import iter_pages
+
+        limit = 100  # Our default maximum
         target_url = f"{self.base_uri}/list?limit={limit}&expand_tasks={expand_tasks}"
-        response = self.client.api("GET", target_url)
-        all_jobs = response.get("jobs", list())
 
-        while response.get("has_more", False):
-            offset += limit
-            page_token = response.get('next_page_token')
-            response = self.client.api("GET", f"{target_url}&page_token={page_token}")
-            all_jobs.extend(response.get("jobs", list()))
+        def fetch_page(page_token: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+            response = self.client.api("GET", f"{target_url}&page_token={page_token}" if page_token else target_url)
+            next_page_token = response.get("next_page_token") if response.get("has_more", False) else None
+            return response.get("jobs", list()), next_page_token
 
-        return all_jobs
+        return iter_pages(fetch_page, "", prefetch=prefetch)
 
     def delete_by_id(self, job_id):
         self.client.api("POST", f"{self.client.endpoint}/api/2.0/jobs/delete", job_id=job_id)
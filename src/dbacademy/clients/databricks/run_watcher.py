@@ -0,0 +1,161 @@
+"""
+Waits on many job runs at once, possibly across workspaces, yielding each as soon as it finishes.
+"""
+from __future__ import annotations
+
+__all__ = ["RunWatcher"]
+
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, Union
+
+TERMINAL_STATES = ("TERMINATED", "SKIPPED", "INTERNAL_ERROR")
+
+
+class _WatchedRun(object):
+
+    def __init__(self, run_id: Union[str, int], tag: Hashable, expected_duration_seconds: Optional[float]):
+        import time
+
+        self.run_id = str(run_id)
+        self.tag = tag
+        self.expected_duration_seconds = expected_duration_seconds
+        self.started = time.monotonic()
+        self.life_cycle_state: Optional[str] = None
+
+
+class RunWatcher(object):
+    """
+    Tracks any number of job runs and yields each one's final state as soon as it is reached.
+
+    Each poll costs, per workspace, one get per run when only a few runs are pending there, or else a single listing of
+    the workspace's active runs plus one get for each watched run that is no longer active.  The interval between polls
+    adapts to the runs still pending: short while runs are starting, terminating or nearing their expected duration,
+    growing to `max_interval_seconds` for long-running ones.
+
+    Example:
+        watcher = RunWatcher()
+        for test in tests:
+            watcher.watch(client.runs, test.run_id, tag=test)
+        for test, run in watcher.completions():
+            conclude_test(test, run)
+    """
+
+    def __init__(self, *,
+                 min_interval_seconds: float = 5,
+                 max_interval_seconds: float = 60,
+                 individual_polls: int = 2,
+                 on_poll: Callable[[Hashable, Dict[str, Any], float], None] = None):
+        """
+        Args:
+            min_interval_seconds: The shortest delay between polls.
+            max_interval_seconds: The longest delay between polls.
+            individual_polls: Up to this many pending runs in a workspace are polled individually, beyond it the
+                workspace's active runs are listed instead.
+            on_poll: Invoked with the tag, the latest state of a run still pending and the seconds until the next poll.
+        """
+        self.min_interval_seconds = min_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.individual_polls = individual_polls
+        self.on_poll = on_poll
+
+        # Pending runs, grouped by the RunsClient of their workspace.
+        self.__clients: Dict[int, Any] = dict()
+        self.__pending: Dict[int, Dict[str, _WatchedRun]] = dict()
+
+    def __len__(self) -> int:
+        return sum(len(runs) for runs in self.__pending.values())
+
+    def watch(self, runs_client: Any, run_id: Union[str, int], *, tag: Hashable = None, expected_duration_seconds: float = None) -> None:
+        """
+        Adds a run to those being watched.
+
+        Args:
+            runs_client: The RunsClient of the run's workspace.
+            run_id: The run to watch.
+            tag: Returned with the run when it completes, defaults to run_id.
+            expected_duration_seconds: How long the run is expected to take, polled more often as that time approaches.
+        """
+        key = id(runs_client.client)
+        self.__clients[key] = runs_client
+        self.__pending.setdefault(key, dict())[str(run_id)] = _WatchedRun(run_id, run_id if tag is None else tag, expected_duration_seconds)
+
+    def __poll_interval(self, run: _WatchedRun) -> float:
+        import time
+
+        if run.life_cycle_state in (None, "PENDING", "QUEUED", "TERMINATING", "BLOCKED"):
+            return self.min_interval_seconds  # About to change state.
+
+        age = time.monotonic() - run.started
+        if run.expected_duration_seconds is not None and age < run.expected_duration_seconds:
+            interval = (run.expected_duration_seconds - age) / 2
+        else:
+            interval = age / 10  # Poll long-running runs progressively less often.
+
+        return max(self.min_interval_seconds, min(self.max_interval_seconds, interval))
+
+    def __poll(self, key: int) -> List[Tuple[_WatchedRun, Dict[str, Any]]]:
+        """Returns the latest state of the workspace's pending runs that may have changed."""
+        runs_client = self.__clients[key]
+        pending = self.__pending[key]
+
+        if len(pending) <= self.individual_polls:
+            return [(run, runs_client.get(run.run_id)) for run in list(pending.values())]
+
+        polled = list()
+        inactive = dict(pending)
+        for active in runs_client.iter_list(active_only=True):
+            run = inactive.pop(str(active.get("run_id")), None)
+            if run is not None:
+                polled.append((run, active))
+
+        # Runs no longer listed as active have most likely finished, fetch their final state.
+        polled.extend((run, runs_client.get(run.run_id)) for run in inactive.values())
+        return polled
+
+    def completions(self, timeout_seconds: float = None) -> Iterator[Tuple[Hashable, Dict[str, Any]]]:
+        """
+        Yields (tag, run) for each watched run as it reaches a terminal state, until no watched run remains; runs may be
+        added to the watcher while iterating.
+
+        Raises:
+            TimeoutError: If runs remain after `timeout_seconds`.
+        """
+        import time
+
+        deadline = None if timeout_seconds is None else time.monotonic() + timeout_seconds
+
+        while len(self) > 0:
+            still_running = list()
+
+            for key in list(self.__pending):
+                for run, response in self.__poll(key):
+                    run.life_cycle_state = response.get("state", dict()).get("life_cycle_state")
+                    if run.life_cycle_state in TERMINAL_STATES:
+                        del self.__pending[key][run.run_id]
+                        yield run.tag, response
+                    else:
+                        still_running.append((run, response))
+
+                if len(self.__pending.get(key, dict())) == 0:
+                    self.__pending.pop(key, None)
+                    self.__clients.pop(key, None)
+
+            if len(self) == 0:
+                return
+
+            delay = min((self.__poll_interval(run) for runs in self.__pending.values() for run in runs.values()), default=self.min_interval_seconds)
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"{len(self)} runs had not completed after {timeout_seconds} seconds.")
+                delay = min(delay, remaining)
+
+            if self.on_poll is not None:
+                for run, response in still_running:
+                    self.on_poll(run.tag, response, delay)
+
+            time.sleep(delay)
+
+    def wait_all(self, timeout_seconds: float = None) -> Dict[Hashable, Dict[str, Any]]:
+        """Blocks until every watched run completes, returning the final state of each by tag."""
+        return {tag: run for tag, run in self.completions(timeout_seconds)}
@@ -1,6 +1,6 @@
 __all__ = ["RunsClient"]
 
-from typing import Any, Dict, Union, List
+from typing import Any, Dict, Union, List, Iterator, Optional, Tuple
 import builtins
 
 from dbacademy.clients.rest.common import ApiClient, ApiContainer
@@ -15,25 +15,35 @@ class RunsClient(ApiContainer):
 
     def list(self, runs: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         runs = runs or builtins.list()
-        url = f"{self.client.endpoint}/api/2.0/jobs/runs/list?limit=1000&offset={len(runs)}"
-        json_response = self.client.api("GET", url)
-        runs.extend(json_response.get("runs", builtins.list()))
-
-        if not json_response.get("has_more", False):
-            return runs
-        else:
-            return self.list(runs)
+        runs.extend(self.iter_list(offset=len(runs)))
+        return runs
 
     def list_by_job_id(self, job_id: Union[str, int], runs: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         runs = runs or builtins.list()
-        url = f"{self.client.endpoint}/api/2.0/jobs/runs/list?limit=1000&offset={len(runs)}&job_id={job_id}"
-        json_response = self.client.api("GET", url)
-        runs.extend(json_response.get("runs", builtins.list()))
+        runs.extend(self.iter_list(job_id=job_id, offset=len(runs)))
+        return runs
+
+    def iter_list_by_job_id(self, job_id: Union[str, int], prefetch: bool = False) -> Iterator[Dict[str, Any]]:
+        """Lazily yields the runs of the specified job, most recent first."""
+        return self.iter_list(job_id=job_id, prefetch=prefetch)
+
+    def iter_list(self, job_id: Union[str, int] = None, offset: int = 0, prefetch: bool = False, active_only: bool = False) -> Iterator[Dict[str, Any]]:
+        """Lazily yields all runs, or only those of job_id if specified, most recent first; only unfinished runs if active_only."""
+        from dbacademy.clients.rest.paging import iter_pages
+
+        def fetch_page(page_offset: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+            url = f"{self.client.endpoint}/api/2.0/jobs/runs/list?limit=1000&offset={page_offset}"
+            if job_id is not None:
+                url += f"&job_id={job_id}"
+            if active_only:
+                url += "&active_only=true"
 
-        if not json_response.get("has_more", False):
-            return runs
-        else:
-            return self.list_by_job_id(job_id, runs)
+            json_response = self.client.api("GET", url)
+            runs = json_response.get("runs", builtins.list())
+            has_more = json_response.get("has_more", False) and len(runs) > 0
+            return runs, page_offset + len(runs) if has_more else None
+
+        return iter_pages(fetch_page, offset, prefetch=prefetch)
 
     def cancel(self, run_id: Union[str, int]) -> Dict[str, Any]:
         return self.client.api("POST", f"{self.client.endpoint}/api/2.0/jobs/runs/cancel", run_id=run_id)
@@ -42,21 +52,13 @@ class RunsClient(ApiContainer):
         return self.client.api("POST", f"{self.client.endpoint}/api/2.0/jobs/runs/delete", run_id=run_id, _expected=(200, 400))
 
     def wait_for(self, run_id: Union[str, int]) -> Dict[str, Any]:
-        import time
-
-        wait = 15
-        response = self.get(run_id)
-        state = response["state"]["life_cycle_state"]
-        job_id = response.get("job_id", 0)
-
-        if state != "TERMINATED" and state != "INTERNAL_ERROR" and state != "SKIPPED":
-            if state == "PENDING" or state == "RUNNING":
-                print(f" - Job #{job_id}-{run_id} is {state}, checking again in {wait} seconds")
-                time.sleep(wait)
-            else:
-                print(f" - Job #{job_id}-{run_id} is {state}, checking again in 5 seconds")
-                time.sleep(5)
+        """Blocks until the run reaches a terminal state, returning its final state; see RunWatcher to wait on many runs."""
+        from dbacademy.clients.databricks.run_watcher import RunWatcher
 
-            return self.wait_for(run_id)
+        def report(_, response: Dict[str, Any], delay: float) -> None:
+            state = response.get("state", dict()).get("life_cycle_state")
+            print(f" - Job #{response.get('job_id', 0)}-{run_id} is {state}, checking again in {int(delay)} seconds")
 
-        return response
+        watcher = RunWatcher(on_poll=report)
+        watcher.watch(self, run_id)
+        return watcher.wait_all()[run_id]
@@ -0,0 +1,152 @@
+"""
+Batched user provisioning shared by the workspace and account SCIM users APIs.
+"""
+from __future__ import annotations
+
+__all__ = ["UserProvisioningResult", "provision_users", "entitlement_operations"]
+
+from typing import Any, Dict, Iterable, List, Optional
+
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+
+class UserProvisioningResult(object):
+    """The outcome of provisioning a single user."""
+
+    CREATED = CREATED
+    UPDATED = UPDATED
+    UNCHANGED = UNCHANGED
+    FAILED = FAILED
+
+    def __init__(self, username: str, action: str, user: Optional[Dict[str, Any]] = None, error: Exception = None):
+        self.__username = username
+        self.__action = action
+        self.__user = user
+        self.__error = error
+
+    @property
+    def username(self) -> str:
+        return self.__username
+
+    @property
+    def action(self) -> str:
+        """One of "created", "updated", "unchanged" or "failed"."""
+        return self.__action
+
+    @property
+    def user(self) -> Optional[Dict[str, Any]]:
+        """The user as last returned by the server; None if provisioning failed."""
+        return self.__user
+
+    @property
+    def error(self) -> Optional[Exception]:
+        return self.__error
+
+    @property
+    def succeeded(self) -> bool:
+        return self.__action != FAILED
+
+    def __repr__(self):
+        return f"UserProvisioningResult(username={self.username!r}, action={self.action!r}, error={self.error!r})"
+
+
+def entitlement_operations(user: Dict[str, Any], entitlements: Dict[str, bool]) -> List[Dict[str, Any]]:
+    """
+    Returns the SCIM PatchOp operations that bring the user's direct entitlements in line with `entitlements`, an empty
+    list if they already are.  Entitlements not named in `entitlements` are left alone.
+    """
+    current = {e.get("value") for e in user.get("entitlements", list())}
+    operations = [{"op": "remove", "path": f"""entitlements[value eq "{name}"]"""}
+                  for name, granted in entitlements.items() if not granted and name in current]
+
+    additions = [{"value": name} for name, granted in entitlements.items() if granted and name not in current]
+    if len(additions) > 0:
+        operations.append({"op": "add", "path": "entitlements", "value": additions})
+
+    return operations
+
+
+def provision_users(users_api: Any,
+                    usernames: Iterable[str],
+                    *,
+                    entitlements: Dict[str, bool] = None,
+                    existing_users: List[Dict[str, Any]] = None,
+                    chunk_size: int = 25,
+                    max_workers: int = 8) -> List[UserProvisioningResult]:
+    """
+    Ensures every user exists with the specified direct entitlements, using at most one request per user: a POST
+    carrying the entitlements for new users, a single combined PATCH for existing users whose entitlements differ and
+    nothing at all for existing users that are already correct.
+
+    Users are processed in chunks of `chunk_size`, up to `max_workers` chunks at a time; requests remain subject to
+    ApiClient.rate_limiter.  A failure is recorded against the user concerned and does not stop the others.
+
+    Args:
+        users_api: The ScimUsersClient or AccountScimUsersApi to provision through.
+        usernames: The users to provision.
+        entitlements: The entitlements to grant (True) or revoke (False) directly, others are left unchanged.
+        existing_users: The users already known to exist, listed from the server if not specified.
+        chunk_size: The number of users handled serially by each worker.
+        max_workers: The maximum number of chunks processed concurrently.
+    Returns:
+        One result per username, in the order specified.
+    """
+    from dbacademy.common import FleetExecutor
+    from dbacademy.clients.rest.common import DatabricksApiException
+
+    usernames = list(dict.fromkeys(usernames))  # Drop duplicates, preserving order.
+    entitlements = entitlements or dict()
+
+    if existing_users is None:
+        existing_users = users_api.list()
+    existing = {u.get("userName"): u for u in existing_users}
+
+    def patch(username: str, user: Dict[str, Any]) -> UserProvisioningResult:
+        operations = entitlement_operations(user, entitlements)
+        if len(operations) == 0:
+            return UserProvisioningResult(username, UNCHANGED, user)
+
+        payload = {
+            "schemas": ["urn:ietf:params:scim:api:messages:2.0:PatchOp"],
+            "Operations": operations
+        }
+        updated = users_api.client.api("PATCH", f"""{users_api.base_url}/{user.get("id")}""", payload)
+        return UserProvisioningResult(username, UPDATED, updated or user)
+
+    def provision(username: str) -> UserProvisioningResult:
+        try:
+            if username in existing:
+                return patch(username, existing.get(username))
+
+            payload = {
+                "schemas": ["urn:ietf:params:scim:schemas:core:2.0:User"],
+                "userName": username,
+                "groups": [],
+                "entitlements": [{"value": name} for name, granted in entitlements.items() if granted]
+            }
+            try:
+                user = users_api.client.api("POST", users_api.base_url, payload, _expected=(200, 201))
+                return UserProvisioningResult(username, CREATED, user)
+
+            except DatabricksApiException as e:
+                if e.http_code != 409:
+                    raise e
+                # Created since we listed the existing users; reconcile it instead.
+                user = users_api.get_by_username(username)
+                if user is None:
+                    raise e
+                return patch(username, user)
+
+        except Exception as e:
+            return UserProvisioningResult(username, FAILED, error=e)
+
+    def provision_chunk(chunk: List[str]) -> List[UserProvisioningResult]:
+        return [provision(username) for username in chunk]
+
+    chunk_size = max(1, chunk_size)
+    chunks = [usernames[i:i+chunk_size] for i in range(0, len(usernames), chunk_size)]
+
+    return [result for results in FleetExecutor(max_workers=max_workers, max_per_host=FleetExecutor.MAX_PER_WORKSPACE).map(provision_chunk, chunks, host=lambda _: users_api.client.endpoint) for result in results]
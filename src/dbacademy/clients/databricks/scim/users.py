@@ -1,7 +1,8 @@
 __all__ = ["ScimUsersClient"]
 
-from typing import Dict, Any, Union, List, Optional
+from typing import Dict, Any, Union, List, Optional, Iterator, Iterable, Tuple
 from dbacademy.clients.rest.common import ApiClient, ApiContainer
+from dbacademy.clients.databricks.scim.provisioning import UserProvisioningResult
 
 
 class ScimUsersClient(ApiContainer):
@@ -11,15 +12,26 @@ class ScimUsersClient(ApiContainer):
 
     def list(self, users: List[Dict[str, Any]] = None, start_index: int = 1, users_per_request: int = 1000) -> List[Dict[str, Any]]:
         users = users or list()
+        users.extend(self.iter_list(start_index=start_index, users_per_request=users_per_request))
+        return users
 
-        response = self.client.api("GET", self.base_url, startIndex=start_index, count=users_per_request, excludedAttributes="roles")
-        new_users = response.get("Resources", list())
-        users.extend(new_users)
+    def iter_list(self, start_index: int = 1, users_per_request: int = 1000, prefetch: bool = False) -> Iterator[Dict[str, Any]]:
+        """Lazily yields every user, requesting each page of users_per_request users only as it is needed."""
+        from dbacademy.clients.rest.paging import iter_pages
 
-        if len(new_users) > 0:
-            return self.list(users, len(users)+1)
+        def fetch_page(index: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+            response = self.client.api("GET", self.base_url, startIndex=index, count=users_per_request, excludedAttributes="roles")
+            new_users = response.get("Resources", list())
+            total_results = response.get("totalResults")
 
-        return users
+            if len(new_users) == 0:
+                return new_users, None
+            elif total_results is not None and index + len(new_users) > int(total_results):
+                return new_users, None  # That was the last page, don't ask for an empty one.
+            else:
+                return new_users, index + len(new_users)
+
+        return iter_pages(fetch_page, start_index, prefetch=prefetch)
 
     def get_by_id(self, user_id: str) -> Dict[str, Any]:
         url = f"{self.base_url}/{user_id}"
@@ -48,7 +60,7 @@ class ScimUsersClient(ApiContainer):
         return None
 
     def delete_by_username(self, username: str) -> None:
-        for user in self.list():
+        for user in self.iter_list():
             if username == user.get("userName"):
                 return self.delete_by_id(user.get("id"))
 
@@ -67,6 +79,28 @@ class ScimUsersClient(ApiContainer):
         except Exception as e:
             raise e
 
+    def provision(self,
+                  usernames: Iterable[str],
+                  *,
+                  entitlements: Dict[str, bool] = None,
+                  existing_users: List[Dict[str, Any]] = None,
+                  chunk_size: int = 25,
+                  max_workers: int = 8) -> List[UserProvisioningResult]:
+        """
+        Creates the missing users and sets their direct entitlements in at most one request per user, processing chunks
+        of users concurrently; see dbacademy.clients.databricks.scim.provisioning.provision_users
+
+        Returns:
+            One UserProvisioningResult per username, in the order specified.
+        """
+        from dbacademy.clients.databricks.scim.provisioning import provision_users
+
+        return provision_users(self, usernames,
+                               entitlements=entitlements,
+                               existing_users=existing_users,
+                               chunk_size=chunk_size,
+                               max_workers=max_workers)
+
     def to_users_list(self, users: Union[None, str, Dict[str, Any]]) -> List[Dict[str, Any]]:
 
         # One way or the other, we will use the full list
@@ -1,7 +1,7 @@
 __all__ = ["SqlQueriesClient"]
 
 import builtins
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from dbacademy.clients.rest.common import ApiClient, ApiContainer
 
 
@@ -16,15 +16,23 @@ class SqlQueriesClient(ApiContainer):
         if queries is None:
             queries = builtins.list()
 
-        url = f"{self.base_uri}?page_size={self.max_page_size}&page={page}"
-        json_response = self.client.api("GET", url)
+        queries.extend(self.iter_list(page=page))
+        return queries
 
-        queries.extend(json_response.get("results", builtins.list()))
+    def iter_list(self, page: int = 1, prefetch: bool = False) -> Iterator[Dict[str, Any]]:
+        """Lazily yields every query, requesting each page only as it is needed."""
+        from dbacademy.clients.rest.paging import iter_pages
 
-        if json_response.get("count") == len(queries):
-            return queries
-        else:
-            return self.list(queries=queries, page=page+1)
+        def fetch_page(page_number: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+            url = f"{self.base_uri}?page_size={self.max_page_size}&page={page_number}"
+            json_response = self.client.api("GET", url)
+            results = json_response.get("results", builtins.list())
+
+            seen = (page_number - 1) * self.max_page_size + len(results)
+            has_more = len(results) > 0 and json_response.get("count", 0) > seen
+            return results, page_number + 1 if has_more else None
+
+        return iter_pages(fetch_page, page, prefetch=prefetch)
 
     def get_by_id(self, query_id):
         return self.client.api("GET", f"{self.base_uri}/{query_id}")
@@ -36,23 +44,17 @@ class SqlQueriesClient(ApiContainer):
         return self.client.api("POST", f"{self.base_uri}/trash/{query_id}")
 
     def get_by_name(self, query_name, queries=None, page=1):
-        if queries is None:
-            queries = builtins.list()
-
-        url = f"{self.base_uri}?page_size={self.max_page_size}&page={page}"
-        json_response = self.client.api("GET", url)
-
-        queries.extend(json_response.get("results", builtins.list()))
+        if queries is not None:
+            for query in queries:
+                if query_name == query.get("name"):
+                    return query
 
-        for query in queries:
+        # Not found, continue looking, stopping at the first page that contains it.
+        for query in self.iter_list(page=page):
             if query_name == query.get("name"):
                 return query
 
-        # Not found, continue looking.
-        if json_response.get("count") == len(queries):
-            return None
-        else:
-            return self.get_by_name(query_name=query_name, queries=queries, page=page+1)
+        return None
 
     def clone(self, query: Dict[str, Any]):
         create_def = self.existing_to_create(query)
@@ -1,10 +1,14 @@
 __all__ = ["WorkspaceClient"]
 
-from typing import Union, Dict, Any, List, Optional
+from typing import Union, Dict, Any, Iterator, List, Optional
 from dbacademy.clients.rest.common import ApiClient, ApiContainer
 
 
 class WorkspaceClient(ApiContainer):
+
+    # A multiple of 3 so that the base64 encodings of consecutive chunks concatenate into the encoding of the whole.
+    CHUNK_SIZE = 3 * 1024 * 1024
+
     def __init__(self, client: ApiClient):
         self.client = client
         self.base_url = f"{self.client.endpoint}/api/2.0/workspace"
@@ -25,23 +29,29 @@ class WorkspaceClient(ApiContainer):
             except Exception as e:
                 raise Exception(f"Unexpected exception listing {path}") from e
         else:
-            entities = []
-            queue = self.ls(path)
-            
-            if queue is None:
+            objects = self.ls(path)
+
+            if objects is None:
                 return None
 
-            while len(queue) > 0:
-                next_item = queue.pop()
-                object_type = next_item["object_type"]
-                if object_type in object_types:
-                    entities.append(next_item)
-                elif object_type == "DIRECTORY":
-                    result = self.ls(next_item["path"])
-                    if result is not None:
-                        queue.extend(result)
+            return list(self.__walk(objects, object_types=object_types, max_depth=None, max_workers=8))
+
+    def walk(self, path: str, object_types: List[str] = None, max_depth: int = None, max_workers: int = 8) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yields every object under the specified path, directory by directory, while listing the directories ahead
+        of the caller concurrently; see dbacademy.clients.rest.tree_walker.walk_tree()
+        :param path: The directory to walk, yielding nothing if it doesn't exist
+        :param object_types: The types of the objects to yield, e.g. ["NOTEBOOK", "FILE"], None for all including directories
+        :param max_depth: The depth of the deepest objects to yield, 1 yielding only the contents of the path itself
+        :param max_workers: The maximum number of directories listed concurrently
+        :return: an iterator of the objects' status
+        """
+        yield from self.__walk(self.ls(path) or [], object_types=object_types, max_depth=max_depth, max_workers=max_workers)
 
-            return entities
+    def __walk(self, objects: List[Dict[str, Any]], *, object_types: Optional[List[str]], max_depth: Optional[int], max_workers: int) -> Iterator[Dict[str, Any]]:
+        from dbacademy.clients.rest.tree_walker import walk_tree
+
+        return walk_tree(self.ls, objects, object_types=object_types, max_depth=max_depth, max_workers=max_workers)
 
     def mkdirs(self, path: str) -> Dict[str, Any]:
         params = {"path": path}
@@ -65,7 +75,7 @@ class WorkspaceClient(ApiContainer):
         return self.client.api("POST", f"{self.base_url}/import", payload)
 
     def import_dbc_files(self, target_path: str, source_url: str, overwrite: bool = True, local_file_path: str = None) -> Dict[str, Any]:
-        import os, base64
+        import os
         from urllib import request
 
         if local_file_path is None and source_url is None:
@@ -81,21 +91,40 @@ class WorkspaceClient(ApiContainer):
 
             request.urlretrieve(source_url, local_file_path)
 
-        with open(local_file_path, mode='rb') as file:
-            content = file.read()
-
         if overwrite:
             self.delete_path(target_path)
 
         self.mkdirs("/".join(target_path.split("/")[:-1]))
 
-        payload = {
-            "content": base64.b64encode(content).decode("utf-8"),
-            "path": target_path,
-            "overwrite": False,
-            "format": "DBC",
-        }
-        return self.client.api("POST", f"{self.base_url}/import", payload)
+        return self.import_file(target_path, local_file_path, file_format="DBC", overwrite=False)
+
+    def import_file(self, target_path: str, local_file_path: str, *, file_format: str = "DBC", overwrite: bool = False) -> Dict[str, Any]:
+        """
+        Imports a local file, encoding it chunk by chunk into a request body spooled to disk so that neither the file
+        nor its encoding, a third larger, is ever held in memory.
+        :param target_path: The path of the object to create in the workspace
+        :param local_file_path: The file to import, such as a DBC
+        :param file_format: The format of the file, see the workspace API's import endpoint
+        :param overwrite: True to overwrite an existing object
+        :return: the response of the import endpoint
+        """
+        import json
+        import base64
+        import tempfile
+
+        payload = json.dumps({"path": target_path, "overwrite": overwrite, "format": file_format})
+
+        with tempfile.TemporaryFile() as body:
+            body.write(payload[:-1].encode("utf-8"))
+            body.write(b', "content": "')
+
+            with open(local_file_path, mode="rb") as file:
+                for chunk in iter(lambda: file.read(self.CHUNK_SIZE), b""):
+                    body.write(base64.b64encode(chunk))
+
+            body.write(b'"}')
+
+            return self.client.api("POST", f"{self.base_url}/import", _body=body)
 
     def import_notebook(self, language: str, notebook_path: str, content: str, overwrite: bool = True) -> Dict[str, Any]:
         import base64
@@ -121,5 +150,34 @@ class WorkspaceClient(ApiContainer):
                                format="DBC",
                                direct_download=True, _result_type=bytes)
 
+    def export_dbc_to_file(self, path: str, local_file_path: str) -> int:
+        """
+        Exports the DBC of the specified path, streaming it to a local file rather than holding the archive in memory.
+        The file is written under a temporary name and renamed once complete.
+        :param path: The workspace path to export
+        :param local_file_path: The file to write, whose directory must exist
+        :return: the size of the DBC in bytes
+        """
+        import os
+        import requests
+
+        temp_file_path = f"{local_file_path}.tmp"
+        size = 0
+
+        response = self.client.api("GET", f"{self.base_url}/export",
+                                   path=path,
+                                   format="DBC",
+                                   direct_download=True, _result_type=requests.Response, _stream=True)
+        try:
+            with open(temp_file_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+        finally:
+            response.close()
+
+        os.replace(temp_file_path, local_file_path)
+        return size
+
     def get_status(self, path: str) -> Union[None, dict]:
         return self.client.api("GET", f"{self.base_url}/get-status", path=path, _expected=[200, 404])
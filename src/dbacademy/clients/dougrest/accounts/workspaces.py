@@ -1,6 +1,6 @@
 __all__ = ["Workspace", "Workspaces", "STATUS_FAILED", "STATUS_PROVISIONING", "STATUS_UNKNOWN"]
 
-from typing import Any, Type, Dict
+from typing import Any, BinaryIO, Type, Dict
 from dbacademy.clients.dougrest.client import DatabricksApi, DatabricksApiException
 from dbacademy.clients.dougrest.accounts import AccountsApi
 from dbacademy.common import overrides
@@ -68,13 +68,15 @@ class Workspace(DatabricksApi):
             _expected: HttpStatusCodes = None,
             _result_type: Type[HttpReturnType] = dict,
             _base_url: str = None,
+            _stream: bool = False,
+            _body: BinaryIO = None,
             **data: Any) -> HttpReturnType:
 
         self.wait_until_ready()
         try:
             return super().api(_http_method, _endpoint_path, _data,
                                _expected=_expected, _result_type=_result_type,
-                               _base_url=_base_url, **data)
+                               _base_url=_base_url, _stream=_stream, _body=_body, **data)
         except DatabricksApiException as e:
             if e.http_code == 401 and self.username is not None:
                 try:
@@ -83,7 +85,7 @@ class Workspace(DatabricksApi):
                     raise e
                 return super().api(_http_method, _endpoint_path, _data,
                                    _expected=_expected, _result_type=_result_type,
-                                   _base_url=_base_url, **data)
+                                   _base_url=_base_url, _stream=_stream, _body=_body, **data)
             else:
                 raise e
 
@@ -89,15 +89,13 @@ class Runs(ApiContainer):
         runs = self.list(job_id=job_id)
         if not runs:
             return []
-        from multiprocessing.pool import ThreadPool
-        with ThreadPool(min(len(runs), 500)) as pool:
-            pool.map(lambda run: self.delete(run, if_not_exists="ignore"), runs)
+        from dbacademy.common import FleetExecutor
+        FleetExecutor(max_workers=32, max_per_host=FleetExecutor.MAX_PER_WORKSPACE).map(lambda run: self.delete(run, if_not_exists="ignore"), runs, host=lambda _: self.databricks.endpoint)
 
     def cancel_all(self, job_id: int = None) -> list:
         runs = self.list(job_id=job_id)
         if not runs:
             return []
 
-        from multiprocessing.pool import ThreadPool
-        with ThreadPool(min(len(runs), 500)) as pool:
-            pool.map(lambda run: self.cancel(run, if_not_exists="ignore"), runs)
+        from dbacademy.common import FleetExecutor
+        FleetExecutor(max_workers=32, max_per_host=FleetExecutor.MAX_PER_WORKSPACE).map(lambda run: self.cancel(run, if_not_exists="ignore"), runs, host=lambda _: self.databricks.endpoint)
@@ -1,6 +1,43 @@
 from dbacademy.clients.rest.common import DatabricksApiException, ApiContainer
 
 
+class CopyReport(object):
+    """The chunks copied by Workspace.copy(), their size and the resulting throughput."""
+
+    def __init__(self, source_path, target_path):
+        import time
+        import threading
+
+        self.source_path = source_path
+        self.target_path = target_path
+        self.chunks = 0
+        self.bytes = 0
+        self.retried = 0
+        self.failed = list()  # The path of each chunk that could not be copied & the last exception raised
+        self.started = time.time()
+        self.seconds = None
+        self.__lock = threading.Lock()
+
+    def add_chunk(self, size):
+        with self.__lock:
+            self.chunks += 1
+            self.bytes += size
+
+    def finish(self):
+        import time
+        self.seconds = time.time() - self.started
+        return self
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"Copied {self.chunks:,} chunks, {self.bytes / 1024 / 1024:,.1f} MB, from {self.source_path} to {self.target_path} "
+                f"in {self.seconds or 0:,.1f} seconds ({self.bytes_per_second / 1024 / 1024:,.2f} MB/sec), "
+                f"{self.retried:,} retried, {len(self.failed):,} failed")
+
+
 class Workspace(ApiContainer):
     def __init__(self, databricks):
         self.databricks = databricks
@@ -14,72 +51,165 @@ class Workspace(ApiContainer):
         filenames = [f['path'] + ('/' if f['object_type'] == 'DIRECTORY' else '') for f in files]
         return filenames
 
-    def walk(self, workspace_path, sort_key=lambda f: f['path']):
-        """Recursively list files into an iterator.  Sorting within a directory is done by the provided sort_key."""
-        for f in self.list(workspace_path, sort_key=sort_key):
-            yield f
-            if f['object_type'] == 'DIRECTORY':
-                yield from self.walk(f['path'])
+    def walk(self, workspace_path, sort_key=lambda f: f['path'], *, object_types=None, max_depth=None, max_workers=8):
+        """
+        Recursively list files into an iterator.  Sorting within a directory is done by the provided sort_key.
+
+        Each directory is followed by its contents, as with a serial walk, but directories are listed ahead of the caller
+        with up to max_workers requests in flight.  Only objects of the given object_types are yielded, if specified,
+        and only down to max_depth, where 1 yields the contents of workspace_path alone.
+        """
+        from dbacademy.clients.rest.tree_walker import walk_tree
+
+        def list_dir(path):
+            return self.list(path, sort_key=sort_key)
+
+        yield from walk_tree(list_dir, list_dir(workspace_path), object_types=object_types, max_depth=max_depth, max_workers=max_workers)
 
     def mkdirs(self, workspace_path):
         self.databricks.api("POST", "/api/2.0/workspace/mkdirs", {"path": workspace_path})
 
-    def copy(self, source_path, target_path, *, target_connection=None, if_exists="overwrite", exclude=None, dry_run=False):
+    # The DBC export is limited to 10MB, chunks are planned to stay well below it.
+    MAX_CHUNK_SIZE = 8 * 1024 * 1024
+
+    # The list API doesn't report the size of notebooks, only of files, so notebooks are assumed to be this large.
+    ESTIMATED_NOTEBOOK_SIZE = 64 * 1024
+
+    def copy(self, source_path, target_path, *, target_connection=None, if_exists="overwrite", exclude=None, dry_run=False,
+             max_workers=8, max_chunk_size=MAX_CHUNK_SIZE, retries=2):
+        """
+        Copies a folder, or a single object, as DBC archives.  The whole tree is first copied with a single export, if
+        it is too large to export the tree is listed and split into chunks, subtrees estimated to be no larger than
+        max_chunk_size, which are then copied up to max_workers at a time.  Each chunk that fails is retried on its own,
+        up to retries times, a chunk that proves too large being split into its children.
+
+        Returns a CopyReport of the chunks copied and the throughput, which is also printed.
+        """
         exclude = exclude or set()
 
-        source_connection = self.databricks
         if target_connection is None:
-            target_connection = source_connection
+            target_connection = self.databricks
         # Strip trailing '/', except for root '/'
-        source_path = source_path.rstrip("/")
-        target_path = target_path.rstrip("/")
-        if not source_path:
-            source_path = "/"
-        if not target_path:
-            target_path = "/"
+        source_path = source_path.rstrip("/") or "/"
+        target_path = target_path.rstrip("/") or "/"
+
+        report = CopyReport(source_path, target_path)
+
         if source_path in exclude:
             print("skip", source_path, target_path)
-            return
+            return report.finish()
+
         print("copy", source_path, target_path)
         # Try to copy the entire directory at once
+        cause = self.__copy_chunk(source_path, target_path, target_connection, if_exists, dry_run, report)
+        if cause is None:
+            return report.finish()
+        elif not self.__is_too_large(cause):
+            raise cause
+
+        # If the size limit was exceeded for a file (not a directory) raise the error
+        entries = list(self.walk(source_path, max_workers=max_workers))
+        if [e["path"] for e in entries] == [source_path]:
+            raise cause
+
+        # If the size limit was exceeded for a directory, break it into chunks small enough to export.
+        directories, chunks = self.__plan_chunks(source_path, entries, exclude, max_chunk_size)
+
+        def to_target(path):
+            return target_path + path[len(source_path.rstrip("/")):]
+
+        def copy_chunk(chunk_path):
+            return chunk_path, self.__copy_chunk(chunk_path, to_target(chunk_path), target_connection, if_exists, dry_run, report)
+
+        from dbacademy.common import FleetExecutor
+        executor = FleetExecutor(max_workers=max_workers, max_per_host=FleetExecutor.MAX_PER_WORKSPACE)
+
+        for attempt in range(retries + 1):
+            # Parents before children, the chunks of a directory are imported into it.
+            for directory in sorted(directories):
+                if not dry_run:
+                    target_connection.workspace.mkdirs(to_target(directory))
+
+            failures = [(p, e) for p, e in executor.map(copy_chunk, chunks, host=lambda _: self.databricks.endpoint) if e is not None]
+            if not failures or attempt == retries:
+                break
+
+            directories, chunks = set(), list()
+            for chunk_path, e in failures:
+                children = [c for c in entries if c["path"].rsplit("/", 1)[0] == chunk_path and c["path"] not in exclude]
+                if self.__is_too_large(e) and children:
+                    directories.add(chunk_path)
+                    chunks.extend(c["path"] for c in children)
+                else:
+                    chunks.append(chunk_path)
+            report.retried += len(chunks)
+            print(f"retrying {len(failures)} failed chunks as {len(chunks)}")
+
+        report.failed.extend(failures)
+        report.finish()
+        print(report)
+
+        if failures:
+            raise failures[0][1]
+
+        return report
+
+    def __plan_chunks(self, source_path, entries, exclude, max_chunk_size):
+        """Splits the tree into the directories to create and the largest subtrees that fit in a chunk."""
+        sizes = dict()
+        children = dict()
+        for entry in entries:
+            parent = entry["path"].rsplit("/", 1)[0] or "/"
+            children.setdefault(parent, list()).append(entry)
+
+            if entry["object_type"] != "DIRECTORY":
+                size = entry.get("size") or self.ESTIMATED_NOTEBOOK_SIZE
+                while True:
+                    sizes[parent] = sizes.get(parent, 0) + size
+                    if parent in (source_path, "/"):
+                        break
+                    parent = parent.rsplit("/", 1)[0] or "/"
+
+        directories = {source_path}
+        chunks = list()
+        pending = [source_path]
+        while pending:
+            for entry in children.get(pending.pop(), list()):
+                path = entry["path"]
+                if path in exclude:
+                    print("skip", path)
+                elif entry["object_type"] == "DIRECTORY" and sizes.get(path, 0) > max_chunk_size:
+                    directories.add(path)
+                    pending.append(path)
+                else:
+                    chunks.append(path)
+
+        return directories, chunks
+
+    def __copy_chunk(self, source_path, target_path, target_connection, if_exists, dry_run, report):
+        """Copies one chunk, returning the exception that prevented it or None if it was copied or skipped."""
         try:
-            content = source_connection.workspace.export(workspace_path=source_path, format="DBC").get("content", None)
+            # Exported as JSON, Workspace.export() returns the raw body for DBCs.
+            content = self.databricks.api("GET", "/api/2.0/workspace/export", {"path": source_path, "format": "DBC"}).get("content", None)
             if content and not dry_run:
                 target_connection.workspace.import_from_data(workspace_path=target_path, content=content,
                                                              format="DBC", if_exists=if_exists)
-            return
+            report.add_chunk(len(content or "") * 3 // 4)
+            return None
 
         except DatabricksApiException as e:
-            cause = e
-            if "exceeded the limit" in e.message:
-                pass
-            elif "Subtree size exceeds" in e.message:
-                pass
-            elif source_path.endswith("/Trash") and "RESOURCE_DOES_NOT_EXIST":
-                return  # Skip trash folders
+            if source_path.endswith("/Trash"):
+                return None  # Skip trash folders
             elif "BAD_REQUEST: Cannot serialize item" in e.message:
-                return  # Can't copy MLFow experiments this way.  Skip it.
+                return None  # Can't copy MLFow experiments this way.  Skip it.
             elif "BAD_REQUEST: Cannot serialize library" in e.message:
-                return  # Can't copy libraries this way.  Skip it.
+                return None  # Can't copy libraries this way.  Skip it.
             else:
-                raise e
-        # If the size limit was exceeded for a file (not a directory) raise the error
-        source_files = source_connection.workspace.list_names(workspace_path=source_path)
-        if source_files == [source_path]:
-            raise cause
-        # If the size limit was exceeded for a directory, copy the directory item by item to break
-        # it into smaller chunks
-        prefix_len = len(source_path)
-        if source_path == "/":
-            prefix_len = 0
-        target_connection.workspace.mkdirs(target_path)
-        for s in sorted(source_files):
-            t = target_path + s[prefix_len:]
-            self.copy(source_path=s,
-                      target_path=t,
-                      target_connection=target_connection,
-                      if_exists=if_exists,
-                      exclude=exclude)
+                return e
+
+    @staticmethod
+    def __is_too_large(e):
+        return "exceeded the limit" in e.message or "Subtree size exceeds" in e.message
 
     # TODO Remove unused parameter
     # noinspection PyUnusedLocal
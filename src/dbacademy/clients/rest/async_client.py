@@ -0,0 +1,174 @@
+"""
+An asyncio-native sibling of ApiClient.  In order to use this module, you must have pre-installed aiohttp.
+"""
+from __future__ import annotations
+
+__all__ = ["AsyncApiClient"]
+
+import asyncio
+import requests
+from weakref import WeakKeyDictionary
+from dbacademy.clients.rest.common import *
+from typing import Any, Dict, Type
+
+
+class AsyncApiClient(ApiContainer):
+    """
+    Issues the same requests as the wrapped ApiClient, with the same retry, `_expected` and `_result_type` semantics,
+    but as coroutines multiplexed over a single aiohttp connection pool per event loop.
+
+    Example:
+        async def scan(clients):
+            return await asyncio.gather(*[c.api_async("GET", "/api/2.0/clusters/list") for c in clients])
+    """
+
+    limit: int = 1000          # Maximum number of open connections in the shared pool
+    limit_per_host: int = 20   # Maximum number of open connections to any one host in the shared pool
+
+    __shared_sessions: WeakKeyDictionary = WeakKeyDictionary()
+
+    def __init__(self, client: ApiClient, *, session: Any = None):
+        """
+        Args:
+            client: The ApiClient from which to take the endpoint, credentials, timeouts and retry settings.
+            session: An aiohttp.ClientSession to use instead of the pool shared by all clients on the current event loop.
+        """
+        super().__init__()
+        self.__client = client
+        self.__session = session
+
+    @property
+    def client(self) -> ApiClient:
+        return self.__client
+
+    @classmethod
+    def shared_session(cls) -> Any:
+        """Returns the aiohttp.ClientSession shared by all AsyncApiClients on the running event loop, creating it as necessary."""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        session = cls.__shared_sessions.get(loop)
+
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=cls.limit, limit_per_host=cls.limit_per_host)
+            session = aiohttp.ClientSession(connector=connector)
+            cls.__shared_sessions[loop] = session
+
+        return session
+
+    @classmethod
+    async def close_shared_session(cls) -> None:
+        """Closes the connection pool shared by all AsyncApiClients on the running event loop."""
+        session = cls.__shared_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    async def api(self,
+                  _http_method: HttpMethod,
+                  _endpoint_path: str,
+                  _data: Dict[str, Any] = None,
+                  *,
+                  _expected: HttpStatusCodes = None,
+                  _result_type: Type[HttpReturnType] = dict,
+                  _base_url: str = None,
+                  **data: Any) -> HttpReturnType:
+        """
+        Invoke the Databricks REST API.  See :meth:`ApiClient.api` for a description of the arguments.
+
+        Raises:
+            requests.exceptions.ConnectionError: If the connection fails twice.
+            requests.exceptions.ReadTimeout: If the server fails to respond twice.
+            requests.HTTPError: If the API returns an error.
+        """
+        import aiohttp
+        from urllib.parse import urlparse
+
+        client = self.client
+        loop = asyncio.get_running_loop()
+        endpoint, request_kwargs = client._prepare_request(_http_method, _endpoint_path, _data, _base_url, data)
+
+        if client.dns_verify and not client.dns_cache.resolved(urlparse(endpoint).hostname):
+            await loop.run_in_executor(None, client._verify_hostname, endpoint)
+
+        sleep_seconds = client._throttle_delay()
+        if sleep_seconds > 0:
+            await asyncio.sleep(sleep_seconds)
+
+        session = self.__session or self.shared_session()
+        timeout = aiohttp.ClientTimeout(sock_connect=client.connect_timeout, sock_read=client.read_timeout)
+        headers = {k: v for k, v in client.session.headers.items() if v is not None}
+        connection_errors = 0
+        response = None  # Precluding warning
+        retry = client.retry_policy.begin(_http_method, endpoint, max_attempts=client.max_retries)
+
+        while True:
+            sleep_seconds = client._rate_limit_delay(endpoint, _http_method)
+            if sleep_seconds > 0:
+                await asyncio.sleep(sleep_seconds)
+
+            if client.trace:
+                print(f"{_http_method} {endpoint}: {request_kwargs}")
+            retry.attempted()
+            record = client.instrumentation.before_request(_http_method, endpoint, request_kwargs, retry.attempts)
+
+            try:
+                response = await self.__request(session, _http_method, endpoint, headers, timeout, request_kwargs)
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                client.instrumentation.after_request(record, error=e)
+                client.dns_cache.invalidate(urlparse(endpoint).hostname)
+                connection_errors += 1
+                duration = retry.next_delay(None) if connection_errors < 2 else None
+                if duration is None:
+                    retry.finish(None)
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise requests.exceptions.ReadTimeout(f"Read timed out: {_http_method} {endpoint}") from e
+                    raise requests.exceptions.ConnectionError(f"{e}: {_http_method} {endpoint}") from e
+            else:
+                client.instrumentation.after_request(record, response=response)
+                if not client.retry_policy.is_retryable(response):
+                    break  # Don't retry, either we passed or it's a hard fail.
+
+                client._rate_limit_exceeded(endpoint, _http_method)
+                duration = retry.next_delay(response)
+                if duration is None:
+                    break  # Out of attempts or out of time, fail with this response.
+
+            if client.trace:
+                print(f"Retrying after {duration:.1f}s, attempt {retry.attempts+1}: {_http_method} {endpoint}")
+            await asyncio.sleep(duration)
+
+        retry.finish(response)
+        return client._convert_response(response, _expected, _result_type)
+
+    @staticmethod
+    async def __request(session: Any,
+                        method: str,
+                        url: str,
+                        headers: Dict[str, str],
+                        timeout: Any,
+                        request_kwargs: Dict[str, Any]) -> requests.Response:
+        """Sends the request and buffers the reply into a requests.Response so that ApiClient can evaluate it."""
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+        from yarl import URL  # Installed with aiohttp
+
+        # Let requests encode the url so that the query string is byte-for-byte what ApiClient.api() would send.
+        prepared = requests.Request(method, url, params=request_kwargs.get("params")).prepare()
+
+        async with session.request(method, URL(prepared.url, encoded=True),
+                                   data=request_kwargs.get("data"),
+                                   headers=headers,
+                                   timeout=timeout) as reply:
+            content = await reply.read()
+
+            response = requests.Response()
+            response.status_code = reply.status
+            response.reason = reply.reason
+            response.headers = CaseInsensitiveDict(reply.headers)
+            response.encoding = get_encoding_from_headers(response.headers)
+            response.url = prepared.url
+            response.request = prepared
+            # noinspection PyProtectedMember
+            response._content = content
+            return response
@@ -7,7 +7,11 @@ __all__ = ["ApiContainer", "ApiClient", "DatabricksApiException",
 import requests
 from pprint import pformat
 from dbacademy.clients import ClientErrorHandler
-from typing import Any, Container, Dict, Type, TypeVar, Union, Optional
+from dbacademy.clients.rest.dns_cache import DnsCache
+from dbacademy.clients.rest.instrumentation import Instrumentation
+from dbacademy.clients.rest.rate_limiter import RateLimiter
+from dbacademy.clients.rest.retry_policy import RetryPolicy
+from typing import Any, BinaryIO, Container, Dict, Tuple, Type, TypeVar, Union, Optional
 
 try:
     from typing import Literal
@@ -61,7 +65,11 @@ class ApiClient(ApiContainer):
 
     dns_verify: bool = True
     dns_retry: bool = False
+    dns_cache: DnsCache = DnsCache()  # Shared by all clients in this process
     trace: bool = False
+    rate_limiter: Optional[RateLimiter] = RateLimiter()  # Shared by all clients in this process, None to disable
+    retry_policy: RetryPolicy = RetryPolicy()
+    instrumentation: Instrumentation = Instrumentation()  # Shared by all clients in this process
 
     def __init__(self,
                  endpoint: str,
@@ -216,6 +224,8 @@ class ApiClient(ApiContainer):
             _expected: HttpStatusCodes = None,
             _result_type: Type[HttpReturnType] = dict,
             _base_url: str = None,
+            _stream: bool = False,
+            _body: BinaryIO = None,
             **data: Any) -> HttpReturnType:
         """
         Invoke the Databricks REST API.
@@ -233,6 +243,10 @@ class ApiClient(ApiContainer):
                requests.Response: Return the HTTP response object.
                None: Return None.
             _base_url: Overrides self.endpoint, allowing alternative URL paths.
+            _stream: Defers downloading the body, for use with _result_type=requests.Response; the caller must then
+               consume the body, e.g. with Response.iter_content(), and close the response.
+            _body: A file sent as the request's body in place of _data, rewound before each attempt, so that payloads
+               too large to hold in memory can be spooled to disk.
             **data: Any kwargs are appended to the _data payload.  Values here take priority over values
                specified in _data.
 
@@ -242,7 +256,104 @@ class ApiClient(ApiContainer):
         Raises:
             requests.HTTPError: If the API returns an error and on_error='raise'.
         """
-        import json, time, math
+        import time
+        from urllib.parse import urlparse
+
+        endpoint, request_kwargs = self._prepare_request(_http_method, _endpoint_path, _data, _base_url, data)
+
+        if _body is not None:
+            request_kwargs["data"] = _body
+
+        if self.dns_verify:
+            self._verify_hostname(endpoint)
+
+        self._throttle_calls()
+
+        timeout = (self.connect_timeout, self.read_timeout)
+        connection_errors = 0
+        response = None  # Precluding warning
+        retry = self.retry_policy.begin(_http_method, endpoint, max_attempts=self.max_retries)
+
+        while True:
+            sleep_seconds = self._rate_limit_delay(endpoint, _http_method)
+            if sleep_seconds > 0:
+                time.sleep(sleep_seconds)
+
+            if _body is not None:
+                _body.seek(0)
+
+            if self.trace:
+                print(f"{_http_method} {endpoint}: {request_kwargs}")
+            retry.attempted()
+            record = self.instrumentation.before_request(_http_method, endpoint, request_kwargs, retry.attempts)
+
+            try:
+                response = self.session.request(_http_method, endpoint, timeout=timeout, stream=_stream, **request_kwargs)
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout) as e:
+                self.instrumentation.after_request(record, error=e)
+                self.dns_cache.invalidate(urlparse(endpoint).hostname)
+                connection_errors += 1
+                duration = retry.next_delay(None) if connection_errors < 2 else None
+                if duration is None:
+                    retry.finish(None)
+                    raise e
+            else:
+                self.instrumentation.after_request(record, response=response)
+                if not self.retry_policy.is_retryable(response):
+                    break  # Don't retry, either we passed or it's a hard fail.
+
+                self._rate_limit_exceeded(endpoint, _http_method)
+                duration = retry.next_delay(response)
+                if duration is None:
+                    break  # Out of attempts or out of time, fail with this response.
+
+                if _stream:
+                    response.close()  # Release the connection of the response we are abandoning.
+
+            if self.trace:
+                print(f"Retrying after {duration:.1f}s, attempt {retry.attempts+1}: {_http_method} {endpoint}")
+            time.sleep(duration)
+
+        retry.finish(response)
+        return self._convert_response(response, _expected, _result_type)
+
+    async def api_async(self,
+                        _http_method: HttpMethod,
+                        _endpoint_path: str,
+                        _data: Dict[str, Any] = None,
+                        *,
+                        _expected: HttpStatusCodes = None,
+                        _result_type: Type[HttpReturnType] = dict,
+                        _base_url: str = None,
+                        **data: Any) -> HttpReturnType:
+        """
+        Coroutine equivalent of :meth:`api`, multiplexed over the shared asyncio connection pool.
+
+        See :class:`dbacademy.clients.rest.async_client.AsyncApiClient` for details; the arguments, retry behavior
+        and return values are identical to those of :meth:`api`.
+        """
+        from dbacademy.clients.rest.async_client import AsyncApiClient
+
+        return await AsyncApiClient(self).api(_http_method, _endpoint_path, _data,
+                                              _expected=_expected,
+                                              _result_type=_result_type,
+                                              _base_url=_base_url,
+                                              **data)
+
+    def _prepare_request(self,
+                         _http_method: HttpMethod,
+                         _endpoint_path: str,
+                         _data: Optional[Dict[str, Any]],
+                         _base_url: Optional[str],
+                         data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Merges the payload and resolves the endpoint path against the base url.
+
+        Returns:
+            The fully qualified URL and the keyword arguments (either "params" or "data") to send with the request.
+        """
+        import json
         from urllib.parse import urljoin
 
         if _data is None:
@@ -254,69 +365,31 @@ class ApiClient(ApiContainer):
 
         _base_url: str = urljoin(self.endpoint, _base_url)
 
-        if self.dns_verify:
-            self._verify_hostname(_base_url)
-
-        self._throttle_calls()
-
         if _endpoint_path.startswith(_base_url):
             _endpoint_path = _endpoint_path[len(_base_url):]
 
         elif _endpoint_path.startswith("http"):
             raise ValueError(f"endpoint_path must be relative endpoint, not {_endpoint_path !r}.")
-        
-        endpoint = _base_url.rstrip("/") + "/" + _endpoint_path.lstrip("/")
-        timeout = (self.connect_timeout, self.read_timeout)
-        connection_errors = 0
 
-        verbose = False  # Enabling debug prints
-        response = None  # Precluding warning
-        attempts = 0     # Counter for debugging
-
-        for attempt in range(self.max_retries):
-            try:
-                if _http_method in ('GET', 'HEAD', 'OPTIONS'):
-                    params = {k: str(v).lower() if isinstance(v, bool) else v for k, v in _data.items()}
-                    if self.trace:
-                        print(f"{_http_method} {endpoint}: {params=}")
-                    response = self.session.request(_http_method, endpoint, params=params, timeout=timeout)
-                else:
-                    json_data = json.dumps(_data)
-                    if self.trace:
-                        print(f"{_http_method} {endpoint}: data={json_data}")
-                    response = self.session.request(_http_method, endpoint, data=json_data, timeout=timeout)
-
-                if response.status_code == 500:
-                    if "REQUEST_LIMIT_EXCEEDED" not in response.text:
-                        attempts = attempt
-                        break  # Don't retry, this is a hard fail, not rate-limited
-                elif response.status_code not in [429]:
-                    attempts = attempt
-                    break  # Don't retry, either we passed or it's a hard fail.
+        endpoint = _base_url.rstrip("/") + "/" + _endpoint_path.lstrip("/")
 
-            except requests.exceptions.ConnectionError as e:
-                connection_errors += 1
-                if connection_errors >= 2:
-                    raise e
-            except requests.exceptions.ReadTimeout as e:
-                connection_errors += 1
-                if connection_errors >= 2:
-                    raise e
+        if _http_method in ('GET', 'HEAD', 'OPTIONS'):
+            params = {k: str(v).lower() if isinstance(v, bool) else v for k, v in _data.items()}
+            return endpoint, {"params": params}
+        else:
+            return endpoint, {"data": json.dumps(_data)}
 
-            # Attempt 1=1s, 2=1s, 3=5s, 4=16s, 5=13s, etc...
-            duration = math.ceil(attempt * attempt / 2)
-            if verbose:
-                print(f"Retrying after {duration}s, attempt {attempt+1} of {self.max_retries+1}: {_http_method} {endpoint}")
-            time.sleep(duration)
+    def _convert_response(self,
+                          response: Optional[requests.Response],
+                          _expected: HttpStatusCodes,
+                          _result_type: Type[HttpReturnType]) -> HttpReturnType:
+        """Validates the final response and converts it to the requested _result_type."""
 
         if response is None:  # "None" should never happen
             raise Exception("Unexpected processing error; the final response was None")
         else:  # Always validate the final response
             self._raise_for_status(response, _expected)
 
-        if attempts > 0 and verbose:
-            print(f"Success after {attempts} reties")
-
         # TODO: Should we really return None on errors?  Kept for now for backwards compatibility.
         if not (200 <= response.status_code < 300):
             return None
@@ -343,38 +416,57 @@ class ApiClient(ApiContainer):
         """Verify the host for the url-endpoint exists.  Throws socket.gaierror if it does not."""
         import time
         from urllib.parse import urlparse
-        from socket import gethostbyname, gaierror
+        from socket import gaierror
         from requests.exceptions import ConnectionError
 
-        if not cls.dns_retry:
-            test_url = urlparse(test_url)
+        hostname = urlparse(test_url).hostname
+        retries = 10 if cls.dns_retry else 1
+        last_exception = None
+
+        for i in range(0, retries):
             try:
-                gethostbyname(test_url.hostname)
+                cls.dns_cache.resolve(hostname)
+                return
             except gaierror as e:
-                raise ConnectionError(f"""DNS lookup for hostname failed for "{test_url.hostname}".""") from e
-        else:
-            retries = 10
-            last_exception = None
-            test_url = urlparse(test_url)
-            for i in range(0, retries):
-                try:
-                    gethostbyname(test_url.hostname)
-                    return
-                except gaierror as e:
-                    last_exception = e
+                last_exception = e
+                if i + 1 < retries:
+                    cls.dns_cache.invalidate(hostname)  # We are waiting for the DNS entry to propagate
                     time.sleep(i*2)
-            raise ConnectionError(f"""DNS lookup for hostname failed for "{test_url.hostname}" after {retries} retries.""") from last_exception
+
+        if cls.dns_retry:
+            raise ConnectionError(f"""DNS lookup for hostname failed for "{hostname}" after {retries} retries.""") from last_exception
+        else:
+            raise ConnectionError(f"""DNS lookup for hostname failed for "{hostname}".""") from last_exception
 
     def _throttle_calls(self):
+        import time
+        sleep_seconds = self._throttle_delay()
+        if sleep_seconds > 0:
+            time.sleep(sleep_seconds)
+
+    def _throttle_delay(self) -> float:
+        """Reserves the next request slot, returning the number of seconds the caller must wait before using it."""
         if self.throttle_seconds <= 0:
-            return
+            return 0
         import time
         now = time.time()
         elapsed = now - self._last_request_timestamp
-        sleep_seconds = self.throttle_seconds - elapsed
-        if sleep_seconds > 0:
-            time.sleep(sleep_seconds)
-        self._last_request_timestamp = time.time()
+        sleep_seconds = max(0, self.throttle_seconds - elapsed)
+        self._last_request_timestamp = now + sleep_seconds
+        return sleep_seconds
+
+    def _rate_limit_delay(self, endpoint: str, http_method: HttpMethod) -> float:
+        """Reserves a request against the shared per-host rate limiter, returning the number of seconds to wait before sending it."""
+        if self.rate_limiter is None:
+            return 0
+        from urllib.parse import urlparse
+        return self.rate_limiter.reserve(urlparse(endpoint).hostname, http_method)
+
+    def _rate_limit_exceeded(self, endpoint: str, http_method: HttpMethod) -> None:
+        """Drains the shared per-host bucket so that every client backs off after the server rejects a request."""
+        if self.rate_limiter is not None:
+            from urllib.parse import urlparse
+            self.rate_limiter.penalize(urlparse(endpoint).hostname, http_method)
 
     @staticmethod
     def _raise_for_status(response: requests.Response, expected: Union[int, Container[int]] = None) -> None:
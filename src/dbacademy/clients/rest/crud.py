@@ -1,6 +1,7 @@
 __all__ = ["CRUD"]
 
-from typing import List
+import threading
+from typing import Dict, List, Optional, Tuple
 from abc import ABCMeta, abstractmethod
 from dbacademy.clients.rest.common import *
 
@@ -16,6 +17,8 @@ class CRUD(ApiContainer, metaclass=ABCMeta):
     * _update(item)
     * _delete(item_id)
     * _wrap(item)
+
+    Lookups by name re-list every item on each call unless the opt-in cache is enabled with enable_cache().
     """
 
     def __init__(self,
@@ -35,6 +38,9 @@ class CRUD(ApiContainer, metaclass=ABCMeta):
         self.plural = plural or self.singular + "s"
         self.id_key = id_key or noun + "_id"
         self.name_key = name_key or noun + "_name"
+        self.cache_ttl_seconds: Optional[float] = None  # None disables the cache, see enable_cache()
+        self.__cache_lock = threading.Lock()
+        self.__cache: Optional[Tuple[float, List[Item], Dict[ItemId, Item], Dict[str, Item], Dict[ItemId, Item]]] = None  # (expires, items, by id, by name, fetched by id)
         # Update doc strings, replacing placeholders with actual values.
         cls = type(self)
         methods = [attr for attr in dir(cls) if not attr.startswith("__") and callable(getattr(cls, attr))]
@@ -68,6 +74,77 @@ class CRUD(ApiContainer, metaclass=ABCMeta):
         """Perform API call"""
         pass
 
+    def enable_cache(self, ttl_seconds: float = 60) -> "CRUD":
+        """
+        Serve list and name lookups of {plural} from an index built by a single `_list()` call, rebuilt once
+        older than `ttl_seconds`.  Lookups by id still return the `_get()` form of the {singular}, which may hold more
+        than the listed form, but each id is fetched at most once per index.
+
+        Creates, updates and deletes made through this object invalidate the index.  Changes made by any other means
+        are seen only after `refresh()` or once the TTL expires.
+
+        Returns:
+            self, to allow chaining.
+        """
+        self.cache_ttl_seconds = ttl_seconds
+        self.invalidate()
+        return self
+
+    def disable_cache(self) -> None:
+        """Revert to re-listing {plural} for every lookup."""
+        self.cache_ttl_seconds = None
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Discard the cached {plural}, forcing the next lookup to re-list them."""
+        with self.__cache_lock:
+            self.__cache = None
+
+    def refresh(self) -> None:
+        """Rebuild the cached index of {plural} now."""
+        self.__refresh_cache()
+
+    def __refresh_cache(self) -> Tuple[float, List[Item], Dict[ItemId, Item], Dict[str, Item], Dict[ItemId, Item]]:
+        import time
+
+        items = self._list()
+        by_id = dict()
+        by_name = dict()
+        for item in items:
+            if (item_id := item.get(self.id_key)) is not None:
+                by_id[item_id] = item
+            if (item_name := item.get(self.name_key)) is not None:
+                by_name.setdefault(item_name, item)  # First found wins, as with an uncached lookup.
+
+        cache = (time.monotonic() + (self.cache_ttl_seconds or 0), items, by_id, by_name, dict())
+        with self.__cache_lock:
+            self.__cache = cache
+        return cache
+
+    def __cached(self) -> Optional[Tuple[float, List[Item], Dict[ItemId, Item], Dict[str, Item], Dict[ItemId, Item]]]:
+        """Returns a consistent snapshot of the cache, refreshing it if stale, or None if the cache is disabled."""
+        import time
+
+        if self.cache_ttl_seconds is None:
+            return None
+
+        cache = self.__cache
+        if cache is None or cache[0] <= time.monotonic():
+            cache = self.__refresh_cache()
+        return cache
+
+    def _cached_list(self) -> List[Item]:
+        """Returns the raw `_list()` result, from the cache if enabled."""
+        cache = self.__cached()
+        return self._list() if cache is None else cache[1]
+
+    def _cached_by_name(self, item_name: str) -> Optional[Item]:
+        """Returns the first raw item with `{name_key}`=`item_name`, from the cache if enabled."""
+        cache = self.__cached()
+        if cache is None:
+            return next((item for item in self._list() if item[self.name_key] == item_name), None)
+        return cache[3].get(item_name)
+
     # noinspection PyMethodMayBeStatic
     def _wrap(self, item: Item):
         """
@@ -119,14 +196,14 @@ class CRUD(ApiContainer, metaclass=ABCMeta):
     def list(self) -> List[Item]:
         """Returns a list of all {plural}."""
         from typing import Sequence
-        result = self._list()
+        result = self._cached_list()
         if not isinstance(result, Sequence):
             raise ValueError(f"Invalid response.  Expected list, found {result!r}")
         return [self._refresh(item) for item in result]
 
     def list_names(self) -> List[str]:
         """Returns a list the names of all {plural}."""
-        return [item[self.name_key] for item in self._list()]
+        return [item[self.name_key] for item in self._cached_list()]
 
     def get_by_id(self, item_id: ItemId, if_not_exists: IfNotExists = "error") -> Item:
         """
@@ -153,7 +230,17 @@ class CRUD(ApiContainer, metaclass=ABCMeta):
             expected = None
         else:
             raise ValueError("if_not_exists must be 'ignore' or 'error'")
-        item = self._get(item_id, _expected=expected)
+        cache = self.__cached()
+        if cache is None:
+            return self._refresh(self._get(item_id, _expected=expected))
+
+        # The listed form of some {plural} is smaller than their _get() form, only the latter is returned.
+        item = cache[4].get(item_id)
+        if item is None:
+            item = self._get(item_id, _expected=expected)
+            if item is not None:
+                with self.__cache_lock:
+                    cache[4][item_id] = item
         return self._refresh(item)
 
     def get_by_name(self, item_name: str, if_not_exists: IfNotExists = "error") -> Item:
@@ -174,7 +261,7 @@ class CRUD(ApiContainer, metaclass=ABCMeta):
         Raises:
             DatabricksApiException: If not found and `if_not_exists=="error"`.
         """
-        result = next((item for item in self._list() if item[self.name_key] == item_name), None)
+        result = self._cached_by_name(item_name)
 
         if result is None and if_not_exists == "error":
             raise DatabricksApiException(f"{self.singular} with name '{item_name}' not found", 404)
@@ -241,6 +328,7 @@ class CRUD(ApiContainer, metaclass=ABCMeta):
             existing = self.get_by_example(item, if_not_exists="ignore") if if_exists != "create" else None
         if existing is None:
             result = self._create(item)
+            self.invalidate()
             if isinstance(result, dict):
                 return self._refresh(result, fetch)
             else:
@@ -252,6 +340,7 @@ class CRUD(ApiContainer, metaclass=ABCMeta):
         if if_exists == "overwrite":
             self.delete_by_example(item)
             result = self._create(item)
+            self.invalidate()
             if isinstance(result, dict):
                 return self._refresh(result, fetch)
             else:
@@ -303,6 +392,7 @@ class CRUD(ApiContainer, metaclass=ABCMeta):
         else:
             raise ValueError("if_not_exists must be 'ignore' or 'error'")
         result = self._update(item, _expected=expected)
+        self.invalidate()
         if isinstance(str, dict):
             return self._refresh(result, fetch)
         else:
@@ -331,6 +421,7 @@ class CRUD(ApiContainer, metaclass=ABCMeta):
         else:
             raise ValueError("if_not_exists must be 'ignore' or 'error'")
         result = self._delete(item_id, _expected=expected)
+        self.invalidate()
         return result is not None
 
     def delete_by_name(self, item_name, if_not_exists: IfNotExists = "error"):
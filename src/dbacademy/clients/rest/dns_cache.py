@@ -0,0 +1,106 @@
+"""
+Process-wide hostname resolution cache used by ApiClient's hostname verification.
+"""
+from __future__ import annotations
+
+__all__ = ["DnsCache"]
+
+import threading
+from socket import gaierror
+from typing import Callable, Dict, Optional, Tuple, Union
+
+
+class DnsCache(object):
+    """
+    Caches the outcome of hostname lookups for `ttl_seconds`, and failed lookups (e.g. NXDOMAIN) for
+    `negative_ttl_seconds`, so that verifying a hostname costs one lookup per host per TTL instead of one per request.
+
+    Example:
+        ApiClient.dns_cache.invalidate("workspace.cloud.databricks.com")
+        print(ApiClient.dns_cache.hits, ApiClient.dns_cache.misses)
+    """
+
+    def __init__(self, *, ttl_seconds: float = 300, negative_ttl_seconds: float = 30, resolver: Callable[[str], str] = None):
+        """
+        Args:
+            ttl_seconds: How long a successful lookup is trusted.
+            negative_ttl_seconds: How long a failed lookup is remembered before trying again.
+            resolver: The lookup function, defaults to socket.gethostbyname.
+        """
+        from socket import gethostbyname
+
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.resolver = resolver or gethostbyname
+
+        self.__entries: Dict[str, Tuple[float, Union[str, gaierror]]] = dict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def __fresh(self, hostname: str) -> Optional[Union[str, gaierror]]:
+        import time
+
+        entry = self.__entries.get(hostname)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def resolved(self, hostname: str) -> bool:
+        """Returns True, counting a hit, if `hostname` has a fresh, successful lookup; never blocks on the network."""
+        hostname = (hostname or "").lower()
+        with self.__lock:
+            if isinstance(self.__fresh(hostname), str):
+                self.__hits += 1
+                return True
+            return False
+
+    def resolve(self, hostname: str) -> str:
+        """
+        Returns the address of `hostname`, looking it up only if no fresh entry is cached.
+
+        Raises:
+            socket.gaierror: If the lookup failed now or within the last `negative_ttl_seconds`.
+        """
+        import time
+
+        hostname = (hostname or "").lower()
+
+        with self.__lock:
+            cached = self.__fresh(hostname)
+            if cached is not None:
+                self.__hits += 1
+            else:
+                self.__misses += 1
+
+        if cached is None:
+            try:
+                cached = self.resolver(hostname)
+                ttl = self.ttl_seconds
+            except gaierror as e:
+                cached = e
+                ttl = self.negative_ttl_seconds
+
+            with self.__lock:
+                self.__entries[hostname] = (time.monotonic() + ttl, cached)
+
+        if isinstance(cached, gaierror):
+            raise gaierror(*cached.args)
+
+        return cached
+
+    def invalidate(self, hostname: str = None) -> None:
+        """Forgets the lookup for `hostname`, or for every hostname if not specified."""
+        with self.__lock:
+            if hostname is None:
+                self.__entries.clear()
+            else:
+                self.__entries.pop(hostname.lower(), None)
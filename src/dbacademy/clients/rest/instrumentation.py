@@ -0,0 +1,251 @@
+"""
+Request/response hooks for ApiClient and an aggregator reporting where REST time is spent.
+"""
+from __future__ import annotations
+
+__all__ = ["RequestRecord", "Instrumentation", "LatencyHistogram", "ApiMetrics", "endpoint_template"]
+
+import re
+import threading
+import requests
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Path segments that identify an instance rather than a resource type: numbers, GUIDs, long hex ids & usernames.
+_ID_SEGMENT = re.compile(r"^(\d+|[\da-fA-F]{8}-[\da-fA-F]{4}-[\da-fA-F]{4}-[\da-fA-F]{4}-[\da-fA-F]{12}|[\da-fA-F-]{16,}|[^/]*@[^/]*)$")
+
+
+def endpoint_template(url: str) -> str:
+    """
+    Reduces a request url to the template used to aggregate metrics, dropping the host and query string and
+    replacing instance ids, for example https://host/api/2.0/preview/scim/v2/Users/1234?x=y becomes
+    /api/2.0/preview/scim/v2/Users/{id}
+    """
+    from urllib.parse import urlparse
+    path = urlparse(url).path or "/"
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+class RequestRecord(object):
+    """A single HTTP attempt, as passed to the post-request hooks."""
+
+    def __init__(self, *, method: str, url: str, attempt: int, bytes_out: int):
+        import time
+
+        self.method = method
+        self.url = url
+        self.attempt = attempt
+        self.bytes_out = bytes_out
+        self.bytes_in = 0
+        self.status_code: Optional[int] = None
+        self.error: Optional[Exception] = None
+        self.elapsed_seconds = 0.0
+        self.started = time.perf_counter()
+
+    @property
+    def template(self) -> str:
+        return endpoint_template(self.url)
+
+    def __repr__(self):
+        return (f"RequestRecord(method={self.method!r}, url={self.url!r}, attempt={self.attempt}, status_code={self.status_code}, "
+                f"elapsed_seconds={self.elapsed_seconds:.3f}, bytes_out={self.bytes_out}, bytes_in={self.bytes_in}, error={self.error!r})")
+
+
+class Instrumentation(object):
+    """
+    Dispatches every HTTP attempt made by ApiClient to the registered hooks.
+
+    Pre-request hooks receive (method, url, attempt) just before the request is sent, post-request hooks receive the
+    completed RequestRecord.  When no hooks are registered the cost to ApiClient is a single attribute check.
+    """
+
+    def __init__(self):
+        self.__pre_request_hooks: Tuple[Callable[[str, str, int], None], ...] = tuple()
+        self.__post_request_hooks: Tuple[Callable[[RequestRecord], None], ...] = tuple()
+        self.__lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.__pre_request_hooks) > 0 or len(self.__post_request_hooks) > 0
+
+    def add_pre_request_hook(self, hook: Callable[[str, str, int], None]) -> None:
+        with self.__lock:
+            self.__pre_request_hooks += (hook,)
+
+    def remove_pre_request_hook(self, hook: Callable[[str, str, int], None]) -> None:
+        with self.__lock:
+            self.__pre_request_hooks = tuple(h for h in self.__pre_request_hooks if h != hook)
+
+    def add_post_request_hook(self, hook: Callable[[RequestRecord], None]) -> None:
+        with self.__lock:
+            self.__post_request_hooks += (hook,)
+
+    def remove_post_request_hook(self, hook: Callable[[RequestRecord], None]) -> None:
+        with self.__lock:
+            self.__post_request_hooks = tuple(h for h in self.__post_request_hooks if h != hook)
+
+    def before_request(self, method: str, url: str, request_kwargs: Dict[str, Any], attempt: int) -> Optional[RequestRecord]:
+        """Invokes the pre-request hooks, returning the record to pass to after_request() or None if disabled."""
+        if not self.enabled:
+            return None
+
+        for hook in self.__pre_request_hooks:
+            hook(method, url, attempt)
+
+        data = request_kwargs.get("data")
+        if isinstance(data, str):
+            bytes_out = len(data.encode())
+        elif hasattr(data, "seek"):
+            # A spooled body, see ApiClient.api(_body=...)
+            bytes_out = data.seek(0, 2)
+            data.seek(0)
+        else:
+            bytes_out = len(data) if data else 0
+
+        return RequestRecord(method=method, url=url, attempt=attempt, bytes_out=bytes_out)
+
+    def after_request(self, record: Optional[RequestRecord], *, response: requests.Response = None, error: Exception = None) -> None:
+        """Completes the record with the response or error and invokes the post-request hooks."""
+        import time
+
+        if record is None:
+            return
+
+        record.elapsed_seconds = time.perf_counter() - record.started
+        record.error = error
+        if response is not None:
+            record.status_code = response.status_code
+            if getattr(response, "_content", None) is False:
+                # A streamed body not read yet, reading it here would defeat the streaming; size it from the header instead.
+                content_length = response.headers.get("Content-Length")
+                record.bytes_in = int(content_length) if content_length and content_length.isdigit() else 0
+            else:
+                record.bytes_in = len(response.content or b"")
+
+        for hook in self.__post_request_hooks:
+            hook(record)
+
+
+class LatencyHistogram(object):
+    """Log-bucketed latency histogram; percentiles are accurate to within about 2.5% using constant memory."""
+
+    GROWTH = 1.05
+    MIN_SECONDS = 0.0001
+
+    def __init__(self):
+        self.__buckets: Dict[int, int] = dict()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds: float) -> None:
+        import math
+        index = math.ceil(math.log(max(seconds, self.MIN_SECONDS) / self.MIN_SECONDS, self.GROWTH))
+        self.__buckets[index] = self.__buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Returns the latency, in seconds, below which `percent` of the samples fall."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(round(self.count * percent / 100.0)))
+        seen = 0
+        for index in sorted(self.__buckets):
+            seen += self.__buckets[index]
+            if seen >= rank:
+                # Report the bucket's midpoint, never more than the slowest sample.
+                return min(self.max_seconds, self.MIN_SECONDS * self.GROWTH ** (index - 0.5))
+        return self.max_seconds
+
+
+class ApiMetrics(object):
+    """
+    Aggregates RequestRecords per (method, endpoint template): latency percentiles, bytes in/out, errors, retries and
+    429s.  Use as a context manager to record every request made by any ApiClient for the duration of a run.
+
+    Example:
+        with ApiMetrics() as metrics:
+            workspace_setup.create_workspaces(...)
+        metrics.print_summary()
+    """
+
+    def __init__(self, instrumentation: Instrumentation = None):
+        """
+        Args:
+            instrumentation: The hooks to attach to when used as a context manager, defaults to ApiClient.instrumentation
+        """
+        self.__instrumentation = instrumentation
+        self.__lock = threading.Lock()
+        self.__endpoints: Dict[Tuple[str, str], Dict[str, Any]] = dict()
+
+    def __enter__(self) -> ApiMetrics:
+        self.instrumentation.add_post_request_hook(self.record)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.instrumentation.remove_post_request_hook(self.record)
+
+    @property
+    def instrumentation(self) -> Instrumentation:
+        if self.__instrumentation is None:
+            from dbacademy.clients.rest.common import ApiClient
+            self.__instrumentation = ApiClient.instrumentation
+        return self.__instrumentation
+
+    def record(self, record: RequestRecord) -> None:
+        """A post-request hook aggregating the record."""
+        key = (record.method, record.template)
+        with self.__lock:
+            stats = self.__endpoints.get(key)
+            if stats is None:
+                stats = {"latency": LatencyHistogram(), "errors": 0, "retries": 0, "throttled": 0, "bytes_out": 0, "bytes_in": 0}
+                self.__endpoints[key] = stats
+
+            stats["latency"].add(record.elapsed_seconds)
+            stats["bytes_out"] += record.bytes_out
+            stats["bytes_in"] += record.bytes_in
+            if record.attempt > 1:
+                stats["retries"] += 1
+            if record.status_code == 429:
+                stats["throttled"] += 1
+            if record.error is not None or (record.status_code or 0) >= 400:
+                stats["errors"] += 1
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Returns one row per endpoint template, slowest total wall-clock time first."""
+        rows = list()
+        with self.__lock:
+            for (method, template), stats in self.__endpoints.items():
+                latency: LatencyHistogram = stats["latency"]
+                rows.append({
+                    "method": method,
+                    "endpoint": template,
+                    "count": latency.count,
+                    "total_seconds": round(latency.total_seconds, 3),
+                    "p50": round(latency.percentile(50), 3),
+                    "p95": round(latency.percentile(95), 3),
+                    "p99": round(latency.percentile(99), 3),
+                    "max": round(latency.max_seconds, 3),
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "throttled": stats["throttled"],
+                    "bytes_out": stats["bytes_out"],
+                    "bytes_in": stats["bytes_in"],
+                })
+        return sorted(rows, key=lambda r: r["total_seconds"], reverse=True)
+
+    def to_json(self, indent: int = 2) -> str:
+        import json
+        return json.dumps(self.summary(), indent=indent)
+
+    def print_summary(self, limit: int = 25) -> None:
+        """Prints the `limit` endpoints that consumed the most wall-clock time."""
+        rows = self.summary()
+        print(f"{'Count':>7} {'Total(s)':>9} {'p50':>7} {'p95':>7} {'p99':>7} {'Errors':>6} {'Retry':>5} {'429':>5} {'KB Out':>8} {'KB In':>9}  Endpoint")
+        for row in rows[:limit]:
+            print(f"{row['count']:>7} {row['total_seconds']:>9.1f} {row['p50']:>7.3f} {row['p95']:>7.3f} {row['p99']:>7.3f} "
+                  f"{row['errors']:>6} {row['retries']:>5} {row['throttled']:>5} {row['bytes_out']/1024:>8.1f} {row['bytes_in']/1024:>9.1f}  "
+                  f"{row['method']} {row['endpoint']}")
+        if len(rows) > limit:
+            print(f"...and {len(rows)-limit} more endpoints.")
@@ -0,0 +1,68 @@
+"""
+Lazy pagination shared by the list APIs of the REST clients.
+"""
+from __future__ import annotations
+
+__all__ = ["iter_pages"]
+
+from typing import Any, Callable, Iterator, List, Optional, Tuple, TypeVar
+
+Cursor = TypeVar("Cursor")
+PageFetcher = Callable[[Cursor], Tuple[List[Any], Optional[Cursor]]]
+
+_END_OF_PAGES = object()
+
+
+def iter_pages(fetch_page: PageFetcher, cursor: Cursor, *, prefetch: bool = False) -> Iterator[Any]:
+    """
+    Yields every item of every page, requesting pages only as they are needed.
+
+    Args:
+        fetch_page: Given a cursor, returns the page's items and the cursor of the next page or None if it was the last.
+        cursor: The cursor of the first page, e.g. an offset, page number or page token.
+        prefetch: If True, the next page is fetched on a background thread while the caller consumes the current one.
+            At most one page is fetched ahead of the caller and fetching stops as soon as the generator is closed.
+    """
+    if not prefetch:
+        while cursor is not None:
+            items, cursor = fetch_page(cursor)
+            yield from items
+        return
+
+    from queue import Queue, Full
+    from threading import Event, Thread
+
+    pages = Queue(maxsize=1)
+    stopped = Event()
+
+    def offer(value: Any) -> bool:
+        while not stopped.is_set():
+            try:
+                pages.put(value, timeout=0.1)
+                return True
+            except Full:
+                pass  # The caller hasn't finished the current page, wait for it.
+        return False
+
+    def produce(next_cursor: Cursor) -> None:
+        try:
+            while next_cursor is not None:
+                items, next_cursor = fetch_page(next_cursor)
+                if not offer(items):
+                    return  # The caller abandoned the generator.
+            offer(_END_OF_PAGES)
+        except Exception as e:
+            offer(e)
+
+    Thread(target=produce, args=(cursor,), daemon=True).start()
+
+    try:
+        while True:
+            page = pages.get()
+            if page is _END_OF_PAGES:
+                return
+            elif isinstance(page, Exception):
+                raise page
+            yield from page
+    finally:
+        stopped.set()
@@ -0,0 +1,115 @@
+"""
+Process-wide, per-host request pacing shared by every ApiClient.
+"""
+from __future__ import annotations
+
+__all__ = ["TokenBucket", "RateLimiter"]
+
+import threading
+from typing import Dict, Optional, Tuple
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class TokenBucket(object):
+    """
+    A thread-safe token bucket refilled at `rate` tokens per second up to a maximum of `burst` tokens.
+
+    Callers reserve tokens and are told how long to wait before using them rather than being blocked here,
+    allowing the same bucket to pace both threads (time.sleep) and coroutines (asyncio.sleep).
+    """
+
+    def __init__(self, rate: float, burst: int):
+        import time
+
+        if rate <= 0:
+            raise ValueError(f"The parameter 'rate' must be greater than zero, found {rate}.")
+        if burst < 1:
+            raise ValueError(f"The parameter 'burst' must be at least one, found {burst}.")
+
+        self.__rate = float(rate)
+        self.__burst = burst
+        self.__tokens = float(burst)
+        self.__timestamp = time.monotonic()
+        self.__lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.__rate
+
+    @property
+    def burst(self) -> int:
+        return self.__burst
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Takes `tokens` from the bucket, returning the number of seconds the caller must wait before using them."""
+        import time
+
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.__burst, self.__tokens + (now - self.__timestamp) * self.__rate)
+            self.__timestamp = now
+            self.__tokens -= tokens
+            return 0 if self.__tokens >= 0 else -self.__tokens / self.__rate
+
+    def drain(self) -> None:
+        """Empties the bucket, for example after the server reports that we exceeded its limit anyway."""
+        import time
+
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(0.0, self.__tokens + (now - self.__timestamp) * self.__rate)
+            self.__timestamp = now
+
+
+class RateLimiter(object):
+    """
+    Paces requests per hostname with separate token buckets for read (GET, HEAD, OPTIONS) and mutating verbs.
+
+    Buckets are created on first use from the default QPS and burst unless the hostname was explicitly configured.
+
+    Example:
+        ApiClient.rate_limiter.configure("accounts.cloud.databricks.com", read_qps=5, write_qps=2)
+        ApiClient.rate_limiter = None  # Disable pacing altogether
+    """
+
+    def __init__(self, *, read_qps: float = 25, read_burst: int = 50, write_qps: float = 10, write_burst: int = 20):
+        self.read_qps = read_qps
+        self.read_burst = read_burst
+        self.write_qps = write_qps
+        self.write_burst = write_burst
+
+        self.__buckets: Dict[Tuple[str, bool], TokenBucket] = dict()
+        self.__lock = threading.Lock()
+
+    def configure(self, hostname: str, *,
+                  read_qps: float = None,
+                  read_burst: int = None,
+                  write_qps: float = None,
+                  write_burst: int = None) -> None:
+        """Replaces the buckets for `hostname`; unspecified values fall back to this limiter's defaults."""
+        hostname = hostname.lower()
+        with self.__lock:
+            self.__buckets[(hostname, True)] = TokenBucket(read_qps or self.read_qps, read_burst or self.read_burst)
+            self.__buckets[(hostname, False)] = TokenBucket(write_qps or self.write_qps, write_burst or self.write_burst)
+
+    def bucket(self, hostname: Optional[str], http_method: str) -> TokenBucket:
+        """Returns the bucket governing `http_method` requests against `hostname`, creating it as necessary."""
+        key = ((hostname or "").lower(), http_method.upper() in READ_METHODS)
+
+        bucket = self.__buckets.get(key)
+        if bucket is None:
+            with self.__lock:
+                bucket = self.__buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(self.read_qps, self.read_burst) if key[1] else TokenBucket(self.write_qps, self.write_burst)
+                    self.__buckets[key] = bucket
+        return bucket
+
+    def reserve(self, hostname: Optional[str], http_method: str) -> float:
+        """Reserves one request, returning the number of seconds the caller must wait before sending it."""
+        return self.bucket(hostname, http_method).reserve()
+
+    def penalize(self, hostname: Optional[str], http_method: str) -> None:
+        """Reports that the server rejected a request for exceeding its rate limit."""
+        self.bucket(hostname, http_method).drain()
@@ -0,0 +1,189 @@
+"""
+Pluggable retry/backoff strategy used by ApiClient and AsyncApiClient.
+"""
+from __future__ import annotations
+
+__all__ = ["RetryPolicy", "RetryState", "RetryStats"]
+
+import requests
+from typing import Callable, Optional
+
+
+class RetryStats(object):
+    """The retry history of a single request, as reported to RetryPolicy.metrics_hook."""
+
+    def __init__(self, *, method: str, url: str, attempts: int, retries: int, sleep_seconds: float, status_code: Optional[int], exhausted: bool):
+        self.__method = method
+        self.__url = url
+        self.__attempts = attempts
+        self.__retries = retries
+        self.__sleep_seconds = sleep_seconds
+        self.__status_code = status_code
+        self.__exhausted = exhausted
+
+    @property
+    def method(self) -> str:
+        return self.__method
+
+    @property
+    def url(self) -> str:
+        return self.__url
+
+    @property
+    def attempts(self) -> int:
+        """The number of requests actually sent."""
+        return self.__attempts
+
+    @property
+    def retries(self) -> int:
+        return self.__retries
+
+    @property
+    def sleep_seconds(self) -> float:
+        """The total time spent sleeping between attempts."""
+        return self.__sleep_seconds
+
+    @property
+    def status_code(self) -> Optional[int]:
+        """The status code of the final response or None if no response was received."""
+        return self.__status_code
+
+    @property
+    def exhausted(self) -> bool:
+        """True if the request was abandoned because the attempt limit or retry budget was used up."""
+        return self.__exhausted
+
+    def __repr__(self):
+        return (f"RetryStats(method={self.method!r}, url={self.url!r}, attempts={self.attempts}, retries={self.retries}, "
+                f"sleep_seconds={self.sleep_seconds:.3f}, status_code={self.status_code}, exhausted={self.exhausted})")
+
+
+class RetryPolicy(object):
+    """
+    Decides which responses are retried and how long to wait before doing so.
+
+    Rate-limited responses (429, 503 and 500 with REQUEST_LIMIT_EXCEEDED) are retried.  The wait honours the server's
+    Retry-After header when present and otherwise uses "decorrelated jitter" exponential backoff, so that many threads
+    rejected at the same moment do not all come back at the same moment.  A request is abandoned once it has made
+    `max_attempts` attempts or when the next sleep would take it beyond `max_total_seconds` of accumulated sleep.
+
+    Example:
+        ApiClient.retry_policy = RetryPolicy(max_total_seconds=60, metrics_hook=lambda stats: print(stats))
+    """
+
+    def __init__(self, *,
+                 max_attempts: int = None,
+                 base_seconds: float = 1.0,
+                 max_seconds: float = 60.0,
+                 max_total_seconds: float = 300.0,
+                 metrics_hook: Callable[[RetryStats], None] = None):
+        """
+        Args:
+            max_attempts: The maximum number of attempts per request, defaulting to the client's max_retries.
+            base_seconds: The minimum sleep between attempts.
+            max_seconds: The maximum sleep between attempts, excluding a server-specified Retry-After.
+            max_total_seconds: The maximum accumulated sleep per request.
+            metrics_hook: Invoked with the RetryStats of every completed request that was retried at least once.
+        """
+        self.max_attempts = max_attempts
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.max_total_seconds = max_total_seconds
+        self.metrics_hook = metrics_hook
+
+    # noinspection PyMethodMayBeStatic
+    def is_retryable(self, response: requests.Response) -> bool:
+        """Returns True if the response indicates that we were rate limited and should try again."""
+        if response.status_code == 500:
+            return "REQUEST_LIMIT_EXCEEDED" in response.text  # Otherwise this is a hard fail, not rate-limited
+        return response.status_code in (429, 503)
+
+    @staticmethod
+    def retry_after(response: Optional[requests.Response]) -> Optional[float]:
+        """Returns the number of seconds requested by the Retry-After header, or None if absent or invalid."""
+        from email.utils import parsedate_to_datetime
+        from datetime import datetime, timezone
+
+        value = None if response is None else response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def backoff(self, previous_seconds: float) -> float:
+        """Returns the next decorrelated-jitter sleep given the previous one."""
+        import random
+        return min(self.max_seconds, random.uniform(self.base_seconds, max(self.base_seconds, previous_seconds * 3)))
+
+    def begin(self, method: str, url: str, *, max_attempts: int) -> RetryState:
+        """Starts tracking a new request; max_attempts is used unless this policy specifies its own."""
+        return RetryState(self, method, url, self.max_attempts or max_attempts)
+
+
+class RetryState(object):
+    """Tracks the attempts of one request against its RetryPolicy."""
+
+    def __init__(self, policy: RetryPolicy, method: str, url: str, max_attempts: int):
+        self.__policy = policy
+        self.__method = method
+        self.__url = url
+        self.__max_attempts = max_attempts
+        self.__attempts = 0
+        self.__sleep_seconds = 0.0
+        self.__previous_seconds = policy.base_seconds
+        self.__exhausted = False
+
+    @property
+    def attempts(self) -> int:
+        return self.__attempts
+
+    @property
+    def sleep_seconds(self) -> float:
+        return self.__sleep_seconds
+
+    def attempted(self) -> None:
+        """Records that a request was sent (whether it succeeded, failed or never received a response)."""
+        self.__attempts += 1
+
+    def next_delay(self, response: Optional[requests.Response]) -> Optional[float]:
+        """
+        Returns the number of seconds to sleep before the next attempt, or None if the request should be abandoned.
+
+        Args:
+            response: The retryable response, or None if the previous attempt failed to connect.
+        """
+        policy = self.__policy
+
+        if self.__attempts >= self.__max_attempts:
+            self.__exhausted = True
+            return None
+
+        delay = policy.retry_after(response)
+        if delay is None:
+            delay = policy.backoff(self.__previous_seconds)
+            self.__previous_seconds = delay
+
+        if self.__sleep_seconds + delay > policy.max_total_seconds:
+            self.__exhausted = True
+            return None
+
+        self.__sleep_seconds += delay
+        return delay
+
+    def finish(self, response: Optional[requests.Response]) -> None:
+        """Reports this request's statistics to the policy's metrics hook."""
+        hook = self.__policy.metrics_hook
+        if hook is not None and self.__attempts > 1:
+            hook(RetryStats(method=self.__method,
+                            url=self.__url,
+                            attempts=self.__attempts,
+                            retries=self.__attempts - 1,
+                            sleep_seconds=self.__sleep_seconds,
+                            status_code=None if response is None else response.status_code,
+                            exhausted=self.__exhausted))
@@ -0,0 +1,113 @@
+"""
+Concurrent traversal of the workspace tree shared by the REST clients.
+"""
+from __future__ import annotations
+
+__all__ = ["walk_tree"]
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+Entry = Dict[str, Any]
+DirectoryLister = Callable[[str], Optional[Iterable[Entry]]]
+
+_END_OF_DIRECTORY = object()
+
+
+def _is_directory(entry: Entry) -> bool:
+    return entry.get("object_type") == "DIRECTORY"
+
+
+def walk_tree(list_dir: DirectoryLister,
+              entries: Iterable[Entry],
+              *,
+              object_types: Iterable[str] = None,
+              max_depth: int = None,
+              max_workers: int = 8) -> Iterator[Entry]:
+    """
+    Yields the given entries and, recursively, the contents of every directory among them in depth-first pre-order,
+    i.e. each directory immediately followed by its contents, so the order is the same as that of a serial recursive walk.
+
+    While the caller consumes the tree, the directories discovered so far are listed ahead of it on a pool of threads,
+    breadth-first, so that sibling directories are listed concurrently instead of one round trip at a time.  Each listing
+    made ahead takes a slot of the process-wide FleetExecutor.limiter; when none is spare, e.g. while walking the trees of
+    many users at once, directories are simply listed as the caller reaches them.
+
+    Args:
+        list_dir: Given a directory's path, returns its entries, or None if it no longer exists.
+        entries: The entries of the directory at which to start, those at depth 1.
+        object_types: The object types to yield, e.g. ["NOTEBOOK"], or None for all. Directories are traversed even when
+            they are not yielded; the list API has no server-side filter, so entries are filtered as they are received.
+        max_depth: The depth of the deepest entries to yield, 1 yielding the given entries only, None for no limit.
+        max_workers: The maximum number of directories listed concurrently, which also bounds the number of listings
+            held ahead of the caller to twice this number.
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+    from dbacademy.common import FleetExecutor
+
+    limiter = FleetExecutor.limiter
+
+    object_types = None if object_types is None else set(object_types)
+    max_listings = max(1, max_workers) * 2
+
+    listings = dict()   # The path of each directory listed ahead of the caller & its future
+    requested = set()   # The path of every directory listed, so that none is listed twice
+    discovered = deque()  # The directories to list ahead of the caller, in the order they were found
+
+    def expandable(entry: Entry, depth: int) -> bool:
+        return _is_directory(entry) and (max_depth is None or depth < max_depth)
+
+    def discover(children: List[Entry], depth: int) -> None:
+        discovered.extend(c.get("path") for c in children if expandable(c, depth))
+
+    def list_ahead() -> None:
+        while discovered and len(listings) < max_listings:
+            if discovered[0] in requested:
+                discovered.popleft()
+            elif limiter.try_acquire(None, None):
+                path = discovered.popleft()
+                requested.add(path)
+                listings[path] = executor.submit(limiter.run, None, list_dir, path)
+            else:
+                break  # No spare capacity in this process, the caller's own thread lists the directory when it gets there.
+
+    def list_now(path: str) -> List[Entry]:
+        future = listings.pop(path, None)
+        if future is not None:
+            children = future.result()
+        else:
+            # Not listed ahead of us, either because it was just found or because the buffer is full.
+            requested.add(path)
+            children = list_dir(path)
+
+        return list(children or [])
+
+    entries = list(entries)
+    stack = [(iter(entries), 1)]
+    discover(entries, 1)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="walk-tree")
+    try:
+        while stack:
+            list_ahead()
+
+            siblings, depth = stack[-1]
+            entry = next(siblings, _END_OF_DIRECTORY)
+
+            if entry is _END_OF_DIRECTORY:
+                stack.pop()
+                continue
+
+            if object_types is None or entry.get("object_type") in object_types:
+                yield entry
+
+            if expandable(entry, depth):
+                children = list_now(entry.get("path"))
+                discover(children, depth + 1)
+                stack.append((iter(children), depth + 1))
+    finally:
+        # The caller either finished or abandoned the walk, don't list anything else for it.
+        for future in listings.values():
+            if future.cancel():
+                limiter.release(None)  # Never started, so its slot was not released by limiter.run()
+        executor.shutdown(wait=False)
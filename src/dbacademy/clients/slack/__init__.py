@@ -1,6 +1,6 @@
 __all__ = ["SlackThread", "from_args", "GOOD", "WARNING", "DANGER"]
 
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Callable
 from dbacademy.common import validate
 
 
@@ -34,8 +34,17 @@ MENTIONS = Mentions()
 
 
 class SlackThread(object):
+    """
+    Posts messages to a single Slack thread, keeping a summary of its warnings, errors and exceptions in its first message.
 
-    def __init__(self, channel: str, username: str, access_token: str, mentions: Optional[Union[str, Mention, List[str]]]):
+    When asynchronous, messages are sent in order by a background thread so that callers never wait on Slack: the send_*
+    methods then return the response to the previous message, if any, and a burst of warnings or errors costs a single
+    chat.update of the first message.  Call flush() to wait for delivery; pending messages are otherwise sent at exit.
+    """
+
+    MAX_ATTEMPTS = 120
+
+    def __init__(self, channel: str, username: str, access_token: str, mentions: Optional[Union[str, Mention, List[str]]], asynchronous: bool = False):
         self.thread_ts = None
         self.initial_attachments = list()
         self.last_response: Optional[Dict[str, Any]] = None
@@ -52,32 +61,57 @@ class SlackThread(object):
         self.errors = 0
         self.exceptions = 0
 
+        self.__session = None
+        self.__queue = None
+
+        if asynchronous:
+            from dbacademy.common import BackgroundQueue
+            self.__queue = BackgroundQueue(f"Slack {channel}")
+
+    @property
+    def asynchronous(self) -> bool:
+        return self.__queue is not None
+
+    def flush(self, timeout_seconds: float = None) -> bool:
+        """Blocks until every message has been sent, returning False if `timeout_seconds` elapsed first."""
+        return True if self.__queue is None else self.__queue.flush(timeout_seconds)
+
+    def close(self) -> None:
+        """Sends the pending messages and releases the HTTP session."""
+        if self.__queue is not None:
+            self.__queue.close()
+
+        if self.__session is not None:
+            self.__session.close()
+            self.__session = None
+
+    def __submit(self, function: Callable[[], Any], key: str = None) -> None:
+        if self.__queue is None:
+            function()
+        else:
+            self.__queue.submit(function, key=key)
+
     def send_msg(self, message: str, reply_broadcast: bool = False, *, mentions: Union[str, Mention, List[str]] = None) -> Dict[str, Any]:
         encoded_message = self.__encode(message)
-        json_payload = self._chat_payload(reply_broadcast, GOOD, encoded_message, attachments=None, mentions=mentions)
-        self.__send(json_payload)
+        self.__submit(lambda: self.__send(self._chat_payload(reply_broadcast, GOOD, encoded_message, attachments=None, mentions=mentions)))
 
         return self.last_response
 
     def send_warning(self, message: str, reply_broadcast: bool = False, *, mentions: Union[str, Mention, List[str]] = None) -> Dict[str, Any]:
         encoded_message = self.__encode(message)
-        json_payload = self._chat_payload(reply_broadcast, WARNING, encoded_message, attachments=None, mentions=mentions)
-        self.__send(json_payload)
+        self.__submit(lambda: self.__send(self._chat_payload(reply_broadcast, WARNING, encoded_message, attachments=None, mentions=mentions)))
 
         self.warnings += 1
-        message, color = self._rebuild_first_message()
-        self._update_first_msg(color, self.__encode(message))
+        self.__submit(self.__update_summary, key="summary")
 
         return self.last_response
 
     def send_error(self, message: str, reply_broadcast: bool = False, *, mentions: Union[str, Mention, List[str]] = None) -> Dict[str, Any]:
         encoded_message = self.__encode(message)
-        json_payload = self._chat_payload(reply_broadcast, DANGER, encoded_message, attachments=None, mentions=mentions)
-        self.__send(json_payload)
+        self.__submit(lambda: self.__send(self._chat_payload(reply_broadcast, DANGER, encoded_message, attachments=None, mentions=mentions)))
 
         self.errors += 1
-        message, color = self._rebuild_first_message()
-        self._update_first_msg(color, self.__encode(message))
+        self.__submit(self.__update_summary, key="summary")
 
         return self.last_response
 
@@ -91,16 +125,18 @@ class SlackThread(object):
         if str(error_msg).strip() != "NoneType: None":
             message += "\n```{}```".format(error_msg)
 
-        json_payload = self._chat_payload(reply_broadcast, DANGER, message, attachments=None, mentions=mentions)
-
-        self.__send(json_payload)
+        self.__submit(lambda: self.__send(self._chat_payload(reply_broadcast, DANGER, message, attachments=None, mentions=mentions)))
 
         self.exceptions += 1
-        message, color = self._rebuild_first_message()
-        self._update_first_msg(color, self.__encode(message))
+        self.__submit(self.__update_summary, key="summary")
 
         return self.last_response
 
+    def __update_summary(self) -> None:
+        # Rebuilt when sent, so one update reflects every warning, error and exception counted until then.
+        message, color = self._rebuild_first_message()
+        self._update_first_msg(color, self.__encode(message))
+
     def _update_first_msg(self, level: Level, message: str):
         encoded_message = self.__encode(message)
         json_payload = self._update_payload(level, encoded_message, self.initial_attachments)
@@ -135,25 +171,32 @@ class SlackThread(object):
             "Authorization": f"Bearer {self.access_token}"
         }
 
-    def __send(self, json_payload: Dict[str, Any], post: bool = True, attempts: int = 1) -> Dict[str, Any]:
-        import time
+    @property
+    def session(self):
+        """The HTTP session shared by every message, reusing its connection to Slack."""
         import requests
 
-        if attempts > 120:
-            print("Failed to send Slack message after 120 attempts")
-        elif attempts > 1:
-            time.sleep(1)
+        if self.__session is None:
+            self.__session = requests.Session()
+        return self.__session
 
-        url = "https://slack.com/api/chat.postMessage" if post else "https://slack.com/api/chat.update"
+    def __send(self, json_payload: Dict[str, Any], post: bool = True) -> Dict[str, Any]:
+        import time
 
-        response = requests.post(
-            url,
-            headers=self.__headers(),
-            json=json_payload)
+        url = "https://slack.com/api/chat.postMessage" if post else "https://slack.com/api/chat.update"
 
-        if response.status_code == 429:
-            return self.__send(json_payload, post, attempts+1)
-        elif response.status_code != 200:
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            response = self.session.post(url, headers=self.__headers(), json=json_payload)
+            if response.status_code != 429:
+                break
+            elif attempt < self.MAX_ATTEMPTS:
+                # Rate limited, Slack specifies how long to back off for.
+                time.sleep(float(response.headers.get("Retry-After", 1)))
+        else:
+            print(f"Failed to send Slack message after {self.MAX_ATTEMPTS} attempts")
+            return self.last_response
+
+        if response.status_code != 200:
             raise Exception("Unexpected response ({}):\n{}".format(response.status_code, response.text))
 
         # Slack reports 200 even when it actually isn't...
@@ -254,12 +297,14 @@ def from_args(*,
               channel: str,
               username: str,
               access_token: str,
-              mentions: Union[str, Mention, List[str]] = None):
+              mentions: Union[str, Mention, List[str]] = None,
+              asynchronous: bool = False):
 
     return SlackThread(channel=channel,
                        username=username,
                        access_token=access_token,
-                       mentions=mentions)
+                       mentions=mentions,
+                       asynchronous=asynchronous)
 
 
 def from_environment(*,
@@ -267,11 +312,13 @@ def from_environment(*,
                      channel: str,
                      username: str,
                      access_token: str = None,
-                     mentions: Union[str, Mention, List[str]] = None):
+                     mentions: Union[str, Mention, List[str]] = None,
+                     asynchronous: bool = False):
     import os
     scope = "SLACK"
 
     return SlackThread(channel=channel,
                        username=username,
                        access_token=access_token or os.environ.get(f"{scope}_TOKEN") or os.environ.get("TOKEN"),
-                       mentions=mentions)
+                       mentions=mentions,
+                       asynchronous=asynchronous)
@@ -4,10 +4,13 @@ This was moved out of dbgems because dbgems has a dependency on pyspark.
 """
 from __future__ import annotations
 
-__all__ = ["deprecation_log_level", "deprecated", "overrides", "print_title", "print_warning", "CachedStaticProperty", "clean_string", "load_databricks_cfg", "Cloud"]
+__all__ = ["deprecation_log_level", "deprecated", "overrides", "print_title", "print_warning", "CachedStaticProperty", "clean_string", "load_databricks_cfg", "Cloud", "TaskGraph", "TaskResult", "FleetExecutor", "FleetLimiter", "FleetProgress", "BackgroundQueue"]
 
 from typing import Callable
 from dbacademy.common.cloud_class import Cloud
+from dbacademy.common.task_graph_class import TaskGraph, TaskResult
+from dbacademy.common.fleet_executor_class import FleetExecutor, FleetLimiter, FleetProgress
+from dbacademy.common.background_queue_class import BackgroundQueue
 
 deprecation_log_level = "error"
 
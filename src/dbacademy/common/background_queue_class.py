@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+__all__ = ["BackgroundQueue"]
+
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, List, Optional
+
+
+class BackgroundQueue(object):
+    """
+    Runs functions, in the order submitted, on a single background thread so that the caller never waits on them.
+
+    A function submitted with a key replaces any function with the same key that has not started yet, coalescing bursts
+    of updates to the same thing (e.g. the same chat message) into a single call.  Functions still queued when the
+    interpreter exits are run before it does; use flush() to wait for them sooner.
+
+    Example:
+        queue = BackgroundQueue("slack")
+        queue.submit(lambda: post(message))
+        queue.submit(lambda: update(summary), key="summary")
+        queue.flush()
+    """
+
+    def __init__(self, name: str = "background-queue", *, on_error: Callable[[Exception], None] = None):
+        """
+        Args:
+            name: The name of the background thread.
+            on_error: Invoked, on the background thread, with any exception raised by a function; printed by default.
+        """
+        import atexit
+
+        self.name = name
+        self.on_error = on_error
+        self.__condition = threading.Condition()
+        self.__pending: Deque[List] = deque()
+        self.__keyed: Dict[Hashable, List] = dict()
+        self.__busy = False
+        self.__closed = False
+        self.__thread: Optional[threading.Thread] = None
+
+        atexit.register(self.close)
+
+    def __len__(self) -> int:
+        """The number of functions queued or running."""
+        with self.__condition:
+            return len(self.__pending) + (1 if self.__busy else 0)
+
+    def submit(self, function: Callable[[], None], *, key: Hashable = None) -> None:
+        """
+        Queues a function to run in the background.
+
+        Args:
+            function: The function to run, without arguments.
+            key: Identifies what the function updates; a queued function with the same key is replaced by this one.
+        """
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError(f"The queue {self.name} has been closed.")
+
+            entry = self.__keyed.get(key) if key is not None else None
+            if entry is not None:
+                entry[1] = function  # Not yet started, the newer function takes its place in the queue.
+            else:
+                entry = [key, function]
+                self.__pending.append(entry)
+                if key is not None:
+                    self.__keyed[key] = entry
+
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name=self.name, daemon=True)
+                self.__thread.start()
+
+            self.__condition.notify_all()
+
+    def __run(self) -> None:
+        while True:
+            with self.__condition:
+                while len(self.__pending) == 0 and not self.__closed:
+                    self.__condition.wait()
+
+                if len(self.__pending) == 0:
+                    return  # Closed and drained.
+
+                key, function = self.__pending.popleft()
+                if key is not None:
+                    del self.__keyed[key]
+                self.__busy = True
+
+            try:
+                function()
+            except Exception as e:
+                self.__report(e)
+            finally:
+                with self.__condition:
+                    self.__busy = False
+                    self.__condition.notify_all()
+
+    def __report(self, error: Exception) -> None:
+        if self.on_error is not None:
+            self.on_error(error)
+        else:
+            from dbacademy import common
+            common.print_warning(title=f"{self.name} Failure", message=str(error), length=100)
+
+    def flush(self, timeout_seconds: float = None) -> bool:
+        """Blocks until every function submitted so far has run, returning False if `timeout_seconds` elapsed first."""
+        with self.__condition:
+            return self.__condition.wait_for(lambda: len(self.__pending) == 0 and not self.__busy, timeout=timeout_seconds)
+
+    def close(self, timeout_seconds: float = None) -> bool:
+        """Runs the functions still queued then stops the background thread; further submissions are rejected."""
+        import atexit
+
+        atexit.unregister(self.close)
+
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+            thread = self.__thread
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout_seconds)
+            return not thread.is_alive()
+
+        return True
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+__all__ = ["FleetExecutor", "FleetLimiter", "FleetProgress"]
+
+import threading
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class FleetProgress(object):
+    """A snapshot of the progress of FleetExecutor.map(), as passed to its progress callback."""
+
+    def __init__(self, *, completed: int, failed: int, total: Optional[int], elapsed_seconds: float):
+        self.__completed = completed
+        self.__failed = failed
+        self.__total = total
+        self.__elapsed_seconds = elapsed_seconds
+
+    @property
+    def completed(self) -> int:
+        """The number of items processed, successfully or not."""
+        return self.__completed
+
+    @property
+    def failed(self) -> int:
+        return self.__failed
+
+    @property
+    def total(self) -> Optional[int]:
+        """The number of items to process, or None if the items were not a sized collection."""
+        return self.__total
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return self.__elapsed_seconds
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """The estimated time remaining, extrapolated from the rate so far, or None if it cannot be estimated."""
+        if self.__total is None or self.__completed == 0:
+            return None
+        return self.__elapsed_seconds / self.__completed * (self.__total - self.__completed)
+
+    def __repr__(self):
+        return f"FleetProgress(completed={self.completed}, failed={self.failed}, total={self.total}, elapsed_seconds={self.elapsed_seconds:.1f}, eta_seconds={self.eta_seconds})"
+
+
+class FleetLimiter(object):
+    """
+    Bounds the number of items processed at once by every FleetExecutor of the process, in total and for any one host.
+
+    Executors are often nested, e.g. one item per workspace, each processing one item per user, and each executor's own
+    `max_workers` would otherwise multiply.  An executor acquires a slot of its limiter before starting an item and
+    releases it once the item has finished; an item that runs an executor of its own lends its slot to the nested items
+    for as long as it waits on them, so that nesting can neither exceed the limit nor deadlock.
+    """
+
+    _NOTHING = object()
+
+    def __init__(self, max_workers: int = 64):
+        """
+        Args:
+            max_workers: The maximum number of items processed at once by all the executors sharing this limiter.
+        """
+        self.__max_workers = max(1, max_workers)
+        self.__lock = threading.Lock()
+        self.__active = 0
+        self.__active_by_host: Dict[Hashable, int] = dict()
+        self.__listeners: Set[threading.Event] = set()
+        self.__local = threading.local()
+
+    @property
+    def max_workers(self) -> int:
+        return self.__max_workers
+
+    @max_workers.setter
+    def max_workers(self, max_workers: int) -> None:
+        with self.__lock:
+            self.__max_workers = max(1, max_workers)
+        self.__notify()
+
+    @property
+    def active(self) -> int:
+        """The number of items being processed by the executors sharing this limiter."""
+        return self.__active
+
+    def active_for(self, host: Hashable) -> int:
+        """The number of items of the host being processed by the executors sharing this limiter."""
+        return self.__active_by_host.get(host, 0)
+
+    def try_acquire(self, host: Hashable, max_per_host: Optional[int]) -> bool:
+        """Acquires a slot for an item of the host, unless none is available; the host None is only counted in total."""
+        with self.__lock:
+            if self.__active >= self.__max_workers:
+                return False
+            if host is not None and max_per_host is not None and self.__active_by_host.get(host, 0) >= max_per_host:
+                return False
+            self.__acquired(host)
+            return True
+
+    def release(self, host: Hashable) -> None:
+        with self.__lock:
+            self.__active -= 1
+            if host is not None:
+                self.__active_by_host[host] -= 1
+                if self.__active_by_host[host] == 0:
+                    del self.__active_by_host[host]
+        self.__notify()
+
+    def listen(self, event: threading.Event) -> None:
+        """Registers an event to be set whenever a slot is released."""
+        with self.__lock:
+            self.__listeners.add(event)
+
+    def unlisten(self, event: threading.Event) -> None:
+        with self.__lock:
+            self.__listeners.discard(event)
+
+    def run(self, host: Hashable, function: Callable[[T], R], item: T) -> R:
+        """Runs function(item) in the slot already acquired for the host, releasing the slot once it returns."""
+        self.__local.held = host
+        try:
+            return function(item)
+        finally:
+            self.__local.held = FleetLimiter._NOTHING
+            self.release(host)
+
+    def lend(self) -> Any:
+        """Releases the slot of the item running on this thread, if any, returning what restore() needs to take it back."""
+        held = getattr(self.__local, "held", FleetLimiter._NOTHING)
+        if held is not FleetLimiter._NOTHING:
+            self.__local.held = FleetLimiter._NOTHING
+            self.release(held)
+        return held
+
+    def restore(self, lent: Any) -> None:
+        """Takes back the slot given up by lend(), waiting for one to be released if need be."""
+        if lent is FleetLimiter._NOTHING:
+            return
+
+        released = threading.Event()
+        self.listen(released)
+        try:
+            # The host's limit is not applied, the item was already running within it.
+            while not self.try_acquire(lent, None):
+                released.wait()
+                released.clear()
+        finally:
+            self.unlisten(released)
+        self.__local.held = lent
+
+    def __acquired(self, host: Hashable) -> None:
+        self.__active += 1
+        if host is not None:
+            self.__active_by_host[host] = self.__active_by_host.get(host, 0) + 1
+
+    def __notify(self) -> None:
+        with self.__lock:
+            listeners = list(self.__listeners)
+        for listener in listeners:
+            listener.set()
+
+
+class FleetExecutor(object):
+    """
+    Applies a function to every item of a fleet (workspaces, users, labs...) on a bounded number of threads.
+
+    Unlike ThreadPool(len(items)), the number of threads never exceeds `max_workers` no matter how many items there are,
+    items are drawn from the iterable only as workers free up, and at most `max_per_host` items sharing a host run at
+    once.  Both limits are also drawn from a `FleetLimiter` shared by every executor of the process, so that executors
+    nested within the items of others, e.g. per user within per workspace, cannot multiply each other's threads nor
+    exceed `max_per_host` between them.
+
+    The first exception raised by the function stops any further items from being started and is re-raised once the
+    items already running have finished; functions may check `cancelled` to stop early themselves.
+
+    Example:
+        executor = FleetExecutor(max_workers=32, max_per_host=4, on_progress=print)
+        results = executor.map(install, usernames, host=lambda username: workspace.endpoint)
+    """
+
+    limiter: FleetLimiter = FleetLimiter()  # Shared by all executors in this process
+
+    # The number of concurrent items a fan-out over a single workspace's users, clusters... should allow that workspace.
+    MAX_PER_WORKSPACE = 8
+
+    def __init__(self, *,
+                 max_workers: int = 32,
+                 max_per_host: int = None,
+                 on_progress: Callable[[FleetProgress], None] = None,
+                 limiter: FleetLimiter = None):
+        """
+        Args:
+            max_workers: The maximum number of items processed at once by this executor.
+            max_per_host: The maximum number of items processed at once for any one host, by all the executors sharing
+                the limiter, unlimited if None.
+            on_progress: Invoked, on the calling thread, each time an item completes.
+            limiter: The limiter of the items processed at once, that shared by the whole process if None.
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_per_host = max_per_host
+        self.on_progress = on_progress
+        self.limiter = limiter or FleetExecutor.limiter
+        self.__local = threading.local()
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        True once an item of the current map() has failed; long-running functions may poll this to stop early.
+        Each call of map() is cancelled independently, even when several share this executor concurrently.
+        """
+        cancelled = getattr(self.__local, "cancelled", None)
+        return cancelled is not None and cancelled.is_set()
+
+    def map(self, function: Callable[[T], R], items: Iterable[T], *, host: Callable[[T], Hashable] = None) -> List[R]:
+        """
+        Returns function(item) for every item, in the order of the items, like ThreadPool.map()
+
+        Args:
+            function: The function to apply.
+            items: The items, possibly a generator, which is consumed only as capacity becomes available.
+            host: Returns the host of an item, enabling the `max_per_host` limit.
+        Raises:
+            Exception: The first exception raised by `function`, once the items already started have finished.
+        """
+        import time
+        from collections import deque
+        from collections.abc import Sized
+        from concurrent.futures import ThreadPoolExecutor
+
+        total = len(items) if isinstance(items, Sized) else None
+        if total == 0:
+            return list()
+
+        start = time.perf_counter()
+        pending = iter(enumerate(items))
+        deferred: Dict[Hashable, Deque[Tuple[int, T]]] = dict()  # Items waiting on their host's capacity.
+        deferred_count = 0
+        running: Dict[Any, Tuple[Hashable, int]] = dict()
+        results: Dict[int, R] = dict()
+        failed = 0
+        error: Optional[Exception] = None
+        exhausted = False
+
+        limiter = self.limiter
+        wake = threading.Event()  # Set as items complete, here or in any other executor sharing the limiter.
+        cancelled = threading.Event()
+        outer_cancelled = getattr(self.__local, "cancelled", None)
+        self.__local.cancelled = cancelled
+
+        def next_item() -> Optional[Tuple[Hashable, int, T]]:
+            nonlocal deferred_count, exhausted
+
+            for key, queue in deferred.items():
+                if len(queue) > 0 and limiter.try_acquire(key, self.max_per_host):
+                    deferred_count -= 1
+                    return key, *queue.popleft()
+
+            # Bound the look-ahead so that a generator is never drained into memory.
+            while not exhausted and deferred_count < self.max_workers:
+                entry = next(pending, None)
+                if entry is None:
+                    exhausted = True
+                    break
+                key = None if host is None else host(entry[1])
+                if limiter.try_acquire(key, self.max_per_host):
+                    return key, *entry
+                deferred.setdefault(key, deque()).append(entry)
+                deferred_count += 1
+
+            return None
+
+        def run(key: Hashable, value: T) -> R:
+            self.__local.cancelled = cancelled
+            return limiter.run(key, function, value)
+
+        limiter.listen(wake)
+        lent = limiter.lend()  # Our own items wait on theirs, let them use our slot meanwhile.
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers if total is None else min(self.max_workers, total)) as executor:
+                while True:
+                    wake.clear()
+
+                    for future in [f for f in running if f.done()]:
+                        key, index = running.pop(future)
+                        try:
+                            results[index] = future.result()
+                        except Exception as e:
+                            failed += 1
+                            if error is None:
+                                error = e
+                                cancelled.set()
+
+                        if self.on_progress is not None:
+                            self.on_progress(FleetProgress(completed=len(results) + failed, failed=failed, total=total, elapsed_seconds=time.perf_counter() - start))
+
+                    while error is None and len(running) < self.max_workers:
+                        item = next_item()
+                        if item is None:
+                            break
+                        key, index, value = item
+                        future = executor.submit(run, key, value)
+                        running[future] = key, index
+                        future.add_done_callback(lambda _: wake.set())
+
+                    if len(running) == 0 and (error is not None or (exhausted and deferred_count == 0)):
+                        break
+
+                    wake.wait()
+        finally:
+            limiter.unlisten(wake)
+            limiter.restore(lent)
+            if outer_cancelled is not None:
+                self.__local.cancelled = outer_cancelled
+
+        if error is not None:
+            raise error
+
+        return [results[index] for index in range(len(results))]
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+__all__ = ["TaskGraph", "TaskResult"]
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+
+class TaskResult(object):
+    """The outcome of a single task of a TaskGraph."""
+
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"    # Not run because a dependency failed or was skipped.
+    RESUMED = "resumed"    # Not run because the state file records a previous success.
+
+    def __init__(self, key: str, status: str, *, attempts: int = 0, elapsed_seconds: float = 0.0, value: Any = None, error: Exception = None):
+        self.__key = key
+        self.__status = status
+        self.__attempts = attempts
+        self.__elapsed_seconds = elapsed_seconds
+        self.__value = value
+        self.__error = error
+
+    @property
+    def key(self) -> str:
+        return self.__key
+
+    @property
+    def status(self) -> str:
+        return self.__status
+
+    @property
+    def attempts(self) -> int:
+        return self.__attempts
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """The wall-clock time of all attempts, including the delays between them."""
+        return self.__elapsed_seconds
+
+    @property
+    def value(self) -> Any:
+        """The value returned by the task's action."""
+        return self.__value
+
+    @property
+    def error(self) -> Optional[Exception]:
+        return self.__error
+
+    @property
+    def succeeded(self) -> bool:
+        return self.__status in (TaskResult.SUCCEEDED, TaskResult.RESUMED)
+
+    def __repr__(self):
+        return f"TaskResult(key={self.key!r}, status={self.status!r}, attempts={self.attempts}, elapsed_seconds={self.elapsed_seconds:.3f}, error={self.error!r})"
+
+
+class TaskGraph(object):
+    """
+    Runs a set of tasks on a bounded pool of threads, starting each task as soon as all of its dependencies have
+    succeeded rather than waiting for every task of an earlier "phase" to finish.
+
+    A task that fails, after its retries, causes every task that depends on it, directly or not, to be skipped; unrelated
+    tasks carry on.  If a state file is specified, the key of every task that succeeds is recorded in it, and tasks
+    recorded there are not run again, allowing an interrupted run to be resumed.
+
+    Example:
+        graph = TaskGraph(max_workers=4)
+        graph.add("create", create)
+        graph.add("configure", configure, depends_on=["create"])
+        results = graph.run()
+    """
+
+    def __init__(self, *,
+                 max_workers: int = 8,
+                 max_attempts: int = 1,
+                 retry_delay_seconds: float = 5.0,
+                 state_file: str = None,
+                 on_complete: Callable[[TaskResult], None] = None):
+        """
+        Args:
+            max_workers: The maximum number of tasks run concurrently.
+            max_attempts: The default number of times a task is attempted before it is considered to have failed.
+            retry_delay_seconds: The delay between attempts of a task.
+            state_file: The path of a JSON file recording the tasks that succeeded, enabling resumption.
+            on_complete: Invoked with the result of every task as it is finished, skipped or resumed.
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay_seconds = retry_delay_seconds
+        self.state_file = state_file
+        self.on_complete = on_complete
+
+        self.__actions: Dict[str, Callable[[], Any]] = dict()
+        self.__dependencies: Dict[str, List[str]] = dict()
+        self.__max_attempts: Dict[str, int] = dict()
+        self.__state_lock = threading.Lock()
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self.__actions)
+
+    def add(self, key: str, action: Callable[[], Any], *, depends_on: Iterable[Optional[str]] = (), max_attempts: int = None) -> str:
+        """
+        Adds a task, which may only depend on tasks already added.
+
+        Args:
+            key: The unique key of the task, also used to record its success in the state file.
+            action: The function to run.
+            depends_on: The keys of the tasks that must succeed before this one starts; None values are ignored.
+            max_attempts: The number of attempts of this task, defaulting to that of the graph.
+        Returns:
+            The key, so that it can be passed to subsequent calls' depends_on.
+        """
+        if key in self.__actions:
+            raise ValueError(f"""The task "{key}" was already added.""")
+
+        dependencies = [d for d in depends_on if d is not None]
+        for dependency in dependencies:
+            if dependency not in self.__actions:
+                raise ValueError(f"""The task "{key}" depends on the unknown task "{dependency}".""")
+
+        self.__actions[key] = action
+        self.__dependencies[key] = dependencies
+        self.__max_attempts[key] = max(1, max_attempts or self.max_attempts)
+        return key
+
+    def __load_state(self) -> Set[str]:
+        import os
+        import json
+
+        if self.state_file is None or not os.path.exists(self.state_file):
+            return set()
+
+        with open(self.state_file) as f:
+            return set(json.load(f).get("succeeded", list()))
+
+    def __save_state(self, succeeded: Set[str]) -> None:
+        import os
+        import json
+
+        if self.state_file is None:
+            return
+
+        with self.__state_lock:
+            temp_file = f"{self.state_file}.tmp"
+            with open(temp_file, "w") as f:
+                json.dump({"succeeded": sorted(succeeded)}, f, indent=2)
+            os.replace(temp_file, self.state_file)  # Never leave a half-written file behind.
+
+    def __attempt(self, key: str) -> TaskResult:
+        import time
+
+        action = self.__actions[key]
+        max_attempts = self.__max_attempts[key]
+        start = time.perf_counter()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                value = action()
+                return TaskResult(key, TaskResult.SUCCEEDED, attempts=attempt, elapsed_seconds=time.perf_counter() - start, value=value)
+            except Exception as e:
+                if attempt >= max_attempts:
+                    return TaskResult(key, TaskResult.FAILED, attempts=attempt, elapsed_seconds=time.perf_counter() - start, error=e)
+            time.sleep(self.retry_delay_seconds)
+
+    def run(self) -> Dict[str, TaskResult]:
+        """
+        Runs every task not previously recorded as succeeded, blocking until all are finished or skipped.
+
+        Returns:
+            The result of every task, in the order in which they were added.
+        """
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+        recorded = self.__load_state()
+        succeeded = {key for key in recorded if key in self.__actions}
+        results: Dict[str, TaskResult] = dict()
+
+        def complete(result: TaskResult) -> None:
+            results[result.key] = result
+            if self.on_complete is not None:
+                self.on_complete(result)
+
+        for key in self.__actions:
+            if key in succeeded:
+                complete(TaskResult(key, TaskResult.RESUMED))
+
+        pending = [key for key in self.__actions if key not in succeeded]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = dict()
+
+            while len(pending) > 0 or len(running) > 0:
+                # Start whatever is ready and skip whatever can never run, in the order in which tasks were added.
+                for key in list(pending):
+                    states = [results.get(d) for d in self.__dependencies[key]]
+                    if any(s is not None and not s.succeeded for s in states):
+                        pending.remove(key)
+                        complete(TaskResult(key, TaskResult.SKIPPED))
+                    elif all(s is not None for s in states):
+                        pending.remove(key)
+                        running[executor.submit(self.__attempt, key)] = key
+
+                if len(running) == 0:
+                    continue  # Everything left was just skipped.
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    result = future.result()
+                    if result.succeeded:
+                        recorded.add(result.key)
+                        self.__save_state(recorded)
+                    complete(result)
+
+        return {key: results[key] for key in self.__actions}
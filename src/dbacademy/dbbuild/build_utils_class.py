@@ -1,6 +1,6 @@
 __all__ = ["BuildUtils"]
 
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Any
 from dbacademy.clients.databricks import DBAcademyRestClient
 
 
@@ -36,6 +36,40 @@ class BuildUtils:
     # noinspection PyUnusedLocal
     @staticmethod
     def write_file(*, data: bytes, target_file: str, overwrite: bool, target_name):
+        target_file = BuildUtils.__prepare_target_file(target_file=target_file, overwrite=overwrite, target_name=target_name)
+
+        with open(target_file, "wb") as f:
+            # print(f"Writing data: {target_file}")
+            f.write(data)
+
+    @staticmethod
+    def export_dbc(*, client: DBAcademyRestClient, source_dir: str, target_file: str, overwrite: bool, target_name: str) -> str:
+        """
+        Exports the DBC of the specified directory straight to the target file, without holding the archive in memory.
+        :return: the local path of the file written, see BuildUtils.copy_file()
+        """
+        target_file = BuildUtils.__prepare_target_file(target_file=target_file, overwrite=overwrite, target_name=target_name)
+        client.workspace().export_dbc_to_file(source_dir, target_file)
+        return target_file
+
+    @staticmethod
+    def copy_file(*, source_file: str, target_file: str, overwrite: bool, target_name: str) -> None:
+        """
+        Copies a file written by BuildUtils.export_dbc(), hard-linking it where the filesystem allows.
+        """
+        import os
+        import shutil
+
+        target_file = BuildUtils.__prepare_target_file(target_file=target_file, overwrite=overwrite, target_name=target_name)
+
+        try:
+            os.link(source_file, target_file)
+        except OSError:
+            # Across filesystems, or on one without hard links such as DBFS.
+            shutil.copyfile(source_file, target_file)
+
+    @staticmethod
+    def __prepare_target_file(*, target_file: str, overwrite: bool, target_name: str) -> str:
         import os
         if target_file.endswith("_meta.json"):
             print(f"\nWriting Meta File to {target_name}:\n   {target_file}")
@@ -57,12 +91,10 @@ class BuildUtils:
         if not os.path.exists(version_dir):
             os.mkdir(version_dir)
 
-        with open(target_file, "wb") as f:
-            # print(f"Writing data: {target_file}")
-            f.write(data)
+        return target_file
 
     @staticmethod
-    def reset_git_repo(*, client: DBAcademyRestClient, directory: str, repo_url: str, branch: str, which: Union[str, None], prefix=""):
+    def reset_git_repo(*, client: DBAcademyRestClient, directory: str, repo_url: str, branch: str, which: Union[str, None], prefix="") -> Dict[str, Any]:
 
         which = "" if which is None else f" ({which})"
 
@@ -92,18 +124,40 @@ class BuildUtils:
 
         assert branch == current_branch, f"Expected the new branch to be {branch}, found {current_branch}"
 
+        return results
+
     @staticmethod
-    def validate_no_changes_in_repo(*, client: DBAcademyRestClient, build_name: str, repo_url: str, directory: str) -> List[str]:
+    def validate_no_changes_in_repo(*, client: DBAcademyRestClient, build_name: str, repo_url: str, directory: str, digest_cache_path: str = None) -> List[str]:
+        """
+        Compares the specified directory to the "published" branch of the specified repo, file by file.
+        :param client: The client of the workspace hosting both
+        :param build_name: The build's name, used to name the temporary clone of the repo
+        :param repo_url: The repo to compare to
+        :param directory: The directory to compare
+        :param digest_cache_path: The local file caching each file's digest between runs, see DigestCache; defaults to a file per build in the temp directory
+        :return: One message per difference, empty if there are none
+        """
+        import tempfile
+        from dbacademy.dbbuild.digest_cache_class import DigestCache
+
         repo_dir = f"/Repos/Temp/{build_name}-diff"
 
-        BuildUtils.reset_git_repo(client=client,
-                                  directory=repo_dir,
-                                  repo_url=repo_url,
-                                  branch="published",
-                                  which="diff")
+        repo = BuildUtils.reset_git_repo(client=client,
+                                         directory=repo_dir,
+                                         repo_url=repo_url,
+                                         branch="published",
+                                         which="diff")
         print()
-        index_a: Dict[str, Dict[str, str]] = BuildUtils.index_repo_dir(client=client, repo_dir=repo_dir)
-        index_b: Dict[str, Dict[str, str]] = BuildUtils.index_repo_dir(client=client, repo_dir=directory)
+
+        digest_cache = DigestCache.load(digest_cache_path or f"{tempfile.gettempdir()}/dbacademy/{build_name}-digests.json")
+
+        # The clone is recreated every time, but the files of a given commit never change.
+        head_commit_id = (repo or dict()).get("head_commit_id")
+        version = None if head_commit_id is None else f"{repo_url}@{head_commit_id}"
+
+        index_a: Dict[str, Dict[str, Any]] = BuildUtils.index_repo_dir(client=client, repo_dir=repo_dir, digest_cache=digest_cache, version=version)
+        index_b: Dict[str, Dict[str, Any]] = BuildUtils.index_repo_dir(client=client, repo_dir=directory, digest_cache=digest_cache)
+        digest_cache.save()
         print()
 
         print(f"Comparing {directory}")
@@ -135,18 +189,30 @@ class BuildUtils:
         return False
 
     @staticmethod
-    def index_repo_dir(*, client: DBAcademyRestClient, repo_dir: str) -> Dict[str, Dict[str, str]]:
+    def index_repo_dir(*, client: DBAcademyRestClient, repo_dir: str, digest_cache=None, version: str = None, max_workers: int = 16) -> Dict[str, Dict[str, Any]]:
+        """
+        Indexes the files of the specified directory by their path relative to it, recording each file's digest and size
+        rather than its contents.
+        :param client: The client used to export the notebooks
+        :param repo_dir: The directory to index
+        :param digest_cache: The DigestCache of previous runs, files whose modification info is unchanged are not exported again
+        :param version: Identifies immutable contents, such as a commit, in which case the digests are cached by path & version rather than by modification info
+        :param max_workers: The number of files exported at once
+        :return: The full_path, digest and size of each file
+        """
         import os
         from dbacademy import dbgems
+        from dbacademy.dbbuild.digest_cache_class import DigestCache
 
         ignored = ["/Published/", "/Build-Scripts/", "/Build-Scripts-"]
+        digest_cache = DigestCache() if digest_cache is None else digest_cache
 
         start = dbgems.clock_start()
         print(f"Indexing \"{repo_dir}\"", end="...")
         notebooks = client.workspace().ls(repo_dir, recursive=True)
         assert notebooks is not None, f"No notebooks found for the path {repo_dir}"
 
-        results: Dict[str, Dict[str, str]] = {}
+        results: Dict[str, Dict[str, Any]] = {}
         base_path = f"/Workspace/{repo_dir}"
 
         for path, dirs, files in os.walk(base_path):
@@ -154,70 +220,97 @@ class BuildUtils:
                 full_path = f"{path}/{file}"
                 relative_path = full_path[len(base_path):]
                 if not BuildUtils.__starts_with(relative_path, ignored):
+                    if version is not None:
+                        cache_key = f"{version}:{relative_path}"
+                    else:
+                        stat = os.stat(full_path)
+                        cache_key = f"{full_path}:{stat.st_mtime_ns}:{stat.st_size}"
+
                     results[relative_path] = {
                         "full_path": full_path,
-                        "contents": None
+                        "cache_key": cache_key,
+                        "digest": None,
+                        "size": None,
                     }
 
-        sources = BuildUtils.load_sources(client=client, results=results)
+        sources = BuildUtils.load_sources(client=client, results=results, digest_cache=digest_cache, max_workers=max_workers)
         print(dbgems.clock_stopped(start, f", {len(sources)} files"))
 
         return sources
 
     @staticmethod
-    def load_sources(*, client: DBAcademyRestClient, results: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
-        for path in results:
-            full_path = results.get(path).get("full_path")
-
-            if BuildUtils.__ends_with(full_path, [".ico"]):
-                # These are binary files
-                contents = ""
-            elif BuildUtils.__ends_with(full_path, [".json", ".txt", ".html", ".md", ".gitignore", "LICENSE"]):
-                # These are text files that we can just read in
-                with open(full_path) as f:
-                    contents = f.read()
-            else:
-                # These are notebooks
-                try:
-                    notebook_path = full_path[10:] if full_path.startswith("/Workspace/") else full_path
-                    contents = client.workspace.export_notebook(notebook_path)
-                except Exception as e:
-                    contents = ""
-                    print("*" * 80)
-                    print("* Failed to export notebook, possibly unanticipated file type ***")
-                    print(f"* {full_path}")
-                    for line in str(e).split("\n"):
-                        print(f"* {line}")
-                    print("*" * 80)
-
-            results[path]["contents"] = contents
+    def load_source(*, client: DBAcademyRestClient, full_path: str) -> str:
+        """
+        Loads the contents of the specified file, exporting it if it is a notebook.
+        """
+        if BuildUtils.__ends_with(full_path, [".ico"]):
+            # These are binary files
+            return ""
+
+        elif BuildUtils.__ends_with(full_path, [".json", ".txt", ".html", ".md", ".gitignore", "LICENSE"]):
+            # These are text files that we can just read in
+            with open(full_path) as f:
+                return f.read()
 
-        return results
+        else:
+            # These are notebooks
+            try:
+                notebook_path = full_path[10:] if full_path.startswith("/Workspace/") else full_path
+                return client.workspace().export_notebook(notebook_path)
+            except Exception as e:
+                message = "*" * 80
+                message += "\n* Failed to export notebook, possibly unanticipated file type ***"
+                message += f"\n* {full_path}"
+                for line in str(e).split("\n"):
+                    message += f"\n* {line}"
+                message += "\n" + ("*" * 80)
+                print(message)
+                return ""
 
     @staticmethod
-    def compare_results(index_a: Dict[str, Dict[str, str]],
-                        index_b: Dict[str, Dict[str, str]]) -> List[str]:
-        results: List[str] = []
+    def load_sources(*, client: DBAcademyRestClient, results: Dict[str, Dict[str, Any]], digest_cache=None, max_workers: int = 16) -> Dict[str, Dict[str, Any]]:
+        """
+        Records the digest and size of each file of the index, loading concurrently only those not in the digest cache.
+        """
+        import hashlib
+        from dbacademy.common import FleetExecutor
+        from dbacademy.dbbuild.digest_cache_class import DigestCache
 
-        index_b_notebooks = list(index_b.keys())
+        digest_cache = DigestCache() if digest_cache is None else digest_cache
 
-        for relative_path_a in index_a:
-            if relative_path_a not in index_b_notebooks:
-                results.append(f"Notebook deleted: `{relative_path_a}`")
+        def load(path: str) -> None:
+            entry = results.get(path)
+            cache_key = entry.get("cache_key")
+            cached = None if cache_key is None else digest_cache.get(cache_key)
+
+            if cached is None:
+                contents = BuildUtils.load_source(client=client, full_path=entry.get("full_path"))
+                cached = (hashlib.sha256(contents.encode("utf-8")).hexdigest(), len(contents))
+                if cache_key is not None and len(contents) > 0:
+                    # Empty contents may be a failed export, which is not worth remembering.
+                    digest_cache.put(cache_key, *cached)
+
+            entry["digest"], entry["size"] = cached
+
+        FleetExecutor(max_workers=max_workers).map(load, list(results))
+
+        return results
+
+    @staticmethod
+    def compare_results(index_a: Dict[str, Dict[str, Any]],
+                        index_b: Dict[str, Dict[str, Any]]) -> List[str]:
+        results: List[str] = []
 
-        for relative_path_b in index_b_notebooks:
-            if relative_path_b not in index_a:
-                results.append(f"Notebook added: `{relative_path_b}`")
+        results.extend(f"Notebook deleted: `{p}`" for p in index_a if p not in index_b)
+        results.extend(f"Notebook added: `{p}`" for p in index_b if p not in index_a)
 
         for relative_path in index_a:
             if relative_path in index_b:
-                source_a = index_a[relative_path]["contents"]
-                source_b = index_b[relative_path]["contents"]
+                entry_a: Dict[str, Any] = index_a[relative_path]
+                entry_b: Dict[str, Any] = index_b[relative_path]
 
-                len_a = len(source_a)
-                len_b = len(source_b)
-                if source_a != source_b:
-                    label = f"{len_a:,} vs {len_b:,}:"
+                if entry_a["digest"] != entry_b["digest"]:
+                    label = f"{entry_a['size']:,} vs {entry_b['size']:,}:"
                     results.append(f"Differences: {label:>20} {relative_path}")
 
         return results
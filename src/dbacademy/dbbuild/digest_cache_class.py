@@ -0,0 +1,80 @@
+__all__ = ["DigestCache"]
+
+import threading
+from typing import Dict, Optional, Tuple
+
+
+class DigestCache:
+    """
+    Remembers the digest and size of each file indexed by BuildUtils.index_repo_dir(), keyed by the file's path and
+    modification info (or by the commit it was checked out from), so that an unchanged file is never exported again.
+
+    Only the entries used since the cache was loaded are saved, which keeps the file from growing without bound.
+    """
+
+    def __init__(self, path: Optional[str] = None, entries: Dict[str, Tuple[str, int]] = None):
+        """
+        :param path: The local path of the cache's JSON file, None for a cache that lives only as long as this instance
+        :param entries: The digest & size of each key
+        """
+        self.__path = path
+        self.__entries: Dict[str, Tuple[str, int]] = entries or dict()
+        self.__used: Dict[str, Tuple[str, int]] = dict()
+        self.__lock = threading.Lock()
+
+    @property
+    def path(self) -> Optional[str]:
+        return self.__path
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @staticmethod
+    def load(path: str) -> "DigestCache":
+        """
+        Loads the cache at the specified path, an empty cache if the file doesn't exist or is unreadable.
+        :param path: The local path of the cache's JSON file
+        :return: the DigestCache
+        """
+        import os
+        import json
+
+        if not os.path.exists(path):
+            return DigestCache(path)
+
+        try:
+            with open(path) as f:
+                return DigestCache(path, {k: (v[0], v[1]) for k, v in json.load(f).items()})
+        except (ValueError, IndexError, TypeError, AttributeError):
+            # A corrupt cache only costs us a full export.
+            return DigestCache(path)
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__used[key] = entry
+            return entry
+
+    def put(self, key: str, digest: str, size: int) -> None:
+        with self.__lock:
+            self.__entries[key] = (digest, size)
+            self.__used[key] = (digest, size)
+
+    def save(self) -> None:
+        import os
+        import json
+
+        if self.path is None:
+            return
+
+        with self.__lock:
+            entries = dict(self.__used)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # Write then rename so that an interrupted save never leaves a truncated cache.
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(temp_path, self.path)
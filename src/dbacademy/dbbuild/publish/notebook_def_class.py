@@ -1,9 +1,31 @@
 __all__ = ["NotebookDef", "NotebookError", "StateVariables"]
 
-from typing import Callable, Union, List, Dict, Any
+import re
+from typing import Callable, Union, List, Dict, Any, Optional, Tuple
 from dbacademy.dbbuild.build_config_class import BuildConfig
 from dbacademy.dbhelper import dbh_constants
 
+# Compiled once and shared by every notebook; each is a single pass over a command or a notebook's source.
+PLACEHOLDER_PATTERN = re.compile(r"{{([^{}]*)}}")
+# noinspection RegExpDuplicateCharacterInClass
+UNRESOLVED_MUSTACHE_PATTERN = re.compile(r"{{[a-zA-Z\-\\_\\#\\/]*}}")
+DEPRECATED_ICON_PATTERN = re.compile(r"(?=(:(?:HINT|CAUTION|BESTPRACTICE|SIDENOTE|NOTE):))")
+COPYRIGHT_PATTERN = re.compile(r"(\d{4}) Databricks, Inc")
+# noinspection RegExpRedundantEscape
+MD_LINK_PATTERN = re.compile(r"(?<!!)\[.*?\]\(.*?\)")
+RELATIVE_LINK_PATTERN = re.compile(r"\(\$.*\)")
+HTML_LINK_PATTERN = re.compile(r"<a .*?</a>")
+NON_DIRECTIVE_CHARACTER_PATTERN = re.compile("[^-a-zA-Z_]")
+I18N_SEPARATOR_PATTERN = re.compile(r"^<hr>--i18n-|^<hr sandbox>--i18n-", flags=re.MULTILINE)
+
+BDC_TOKENS = ["IPYTHON_ONLY", "DATABRICKS_ONLY",
+              "AMAZON_ONLY", "AZURE_ONLY", "TEST", "PRIVATE_TEST", "INSTRUCTOR_NOTE", "INSTRUCTOR_ONLY",
+              "SCALA_ONLY", "PYTHON_ONLY", "SQL_ONLY", "R_ONLY"
+                                                       "VIDEO", "ILT_ONLY", "SELF_PACED_ONLY", "INLINE",
+              "NEW_PART", "{dbr}"]
+# Tokens overlap (e.g. PYTHON_ONLY within IPYTHON_ONLY), the lookahead finds every token starting at each position.
+BDC_TOKEN_PATTERN = re.compile("(?=(" + "|".join(re.escape(t) for t in BDC_TOKENS) + "))")
+
 
 class NotebookError:
     def __init__(self, message):
@@ -64,6 +86,7 @@ class NotebookDefData:
         self.client = build_config.client
         self.path = path
         self.replacements = replacements or dict()
+        self.replacements_used: Dict[str, Any] = dict()
 
         self.include_solution = include_solution
         self.errors: List[NotebookError] = list()
@@ -278,14 +301,10 @@ class NotebookDef(NotebookDefData):
 
         """Test for MD links to be replaced with html links"""
 
-        import re
-
-        # TODO Fix this error after a proper unit tests is created.
-        # noinspection RegExpRedundantEscape
-        for link in re.findall(r"(?<!!)\[.*?\]\(.*?\)", command):
+        for link in MD_LINK_PATTERN.findall(command):
 
             # If this is a relative link, we can ignore it.
-            match = re.search(r"\(\$.*\)", link)
+            match = RELATIVE_LINK_PATTERN.search(link)
 
             if match:
                 original_target = match.group()[1:-1]
@@ -297,8 +316,7 @@ class NotebookDef(NotebookDefData):
 
     @staticmethod
     def parse_html_links(command):
-        import re
-        return re.findall(r"<a .*?</a>", command)
+        return HTML_LINK_PATTERN.findall(command)
 
     def validate_html_link(self, i, command):
         """Test all HTML links to ensure they have a target set to _blank"""
@@ -503,32 +521,27 @@ class NotebookDef(NotebookDefData):
         return None
 
     def load_i18n_guid_map(self, i18n_source: str) -> Dict[str, str]:
-        import re
-
         if i18n_source is None:
             return dict()
 
-        i18n_guid_map = dict()
-
-        # parts = re.split(r"^<hr>--i18n-", i18n_source, flags=re.MULTILINE)
-        parts = re.split(r"^<hr>--i18n-|^<hr sandbox>--i18n-", i18n_source, flags=re.MULTILINE)
-
-        name = parts[0].strip()[3:]
+        name, i18n_guid_map = self.parse_i18n_source(i18n_source)
         self.test(lambda: name == self.path, f"Expected the notebook \"{self.path}\" but found\n                      \"{name}\"")
 
-        for part in parts[1:]:
-            guid, value = self.parse_guid_and_value(part)
-
-            i18n_guid_map[guid] = value
+        return i18n_guid_map
 
-            # sandbox_parts = re.split(r"^<hr sandbox>--i18n-", value, flags=re.MULTILINE)
-            # i18n_guid_map[guid] = sandbox_parts[0]
+    @staticmethod
+    def parse_i18n_source(i18n_source: str) -> Tuple[str, Dict[str, str]]:
+        """
+        Splits a notebook's i18n resource into its GUIDs and their translations in one pass over the resource.
+        :param i18n_source: The resource's markdown, as returned by load_i18n_source()
+        :return: The name of the notebook the resource is for and the map of GUIDs to their translations
+        """
+        parts = I18N_SEPARATOR_PATTERN.split(i18n_source)
 
-            # for sandbox_part in sandbox_parts[1:]:
-            #     guid, value = self.parse_guid_and_value(sandbox_part)
-            #     i18n_guid_map[guid] = value
+        name = parts[0].strip()[3:]
+        i18n_guid_map = dict(NotebookDef.parse_guid_and_value(part) for part in parts[1:])
 
-        return i18n_guid_map
+        return name, i18n_guid_map
 
     @staticmethod
     def parse_guid_and_value(part):
@@ -623,12 +636,39 @@ For more current information, please see <a href="https://files.training.databri
                 other_notebooks: List[NotebookDefData]) -> None:
 
         from dbacademy.common import validate
-        from dbacademy.dbbuild.build_utils_class import BuildUtils
 
-        validate.str_value(source_dir=source_dir, required=True)
         validate.str_value(target_dir=target_dir, required=True)
-        validate.str_value(i18n_resources_dir=i18n_resources_dir, required=True)
         validate.bool_value(verbose=verbose, required=True)
+
+        print()
+        print("=" * 80)
+        print(f".../{self.path}")
+
+        language, students_source, solutions_source = self.generate(source_dir=source_dir,
+                                                                    i18n_resources_dir=i18n_resources_dir,
+                                                                    debugging=debugging,
+                                                                    other_notebooks=other_notebooks)
+        self.assert_no_errors(print_warnings=True)
+        self.import_generated(target_dir=target_dir,
+                              language=language,
+                              students_source=students_source,
+                              solutions_source=solutions_source,
+                              verbose=verbose)
+
+    def generate(self, *,
+                 source_dir: str,
+                 i18n_resources_dir: str,
+                 debugging: bool,
+                 other_notebooks: List[NotebookDefData]) -> Tuple[str, str, Optional[str]]:
+        """
+        Exports the source notebook and generates the published notebooks from it, recording any errors and warnings
+        in this NotebookDef rather than raising them; see assert_no_errors().
+        :return: The notebook's language, the students notebook's source and the solutions notebook's source or None if not included
+        """
+        from dbacademy.common import validate
+
+        validate.str_value(source_dir=source_dir, required=True)
+        validate.str_value(i18n_resources_dir=i18n_resources_dir, required=True)
         validate.bool_value(debugging=debugging, required=True)
 
         other_notebooks: List[NotebookDefData] = validate.list_of_type(other_notebooks=other_notebooks, element_type=NotebookDefData, auto_create=True)
@@ -636,10 +676,7 @@ For more current information, please see <a href="https://files.training.databri
         self.errors = list()
         self.warnings = list()
         self.i18n_guids = list()
-
-        print()
-        print("=" * 80)
-        print(f".../{self.path}")
+        self.replacements_used = dict()
 
         source_notebook_path = f"{source_dir}/{self.path}"
         source_info = self.client.workspace().get_status(source_notebook_path)
@@ -682,18 +719,35 @@ For more current information, please see <a href="https://files.training.databri
             # Not checking for forward slash as the platform itself enforces this.
             self.warn(lambda: key not in self.path,  f"Found invalid character {key} in notebook name: {self.path}")
 
+        students_source = self.render_notebook(language, state.students_commands)
+        solutions_source = self.render_notebook(language, state.solutions_commands) if self.include_solution else None
+
+        return language, students_source, solutions_source
+
+    def import_generated(self, *,
+                         target_dir: str,
+                         language: str,
+                         students_source: str,
+                         solutions_source: Optional[str],
+                         verbose: bool) -> None:
+        """
+        Imports the notebooks returned by generate(), the students and solutions notebooks concurrently.
+        """
+        from dbacademy.common import FleetExecutor
+        from dbacademy.dbbuild.build_utils_class import BuildUtils
+
         # Create the student's notebooks
-        students_notebook_path = f"{target_dir}/{self.path}"
-        BuildUtils.print_if(verbose, students_notebook_path)
-        BuildUtils.print_if(verbose, f"...publishing {len(state.students_commands)} commands")
-        self.publish_notebook(language, state.students_commands, students_notebook_path, print_warnings=True)
+        notebooks = [(f"{target_dir}/{self.path}", students_source)]
 
         # Create the solutions notebooks
-        if self.include_solution:
-            solutions_notebook_path = f"{target_dir}/Solutions/{self.path}"
-            BuildUtils.print_if(verbose, solutions_notebook_path)
-            BuildUtils.print_if(verbose, f"...publishing {len(state.solutions_commands)} commands")
-            self.publish_notebook(language, state.solutions_commands, solutions_notebook_path, print_warnings=False)
+        if solutions_source is not None:
+            notebooks.append((f"{target_dir}/Solutions/{self.path}", solutions_source))
+
+        for target_path, source in notebooks:
+            BuildUtils.print_if(verbose, target_path)
+            BuildUtils.print_if(verbose, f"...publishing {source.count(self.get_cmd_delim(language)) + 1} commands")
+
+        FleetExecutor(max_workers=len(notebooks)).map(lambda notebook: self.import_notebook(language, *notebook), notebooks)
 
     def update_command(self, *,
                        state: StateVariables,
@@ -801,15 +855,13 @@ For more current information, please see <a href="https://files.training.databri
             # Not a TO-DO or ANSWER, just append to both
             self.append_both(state.students_commands, state.solutions_commands, command)
 
-        # Check the command for BDC markers
-        bdc_tokens = ["IPYTHON_ONLY", "DATABRICKS_ONLY",
-                      "AMAZON_ONLY", "AZURE_ONLY", "TEST", "PRIVATE_TEST", "INSTRUCTOR_NOTE", "INSTRUCTOR_ONLY",
-                      "SCALA_ONLY", "PYTHON_ONLY", "SQL_ONLY", "R_ONLY"
-                                                               "VIDEO", "ILT_ONLY", "SELF_PACED_ONLY", "INLINE",
-                      "NEW_PART", "{dbr}"]
+        # Check the command for BDC markers, scanning the command once for all of them
+        found_tokens = set()
+        for match in BDC_TOKEN_PATTERN.finditer(command):
+            found_tokens.update(t for t in BDC_TOKENS if command.startswith(t, match.start()))
 
-        for token in bdc_tokens:
-            self.test(lambda: token not in command, f"""Cmd #{i + 1} | Found the token "{token}" """)
+        for token in BDC_TOKENS:
+            self.test(lambda: token not in found_tokens, f"""Cmd #{i + 1} | Found the token "{token}" """)
 
         if not self.is_markdown(cm=cm, command=command):
             if language.lower() == "python":
@@ -829,9 +881,9 @@ For more current information, please see <a href="https://files.training.databri
             else:
                 raise Exception(f"The language {language} is not supported")
 
-        for year in range(2017, 2999):
+        for year in sorted({int(y) for y in COPYRIGHT_PATTERN.findall(command) if 2017 <= int(y) < 2999}):
             tag = f"{year} Databricks, Inc"
-            self.test(lambda: tag not in command, f"""Cmd #{i + 1} | Found copyright ({tag}) """)
+            self.test(lambda: False, f"""Cmd #{i + 1} | Found copyright ({tag}) """)
 
         return command
 
@@ -874,6 +926,12 @@ For more current information, please see <a href="https://files.training.databri
                          target_path: str,
                          print_warnings: bool) -> None:
 
+        final_source = self.render_notebook(language, commands)
+
+        self.assert_no_errors(print_warnings)
+        self.import_notebook(language, target_path, final_source)
+
+    def render_notebook(self, language: str, commands: List[str]) -> str:
         m = self.get_comment_marker(language)
         final_source = f"{m} Databricks notebook source\n"
 
@@ -887,10 +945,9 @@ For more current information, please see <a href="https://files.training.databri
         final_source += commands[-1]
         final_source += "" if commands[-1].startswith(f"{m} MAGIC") else "\n\n"
 
-        final_source = self.replace_contents(final_source)
-
-        self.assert_no_errors(print_warnings)
+        return self.replace_contents(final_source)
 
+    def import_notebook(self, language: str, target_path: str, final_source: str) -> None:
         parent_dir = "/".join(target_path.split("/")[0:-1])
         self.client.workspace().mkdirs(parent_dir)
         self.client.workspace().import_notebook(language.upper(), target_path, final_source)
@@ -948,22 +1005,26 @@ For more current information, please see <a href="https://files.training.databri
         return new_command
 
     def replace_contents(self, contents: str):
-        import re
 
-        for key in self.replacements:
-            old_value = "{{" + key + "}}"
-            new_value = self.replacements[key]
-            contents = contents.replace(old_value, new_value)
+        def replace(match: re.Match) -> str:
+            key = match.group(1)
+            if key not in self.replacements:
+                return match.group(0)
+
+            # Recorded so that the publishing manifest can tell when a notebook's replacements change.
+            self.replacements_used[key] = self.replacements[key]
+            return self.replacements[key]
 
-        # TODO Fix this error after a proper unit tests is created.
-        # noinspection RegExpDuplicateCharacterInClass
-        mustache_pattern = re.compile(r"{{[a-zA-Z\-\\_\\#\\/]*}}")
-        result = mustache_pattern.search(contents)
+        # Every placeholder is substituted in one pass rather than one pass per replacement.
+        contents = PLACEHOLDER_PATTERN.sub(replace, contents)
+
+        result = UNRESOLVED_MUSTACHE_PATTERN.search(contents)
         if result is not None:
             self.test(lambda: False, f"A mustache pattern was detected after all replacements were processed: {result}")
 
+        found_icons = set(DEPRECATED_ICON_PATTERN.findall(contents))
         for icon in [":HINT:", ":CAUTION:", ":BESTPRACTICE:", ":SIDENOTE:", ":NOTE:"]:
-            if icon in contents:
+            if icon in found_icons:
                 self.test(lambda: False, f"The deprecated {icon} pattern was found after all replacements were processed.")
 
         # No longer supported
@@ -996,12 +1057,23 @@ For more current information, please see <a href="https://files.training.databri
         marker = NotebookDef.get_comment_marker(language)
         return f"\n{marker} COMMAND ----------\n"
 
+    @staticmethod
+    def iter_lines(text: str):
+        """Yields the lines of text one at a time so that a scan that stops early never splits the remainder."""
+        start = 0
+        while True:
+            end = text.find("\n", start)
+            if end == -1:
+                yield text[start:]
+                return
+            yield text[start:end]
+            start = end + 1
+
     def get_leading_comments(self, language, command) -> list:
         leading_comments = []
-        lines = command.split("\n")
 
         source_m = self.get_comment_marker(language)
-        first_line = lines[0].lower()
+        first_line = next(self.iter_lines(command)).lower()
 
         if first_line.startswith(f"{source_m} magic %md"):
             cell_m = self.get_comment_marker("md")
@@ -1018,8 +1090,7 @@ For more current information, please see <a href="https://files.training.databri
         else:
             cell_m = source_m
 
-        for il in range(len(lines)):
-            line = lines[il]
+        for line in self.iter_lines(command):
 
             # Start by removing any "source" prefix
             if line.startswith(f"{source_m} MAGIC"):
@@ -1056,8 +1127,6 @@ For more current information, please see <a href="https://files.training.databri
         return leading_comments
 
     def parse_directives(self, i, comments):
-        import re
-
         directives = list()
 
         for line in comments:
@@ -1065,7 +1134,7 @@ For more current information, please see <a href="https://files.training.databri
                 # The comment is in all upper case,
                 # must be one or more directives
                 directive = line.strip()
-                mod_directive = re.sub("[^-a-zA-Z_]", "_", directive)
+                mod_directive = NON_DIRECTIVE_CHARACTER_PATTERN.sub("_", directive)
 
                 if directive in ["SELECT", "FROM", "AS", "AND"]:
                     pass  # not a real directive, but flagged as one because of its SQL syntax
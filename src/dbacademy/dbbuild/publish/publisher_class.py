@@ -1,6 +1,6 @@
 __all__ = ["Publisher"]
 
-from typing import List, Optional
+from typing import List, Optional, Tuple, Dict, Any
 from dbacademy.common import validate
 
 
@@ -45,6 +45,7 @@ class Publisher:
 
         self.temp_repo_dir = f"/Repos/Temp"
         self.temp_work_dir = f"/Workspace/Users/{build_config.username}/Temp"
+        self.manifest_path = f"{self.temp_work_dir}/Manifests/{self.build_config.name} - v{self.build_config.version}.json"
         self.username = build_config.username
 
         self.i18n = build_config.i18n
@@ -150,19 +151,25 @@ class Publisher:
         """
         assert self.__generated_notebooks, "The notebooks have not yet been generated. See Publisher.generate_notebooks()"
 
-    def generate_notebooks(self, *, skip_generation: bool = False, verbose=False, debugging=False) -> Optional[str]:
+    def generate_notebooks(self, *, skip_generation: bool = False, verbose=False, debugging=False, max_workers: int = 8, incremental: bool = None) -> Optional[str]:
         """
         Generates the publishable notebooks from the source notebooks
         :param skip_generation: Overrides the default behavior and skips generation of the notebook
         :param verbose: True of verbose logging
-        :param debugging: True for debug logging
+        :param debugging: True for debug logging, which also publishes the notebooks one at a time
+        :param max_workers: The number of notebooks exported, generated and imported at once
+        :param incremental: True to regenerate only the notebooks whose inputs changed since the last publish, see Publisher.manifest_path; defaults to True for the versions of BuildConfig.VERSIONS_LIST and False for releases
         :return: The HTML results that should be rendered with displayHTML() from the calling notebook
         """
         from dbacademy import common, dbgems
-        from dbacademy.dbbuild.publish.notebook_def_class import NotebookDef
+        from dbacademy.dbbuild.publish.notebook_def_class import NotebookDef, NotebookError
+        from dbacademy.dbbuild.publish.publishing_manifest_class import PublishingManifest
         from dbacademy.dbbuild.build_utils_class import BuildUtils
         from dbacademy.dbbuild.build_config_class import BuildConfig
 
+        if incremental is None:
+            incremental = self.version in BuildConfig.VERSIONS_LIST
+
         if self.version in BuildConfig.VERSIONS_LIST:
             self.assert_validated_config()
         else:
@@ -193,6 +200,7 @@ class Publisher:
         print("Arguments:")
         print(f"  verbose =   {verbose}")
         print(f"  debugging = {debugging}")
+        print(f"  incremental = {incremental}")
 
         if self.black_list is None:
             print(f"  exclude:    none")
@@ -210,22 +218,68 @@ class Publisher:
             for path in self.white_list[1:]:
                 print(f"              {path}")
 
-        # Now that we backed up the version-info, we can delete everything.
+        manifest = PublishingManifest.load(self.manifest_path) if incremental else PublishingManifest(self.manifest_path)
         target_status = self.client.workspace().get_status(self.target_dir)
+
+        if target_status is None:
+            target_objects = dict()
+        else:
+            target_objects = {o.get("path"): o for o in self.client.workspace().ls(self.target_dir, recursive=True) or []}
+
+        source_objects = dict()
+        if len(manifest) > 0:
+            # One listing of the source directory yields every notebook's modified_at, unchanged notebooks are never exported.
+            source_objects = {o.get("path"): o for o in self.client.workspace().ls(self.source_dir, recursive=True) or []}
+
+        inputs = {n.path: self.__notebook_inputs(n) for n in main_notebooks}
+        changed_notebooks: List[NotebookDef] = list()
+
+        for notebook in main_notebooks:
+            source_modified_at = source_objects.get(f"{self.source_dir}/{notebook.path}", dict()).get("modified_at")
+            if manifest.is_unchanged(notebook.path,
+                                     inputs=inputs[notebook.path],
+                                     source_modified_at=source_modified_at,
+                                     replacements=notebook.replacements,
+                                     target_objects=target_objects):
+                notebook.errors = list()
+                notebook.warnings = [NotebookError(w) for w in manifest.get(notebook.path).get("warnings", list())]
+            else:
+                changed_notebooks.append(notebook)
+
         if target_status is not None:
             BuildUtils.print_if(verbose, "-" * 80)
-            BuildUtils.clean_target_dir(self.client, self.target_dir, verbose)
+            if len(manifest) == 0:
+                # Nothing to reuse, we can delete everything.
+                BuildUtils.clean_target_dir(self.client, self.target_dir, verbose)
+            else:
+                self.__clean_stale_targets(main_notebooks, target_objects, verbose)
+
+        print()
+        print(f"Regenerating {len(changed_notebooks)} of {len(main_notebooks)} notebooks")
+        for notebook in main_notebooks:
+            if notebook not in changed_notebooks:
+                BuildUtils.print_if(verbose, f"...unchanged: {notebook.path}")
 
         errors = 0
         warnings = 0
 
+        try:
+            if debugging:
+                # Debug output is per command, publish serially so that it isn't interleaved.
+                for notebook in changed_notebooks:
+                    notebook.publish(source_dir=self.source_dir,
+                                     target_dir=self.target_dir,
+                                     i18n_resources_dir=self.i18n_resources_dir,
+                                     verbose=verbose,
+                                     debugging=debugging,
+                                     other_notebooks=self.notebooks)
+            else:
+                self.__publish_notebooks(changed_notebooks, verbose=verbose, max_workers=max_workers)
+        finally:
+            # Even when aborting, record the notebooks that were published so that the next run can skip them.
+            self.__update_manifest(manifest, main_notebooks, changed_notebooks, inputs, source_objects)
+
         for notebook in main_notebooks:
-            notebook.publish(source_dir=self.source_dir,
-                             target_dir=self.target_dir,
-                             i18n_resources_dir=self.i18n_resources_dir,
-                             verbose=verbose, 
-                             debugging=debugging,
-                             other_notebooks=self.notebooks)
             errors += len(notebook.errors)
             warnings += len(notebook.warnings)
 
@@ -250,6 +304,138 @@ class Publisher:
         self.__generated_notebooks = True
         return html
 
+    def __notebook_inputs(self, notebook: NotebookDef) -> str:
+        """
+        Fingerprints everything, other than the source notebook and its replacements, that the generated notebook depends on.
+        """
+        from dbacademy import dbgems
+        from dbacademy.dbbuild.publish.publishing_manifest_class import PublishingManifest
+
+        try:
+            library_version = dbgems.lookup_current_module_version("dbacademy")
+        except Exception:
+            library_version = None
+
+        # Loading the i18n resource may record a warning, generating or restoring the notebook replaces them.
+        i18n_source = notebook.load_i18n_source(self.i18n_resources_dir) if notebook.i18n else None
+
+        return PublishingManifest.fingerprint(library_version=library_version,
+                                              include_solution=notebook.include_solution,
+                                              test_round=notebook.test_round,
+                                              ignoring=notebook.ignoring,
+                                              i18n=notebook.i18n,
+                                              i18n_language=notebook.i18n_language,
+                                              i18n_source=i18n_source,
+                                              other_notebooks=sorted(n.path for n in self.notebooks))
+
+    def __clean_stale_targets(self, notebooks: List[NotebookDef], target_objects: Dict[str, Dict[str, Any]], verbose: bool) -> None:
+        """
+        Deletes, from the target directory, only the notebooks that would no longer be generated, such as those removed
+        from the course or whose solution is no longer included, instead of the whole directory's contents.
+        """
+        from dbacademy.dbbuild.build_utils_class import BuildUtils
+
+        expected = set()
+        for notebook in notebooks:
+            expected.update(self.__target_paths(notebook))
+
+        keepers = [f"{self.target_dir}/{k}" for k in Publisher.KEEPERS]
+
+        for path in sorted(target_objects):
+            if path not in expected and not any(path == k or path.startswith(f"{k}/") for k in keepers):
+                BuildUtils.print_if(verbose, f"...deleting {path}")
+                self.client.workspace().delete_path(path)
+
+    def __target_paths(self, notebook: NotebookDef) -> List[str]:
+        paths = [f"{self.target_dir}/{notebook.path}"]
+        if notebook.include_solution:
+            paths.append(f"{self.target_dir}/Solutions/{notebook.path}")
+        return paths
+
+    def __update_manifest(self, manifest, notebooks: List[NotebookDef], changed_notebooks: List[NotebookDef], inputs: Dict[str, str], source_objects: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Records the notebooks just published, error free, in the manifest, and forgets those that were not published.
+        """
+        target_objects = {o.get("path"): o for o in self.client.workspace().ls(self.target_dir, recursive=True) or []}
+
+        if len(source_objects) == 0:
+            source_objects = {o.get("path"): o for o in self.client.workspace().ls(self.source_dir, recursive=True) or []}
+
+        paths = [n.path for n in notebooks]
+        for path in list(manifest.entries):
+            if path not in paths:
+                manifest.remove(path)
+
+        for notebook in changed_notebooks:
+            target_paths = self.__target_paths(notebook)
+            source_modified_at = source_objects.get(f"{self.source_dir}/{notebook.path}", dict()).get("modified_at")
+
+            if len(notebook.errors) > 0 or any(p not in target_objects for p in target_paths):
+                # Failed or not yet published, it will be regenerated next time.
+                manifest.remove(notebook.path)
+            else:
+                manifest.put(notebook.path,
+                             inputs=inputs[notebook.path],
+                             source_modified_at=source_modified_at,
+                             replacements=dict(notebook.replacements_used),
+                             targets={p: target_objects.get(p).get("modified_at") for p in target_paths},
+                             warnings=[w.message for w in notebook.warnings])
+
+        manifest.save()
+
+    def __publish_notebooks(self, notebooks: List[NotebookDef], *, verbose: bool, max_workers: int) -> None:
+        """
+        Exports, generates and imports each notebook concurrently, each notebook's pipeline being independent of the
+        others, then reports their warnings and errors in the notebooks' order, raising as NotebookDef.publish() would
+        for the first notebook with errors.  Notebooks with errors are not imported, those without are.
+        """
+        import time
+        from dbacademy.common import FleetExecutor
+        from dbacademy.dbbuild.publish.notebook_def_class import NotebookDef
+        from dbacademy.dbbuild.build_utils_class import BuildUtils
+
+        def publish(notebook: NotebookDef) -> Tuple[Optional[Exception], float]:
+            start = time.time()
+            try:
+                language, students_source, solutions_source = notebook.generate(source_dir=self.source_dir,
+                                                                                i18n_resources_dir=self.i18n_resources_dir,
+                                                                                debugging=False,
+                                                                                other_notebooks=self.notebooks)
+                if len(notebook.errors) == 0:
+                    notebook.import_generated(target_dir=self.target_dir,
+                                              language=language,
+                                              students_source=students_source,
+                                              solutions_source=solutions_source,
+                                              verbose=False)
+                return None, time.time() - start
+            except Exception as e:
+                return e, time.time() - start
+
+        outcomes = FleetExecutor(max_workers=max_workers).map(publish, notebooks)
+
+        failure: Optional[Exception] = None
+        for notebook, (error, seconds) in zip(notebooks, outcomes):
+            print()
+            print("=" * 80)
+            print(f".../{notebook.path} ({seconds:.1f} seconds)")
+
+            if error is not None:
+                print(f"ABORTING: {type(error).__name__} publishing {notebook.path}: {error}")
+                failure = failure or error
+                continue
+
+            BuildUtils.print_if(verbose, f"{self.target_dir}/{notebook.path}")
+            if notebook.include_solution:
+                BuildUtils.print_if(verbose, f"{self.target_dir}/Solutions/{notebook.path}")
+
+            try:
+                notebook.assert_no_errors(print_warnings=True)
+            except Exception as e:
+                failure = failure or e
+
+        if failure is not None:
+            raise failure
+
     def create_published_message(self) -> str:
         """
         Convenience method to aid in creating the publishing email and Slack message.
@@ -427,11 +613,10 @@ class Publisher:
         :param asynchronous: True to generate docs asynchronously, False to process them serially
         :return:
         """
-        from multiprocessing.pool import ThreadPool
+        from dbacademy.common import FleetExecutor
 
         if asynchronous:
-            with ThreadPool(len(self.build_config.notebooks)) as pool:
-                pool.map(self.__generate_html, self.build_config.notebooks.values())
+            FleetExecutor(max_workers=16).map(self.__generate_html, list(self.build_config.notebooks.values()))
         else:
             for notebook in self.build_config.notebooks.values():
                 self.__generate_html(notebook)
@@ -461,9 +646,6 @@ class Publisher:
             # With a target repo, we need to validate that there are no uncommitted changes
             self.assert_no_changes_in_target_repo()
 
-        print(f"Exporting DBC from \"{self.target_dir}\"")
-        data = self.build_config.client.workspace.export_dbc(self.target_dir)
-
         # The root directory for all versions of this course
         base_dir = f"/dbfs/mnt/resources.training.databricks.com/distributions/{self.build_config.build_name}"
         version_dir = f"{base_dir}/v{self.build_config.version}-PENDING"
@@ -485,16 +667,19 @@ class Publisher:
                               target_name="Distributions System (versioned)",
                               target_file=f"{version_dir}/_meta.json")
 
-        BuildUtils.write_file(data=data,
-                              overwrite=False,
-                              target_name="Distributions System (versioned)",
-                              target_file=f"{version_dir}/{self.build_config.build_name}.dbc")
+        # Exported once, straight to disk, then copied.
+        print(f"Exporting DBC from \"{self.target_dir}\"")
+        dbc_file = BuildUtils.export_dbc(client=self.build_config.client,
+                                         source_dir=self.target_dir,
+                                         overwrite=False,
+                                         target_name="Distributions System (versioned)",
+                                         target_file=f"{version_dir}/{self.build_config.build_name}.dbc")
 
         # Provided simply for convenient download
-        BuildUtils.write_file(data=data,
-                              overwrite=True,
-                              target_name="Workspace-Local FileStore",
-                              target_file=f"dbfs:/FileStore/tmp/{self.build_config.build_name}-v{self.build_config.version}/{self.build_config.build_name}-v{self.build_config.version}-notebooks.dbc")
+        BuildUtils.copy_file(source_file=dbc_file,
+                             overwrite=True,
+                             target_name="Workspace-Local FileStore",
+                             target_file=f"dbfs:/FileStore/tmp/{self.build_config.build_name}-v{self.build_config.version}/{self.build_config.build_name}-v{self.build_config.version}-notebooks.dbc")
 
         url = f"/files/tmp/{self.build_config.build_name}-v{self.build_config.version}/{self.build_config.build_name}-v{self.build_config.version}-notebooks.dbc"
 
@@ -0,0 +1,117 @@
+__all__ = ["PublishingManifest"]
+
+from typing import Dict, Any, List, Optional
+
+
+class PublishingManifest:
+    """
+    Records, for each generated notebook, what it was generated from so that a later publish can skip the notebooks
+    whose inputs have not changed since.
+
+    Each entry holds a hash of the notebook's configuration (library version, i18n resource, solution & test settings),
+    the source notebook's modified_at, the replacements actually substituted into it and the modified_at of each target
+    notebook as imported, so that a target changed or deleted by someone else is regenerated too.
+    """
+
+    def __init__(self, path: str, entries: Dict[str, Dict[str, Any]] = None):
+        self.__path = path
+        self.__entries: Dict[str, Dict[str, Any]] = entries or dict()
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        return self.__entries
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @staticmethod
+    def load(path: str) -> "PublishingManifest":
+        """
+        Loads the manifest at the specified path, an empty manifest if the file doesn't exist or is unreadable.
+        :param path: The local path of the manifest's JSON file
+        :return: the PublishingManifest
+        """
+        import os
+        import json
+
+        if not os.path.exists(path):
+            return PublishingManifest(path)
+
+        try:
+            with open(path) as f:
+                return PublishingManifest(path, json.load(f).get("notebooks"))
+        except ValueError:
+            # A corrupt manifest only costs us a full publish.
+            return PublishingManifest(path)
+
+    def save(self) -> None:
+        import os
+        import json
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # Write then rename so that an interrupted save never leaves a truncated manifest.
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"notebooks": self.__entries}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    @staticmethod
+    def fingerprint(**inputs: Any) -> str:
+        """
+        Hashes the specified inputs, which must be JSON serializable, independent of the order of keys.
+        :return: the hex digest of the inputs' SHA-256
+        """
+        import json
+        import hashlib
+
+        data = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        return self.__entries.get(path)
+
+    def put(self, path: str, *, inputs: str, source_modified_at: Optional[int], replacements: Dict[str, Any], targets: Dict[str, Optional[int]], warnings: List[str]) -> None:
+        self.__entries[path] = {
+            "inputs": inputs,
+            "source_modified_at": source_modified_at,
+            "replacements": replacements,
+            "targets": targets,
+            "warnings": warnings,
+        }
+
+    def remove(self, path: str) -> None:
+        self.__entries.pop(path, None)
+
+    def is_unchanged(self, path: str, *, inputs: str, source_modified_at: Optional[int], replacements: Dict[str, Any], target_objects: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Tests whether the notebook can be skipped, that is if the manifest has an entry for it that matches every input.
+        :param path: The notebook's path, relative to the source directory
+        :param inputs: The fingerprint of the notebook's configuration, see PublishingManifest.fingerprint()
+        :param source_modified_at: The source notebook's modified_at, where None is never unchanged
+        :param replacements: The replacements as they will be applied to the notebook now
+        :param target_objects: The target directory's current listing, keyed by path
+        :return: True if the notebook does not need to be generated again
+        """
+        entry = self.get(path)
+
+        if entry is None or source_modified_at is None:
+            return False
+
+        if entry.get("inputs") != inputs or entry.get("source_modified_at") != source_modified_at:
+            return False
+
+        for key, value in entry.get("replacements", dict()).items():
+            if replacements.get(key) != value:
+                return False
+
+        for target_path, modified_at in entry.get("targets", dict()).items():
+            target = target_objects.get(target_path)
+            if target is None or target.get("modified_at") != modified_at:
+                return False
+
+        return True
@@ -1,12 +1,56 @@
-__all__ = ["Translator"]
+__all__ = ["Translator", "NotebookExportCache"]
 
-from typing import Optional
+import threading
+from typing import Optional, List, Dict, Tuple, Any
 from dbacademy.dbbuild.publish.publisher_class import Publisher
 
 
+class NotebookExportCache:
+    """
+    Exports each source notebook, and lists each source directory, once no matter how many translations are generated
+    from them; concurrent requests for the same notebook wait on the one export in flight.
+    """
+
+    def __init__(self, client: Any):
+        self.client = client
+        self.__lock = threading.Lock()
+        self.__path_locks: Dict[str, threading.Lock] = dict()
+        self.__notebooks: Dict[str, Tuple[str, str]] = dict()
+        self.__listings: Dict[str, List[Dict[str, Any]]] = dict()
+
+    def __path_lock(self, path: str) -> threading.Lock:
+        with self.__lock:
+            return self.__path_locks.setdefault(path, threading.Lock())
+
+    def ls(self, path: str) -> List[Dict[str, Any]]:
+        """
+        Lists the notebooks under the specified directory, recursively.
+        """
+        with self.__path_lock(f"ls:{path}"):
+            if path not in self.__listings:
+                self.__listings[path] = self.client.workspace().ls(path, recursive=True)
+            return self.__listings[path]
+
+    def export_notebook(self, path: str) -> Tuple[str, str]:
+        """
+        Exports the specified notebook.
+        :return: the notebook's language, in lower case, and its source
+        """
+        with self.__path_lock(path):
+            if path not in self.__notebooks:
+                source_info = self.client.workspace().get_status(path)
+                self.__notebooks[path] = (source_info["language"].lower(), self.client.workspace().export_notebook(path))
+            return self.__notebooks[path]
+
+
 class Translator:
 
-    def __init__(self, publisher: Publisher):
+    def __init__(self, publisher: Publisher, i18n_language: str = None, export_cache: NotebookExportCache = None):
+        """
+        :param publisher: The publisher of the course being translated
+        :param i18n_language: The language to translate to, such as "japanese-v1.2.3"; selected with the "i18n_language" widget if not specified
+        :param export_cache: Shares source exports with other translators, see Translator.for_languages()
+        """
         from dbacademy.common import validate
         from dbacademy.dbbuild.publish.publisher_class import Publisher
 
@@ -52,9 +96,14 @@ class Translator:
 
         self.errors = []
         self.warnings = []
-        self.__select_i18n_language(publisher.source_repo)
 
-    def __select_i18n_language(self, source_repo: str):
+        self.__export_cache = export_cache or NotebookExportCache(self.client)
+        self.__i18n_guid_maps: Dict[str, Dict[str, str]] = dict()
+        self.__i18n_guid_maps_lock = threading.Lock()
+
+        self.__select_i18n_language(publisher.source_repo, i18n_language)
+
+    def __select_i18n_language(self, source_repo: str, i18n_language: Optional[str]):
         from dbacademy import dbgems
 
         self.resources_folder = f"{source_repo}/Resources"
@@ -64,12 +113,16 @@ class Translator:
         self.language_options = [p for p in self.language_options if not p.startswith("english-") and not p.startswith("_")]
         self.language_options.sort()
 
-        dbgems.dbutils.widgets.dropdown("i18n_language",
-                                        self.language_options[0],
-                                        self.language_options,
-                                        "i18n Language")
+        if i18n_language is not None:
+            self.i18n_language = i18n_language
+        else:
+            dbgems.dbutils.widgets.dropdown("i18n_language",
+                                            self.language_options[0],
+                                            self.language_options,
+                                            "i18n Language")
+
+            self.i18n_language = dbgems.get_parameter("i18n_language", None)
 
-        self.i18n_language = dbgems.get_parameter("i18n_language", None)
         assert self.i18n_language is not None, f"The i18n language must be specified."
         assert self.i18n_language in self.language_options, f"The selected version must be one of {self.language_options}, found \"{self.i18n_language}\"."
 
@@ -87,6 +140,15 @@ class Translator:
         # This hack just happens to work for japanese and korean
         self.common_language = self.i18n_language.split("-")[0]
 
+    def for_languages(self, i18n_languages: List[str]) -> List["Translator"]:
+        """
+        Creates a translator for each of the specified languages, all of which share this translator's source exports
+        so that, generated together with Translator.generate_all(), each source notebook is exported only once.
+        :param i18n_languages: The languages, each one of Translator.language_options
+        :return: the translators, in the order of the languages
+        """
+        return [Translator(self.publisher, i18n_language=lang, export_cache=self.__export_cache) for lang in i18n_languages]
+
     def __reset_published_repo(self):
         from dbacademy.dbbuild.build_utils_class import BuildUtils
 
@@ -195,28 +257,32 @@ class Translator:
 
     # noinspection PyMethodMayBeStatic
     def _load_i18n_guid_map(self, path: str, i18n_source: str):
-        import re
         from dbacademy.dbbuild.publish.notebook_def_class import NotebookDef
 
         if i18n_source is None:
             return dict()
 
-        i18n_guid_map = dict()
+        name, i18n_guid_map = NotebookDef.parse_i18n_source(i18n_source)
 
-        # parts = re.split(r"^<hr>--i18n-", i18n_source, flags=re.MULTILINE)
-        parts = re.split(r"^<hr>--i18n-|^<hr sandbox>--i18n-", i18n_source, flags=re.MULTILINE)
-
-        name = parts[0].strip()[3:]
         path = path[10:] if path.startswith("Solutions/") else path
         if not path.startswith("Includes/"):
             assert name == path, f"Expected the notebook \"{path}\", found \"{name}\""
 
-        for part in parts[1:]:
-            guid, value = NotebookDef.parse_guid_and_value(part)
-            i18n_guid_map[guid] = value
-
         return i18n_guid_map
 
+    def _get_i18n_guid_map(self, path: str) -> Dict[str, str]:
+        """
+        Returns the GUID map of the specified notebook, loading and parsing its resource only once for both the
+        students and the solutions notebook.
+        """
+        key = path[10:] if path.startswith("Solutions/") else path
+
+        # Resources are local files, loading them under the lock is cheap and guarantees a single load per notebook.
+        with self.__i18n_guid_maps_lock:
+            if key not in self.__i18n_guid_maps:
+                self.__i18n_guid_maps[key] = self._load_i18n_guid_map(key, self._load_i18n_source(key))
+            return self.__i18n_guid_maps[key]
+
     @property
     def validated(self):
         return self.__validated
@@ -330,10 +396,16 @@ class Translator:
     def assert_notebooks_generated(self):
         assert self.__generated_notebooks, f"The notebooks have not been published. See Translator.publish_notebooks()"
 
-    def generate_notebooks(self, skip_generation: bool = False) -> Optional[str]:
+    def generate_notebooks(self, skip_generation: bool = False, max_workers: int = 8) -> Optional[str]:
+        """
+        Generates the translated notebooks from the published english notebooks
+        :param skip_generation: Overrides the default behavior and skips generation of the notebook
+        :param max_workers: The number of notebooks translated and imported at once
+        :return: The HTML results that should be rendered with displayHTML() from the calling notebook
+        """
         from datetime import datetime
+        from dbacademy.common import FleetExecutor
         from dbacademy.dbbuild.build_utils_class import BuildUtils
-        from dbacademy.dbbuild.publish.notebook_def_class import NotebookDef
         from dbacademy.dbbuild.publish.publisher_class import Publisher
         from dbacademy import dbgems, common
 
@@ -354,92 +426,36 @@ class Translator:
         start = dbgems.clock_start()
         print(f"| Enumerating files", end="...")
         prefix = len(self.source_dir) + 1
-        source_files = [f.get("path")[prefix:] for f in self.client.workspace.ls(self.source_dir, recursive=True)]
+        source_files = [f.get("path")[prefix:] for f in self.__export_cache.ls(self.source_dir)]
         print(dbgems.clock_stopped(start))
 
         # We have to first create the directory before writing to it.
         # Processing them first, once and only once, avoids duplicate REST calls.
         start = dbgems.clock_start()
         print(f"| Pre-creating directory structures", end="...")
-        processed_directory = []
-        for file in source_files:
-            target_notebook_path = f"{self.target_dir}/{file}"
-            if target_notebook_path not in processed_directory:
-                processed_directory.append(target_notebook_path)
-                target_notebook_dir = "/".join(target_notebook_path.split("/")[:-1])
-                self.client.workspace.mkdirs(target_notebook_dir)
+        target_notebook_dirs = sorted({"/".join(f"{self.target_dir}/{file}".split("/")[:-1]) for file in source_files})
+        for target_notebook_dir in target_notebook_dirs:
+            self.client.workspace().mkdirs(target_notebook_dir)
         print(dbgems.clock_stopped(start))
 
-        print(f"\nProcessing {len(source_files)} notebooks:")
-        for file in source_files:
-            print(f"/{file}")
+        built_on = datetime.now().strftime("%b %-d, %Y at %H:%M:%S UTC")
 
-            source = self._load_i18n_source(file)
-            i18n_guid_map = self._load_i18n_guid_map(file, source)
-
-            # Compute the source and target directories
-            source_notebook_path = f"{self.source_dir}/{file}"
-            target_notebook_path = f"{self.target_dir}/{file}"
-
-            source_info = self.client.workspace().get_status(source_notebook_path)
-            language = source_info["language"].lower()
-            cmd_delim = NotebookDef.get_cmd_delim(language)
-            cm = NotebookDef.get_comment_marker(language)
-
-            raw_source = self.client.workspace().export_notebook(source_notebook_path)
-            raw_lines = raw_source.split("\n")
-            header = raw_lines.pop(0)
-            source = "\n".join(raw_lines)
-
-            if file.startswith("Includes/"):
-                # Write the original notebook to the target directory
-                self.client.workspace.import_notebook(language=language.upper(),
-                                                      notebook_path=target_notebook_path,
-                                                      content=raw_source,
-                                                      overwrite=True)
-                continue
-
-            commands = source.split(cmd_delim)
-            new_commands = [commands.pop(0)]  # Should be the header directives(?)
-
-            for i, command in enumerate(commands):
-                command = command.strip()
-                line_zero = command.strip().split("\n")[0]
-                guid = self.extract_i18n_guid(i=i, cm=cm, command=command, scan_line=line_zero)
-
-                if guid is None:
-                    new_commands.append(command)                            # No GUID, it's %python or other type of command, not MD
-                else:
-                    if guid not in i18n_guid_map.keys():
-                        for key in i18n_guid_map.keys():
-                            print(f"| {key}")
-                        raise AssertionError(f"Cmd #{i+2} | The GUID \"{guid}\" was not found in \"{file}\".")
-
-                    replacements = i18n_guid_map[guid].strip().split("\n")  # Get the replacement text for the specified GUID
-                    cmd_lines = [f"{cm} MAGIC {x}" for x in replacements]   # Prefix the magic command to each line
-
-                    lines = [line_zero]                                     # The first line doesn't exist in the guid map
-                    if "DBTITLE" in command:
-                        # This is the new format, add %md or %md-sandbox
-                        lines.append("%md-sandbox" if "%md-sandbox" in command else "%md")
-
-                    lines.extend(cmd_lines)                                 # Convert to a set of lines and append
-                    new_command = "\n".join(lines)                          # Combine all the lines into a new command
-                    new_commands.append(new_command.strip())                # Append the new command to set of commands
-
-            new_source = f"{header}\n"                           # Add the Databricks Notebook Header
-            new_source += f"\n{cmd_delim}\n".join(new_commands)  # Join all the new_commands into one
-
-            # Update the built_on and version_number - typically only found in the Version Info notebook.
-            new_source = new_source.replace("{{course_name}}", self.build_config.name)
-            new_source = new_source.replace("{{version_number}}", self.version)
-            new_source = new_source.replace("{{built_on}}", datetime.now().strftime("%b %-d, %Y at %H:%M:%S UTC"))
+        def translate(file: str) -> None:
+            language, content = self.__translate_notebook(file, built_on)
 
             # Write the new notebook to the target directory
-            self.client.workspace.import_notebook(language=language.upper(),
-                                                  notebook_path=target_notebook_path,
-                                                  content=new_source,
-                                                  overwrite=True)
+            self.client.workspace().import_notebook(language=language.upper(),
+                                                    notebook_path=f"{self.target_dir}/{file}",
+                                                    content=content,
+                                                    overwrite=True)
+
+        start = dbgems.clock_start()
+        print(f"\nProcessing {len(source_files)} notebooks", end="...")
+        FleetExecutor(max_workers=max_workers).map(translate, source_files)
+        print(dbgems.clock_stopped(start))
+
+        for file in source_files:
+            print(f"/{file}")
 
         self.__generated_notebooks = True
 
@@ -447,6 +463,81 @@ class Translator:
                      <div><a href="{dbgems.get_workspace_url()}#workspace{self.target_dir}/{Publisher.VERSION_INFO_NOTEBOOK}" target="_blank">See Published Version</a></div>
                    </body></html>"""
 
+    def __translate_notebook(self, file: str, built_on: str) -> Tuple[str, str]:
+        """
+        Translates the specified source notebook.
+        :param file: The notebook's path relative to the source directory
+        :param built_on: The value of the {{built_on}} replacement
+        :return: the notebook's language and its translated source
+        """
+        from dbacademy.dbbuild.publish.notebook_def_class import NotebookDef
+
+        language, raw_source = self.__export_cache.export_notebook(f"{self.source_dir}/{file}")
+
+        if file.startswith("Includes/"):
+            # Write the original notebook to the target directory
+            return language, raw_source
+
+        i18n_guid_map = self._get_i18n_guid_map(file)
+
+        cmd_delim = NotebookDef.get_cmd_delim(language)
+        cm = NotebookDef.get_comment_marker(language)
+
+        raw_lines = raw_source.split("\n")
+        header = raw_lines.pop(0)
+        source = "\n".join(raw_lines)
+
+        commands = source.split(cmd_delim)
+        new_commands = [commands.pop(0)]  # Should be the header directives(?)
+
+        for i, command in enumerate(commands):
+            command = command.strip()
+            line_zero = command.strip().split("\n")[0]
+            guid = self.extract_i18n_guid(i=i, cm=cm, command=command, scan_line=line_zero)
+
+            if guid is None:
+                new_commands.append(command)                            # No GUID, it's %python or other type of command, not MD
+            else:
+                if guid not in i18n_guid_map.keys():
+                    keys = "".join(f"\n| {key}" for key in i18n_guid_map.keys())
+                    raise AssertionError(f"Cmd #{i+2} | The GUID \"{guid}\" was not found in \"{file}\".{keys}")
+
+                replacements = i18n_guid_map[guid].strip().split("\n")  # Get the replacement text for the specified GUID
+                cmd_lines = [f"{cm} MAGIC {x}" for x in replacements]   # Prefix the magic command to each line
+
+                lines = [line_zero]                                     # The first line doesn't exist in the guid map
+                if "DBTITLE" in command:
+                    # This is the new format, add %md or %md-sandbox
+                    lines.append("%md-sandbox" if "%md-sandbox" in command else "%md")
+
+                lines.extend(cmd_lines)                                 # Convert to a set of lines and append
+                new_command = "\n".join(lines)                          # Combine all the lines into a new command
+                new_commands.append(new_command.strip())                # Append the new command to set of commands
+
+        new_source = f"{header}\n"                           # Add the Databricks Notebook Header
+        new_source += f"\n{cmd_delim}\n".join(new_commands)  # Join all the new_commands into one
+
+        # Update the built_on and version_number - typically only found in the Version Info notebook.
+        new_source = new_source.replace("{{course_name}}", self.build_config.name)
+        new_source = new_source.replace("{{version_number}}", self.version)
+        new_source = new_source.replace("{{built_on}}", built_on)
+
+        return language, new_source
+
+    @staticmethod
+    def generate_all(translators: List["Translator"], skip_generation: bool = False, max_workers: int = 8) -> List[Optional[str]]:
+        """
+        Generates the notebooks of several translations at once, see Translator.for_languages(); each translator must
+        have been validated as for Translator.generate_notebooks().
+        :param translators: The translators, one per language
+        :param skip_generation: Overrides the default behavior and skips generation of the notebook
+        :param max_workers: The number of notebooks translated and imported at once, per language
+        :return: The HTML results of each translator, in the order of the translators
+        """
+        from dbacademy.common import FleetExecutor
+
+        return FleetExecutor(max_workers=len(translators)).map(lambda t: t.generate_notebooks(skip_generation=skip_generation, max_workers=max_workers), translators)
+
     def assert_created_docs(self):
         assert self.__created_docs, "The docs have not yet been created. See Translator.create_docs()"
 
@@ -487,18 +578,18 @@ class Translator:
             # With a target repo, we need to validate that there are no uncommitted changes
             self.assert_no_changes_in_target_repo()
 
+        # Exported once, straight to disk, then copied.
         print(f"Exporting DBC from \"{self.target_dir}\"")
-        data = self.client.workspace.export_dbc(self.target_dir)
-
-        BuildUtils.write_file(data=data,
-                              overwrite=False,
-                              target_name="Distributions System (versioned)",
-                              target_file=f"dbfs:/mnt/resources.training.databricks.com/distributions/{self.build_name}/v{self.version}-PENDING/{self.build_name}-v{self.version}-notebooks.dbc")
-
-        BuildUtils.write_file(data=data,
-                              overwrite=True,
-                              target_name="Workspace-Local FileStore",
-                              target_file=f"dbfs:/FileStore/tmp/{self.build_name}-v{self.version}-PENDING/{self.build_name}-v{self.version}-notebooks.dbc")
+        dbc_file = BuildUtils.export_dbc(client=self.client,
+                                         source_dir=self.target_dir,
+                                         overwrite=False,
+                                         target_name="Distributions System (versioned)",
+                                         target_file=f"dbfs:/mnt/resources.training.databricks.com/distributions/{self.build_name}/v{self.version}-PENDING/{self.build_name}-v{self.version}-notebooks.dbc")
+
+        BuildUtils.copy_file(source_file=dbc_file,
+                             overwrite=True,
+                             target_name="Workspace-Local FileStore",
+                             target_file=f"dbfs:/FileStore/tmp/{self.build_name}-v{self.version}-PENDING/{self.build_name}-v{self.version}-notebooks.dbc")
 
         url = f"/files/tmp/{self.build_name}-v{self.version}/{self.build_name}-v{self.version}-notebooks.dbc"
         dbgems.display_html(f"""<html><body style="font-size:16px"><div><a href="{url}" target="_blank">Download DBC</a></div></body></html>""")
@@ -24,6 +24,11 @@ class TestSuite:
         self.slack_thread_ts = None
         self.slack_first_message = None
 
+        # Status updates are delivered in order on a background thread, tests never wait on Slack.
+        from dbacademy.common import BackgroundQueue
+        self.__slack_queue = BackgroundQueue("Slack Notification")
+        self.__slack_session = None
+
         self.keep_success = keep_success
 
         if dbgems.is_job():
@@ -163,6 +168,7 @@ class TestSuite:
                 response = self.client.runs().wait_for(run_id)
                 passed = False if not self.conclude_test(test, response) else passed
 
+        self.flush_status_updates()
         return passed
 
     def test_all_asynchronously(self, test_round: int, service_principal: str = None, policy_id: str = None) -> bool:
@@ -194,13 +200,25 @@ class TestSuite:
         passed = True
         print(f"""\nWaiting for all test to complete:""")
 
-        # Block until all tests completed
+        # Block until all tests completed, concluding each as soon as it finishes
+        from dbacademy.clients.databricks.run_watcher import RunWatcher
+
+        waiting = set()
+
+        def on_poll(test, run, next_poll_seconds):
+            # Reported once per test, the first time it is found still running; delivered by the Slack queue.
+            if test.run_id not in waiting:
+                waiting.add(test.run_id)
+                self.send_status_update("info", f"Waiting for */{test.notebook.path}*")
+
+        watcher = RunWatcher(on_poll=on_poll)
         for test in tests:
-            self.send_status_update("info", f"Waiting for */{test.notebook.path}*")
+            watcher.watch(self.client.runs, test.run_id, tag=test)
 
-            response = self.client.runs().wait_for(test.run_id)
+        for test, response in watcher.completions():
             passed = False if not self.conclude_test(test, response) else passed
 
+        self.flush_status_updates()
         return passed
 
     def conclude_test(self, test, response) -> bool:
@@ -283,23 +301,37 @@ class TestSuite:
             self.send_status_update("info", f"*{self.build_config.name}*\nCloud: *{self.build_config.cloud}* | Mode: *{self.test_type}*")
 
     def send_status_update(self, message_type, message):
-        import requests, json
-        from dbacademy import common
-
         if self.slack_first_message is None:
             self.slack_first_message = message
 
+        first_message = self.slack_first_message
+        self.__slack_queue.submit(lambda: self.__post_status_update(message_type, message, first_message))
+
+    def flush_status_updates(self, timeout_seconds: float = 60) -> bool:
+        """Blocks until the status updates sent so far have been delivered, returning False if `timeout_seconds` elapsed first."""
+        return self.__slack_queue.flush(timeout_seconds)
+
+    def __post_status_update(self, message_type, message, first_message):
+        import time
+        import json
+        import requests
+
+        if self.__slack_session is None:
+            self.__slack_session = requests.Session()
+
         payload = {
             "channel": "curr-smoke-tests",
             "message": message,
             "message_type": message_type,
-            "first_message": self.slack_first_message,
-            "thread_ts": self.slack_thread_ts
+            "first_message": first_message,
+            "thread_ts": self.slack_thread_ts  # Set by the previous update, which the queue has already delivered.
         }
 
-        try:
-            response = requests.post("https://rqbr3jqop0.execute-api.us-west-2.amazonaws.com/prod/slack/client", data=json.dumps(payload))
-            assert response.status_code == 200, f"({response.status_code}): {response.text}"
-            self.slack_thread_ts = response.json().get("data", {}).get("thread_ts")
-        except Exception as e:
-            common.print_warning(title="Slack Notification Failure", message=str(e), length=100)
+        for attempt in range(5):
+            response = self.__slack_session.post("https://rqbr3jqop0.execute-api.us-west-2.amazonaws.com/prod/slack/client", data=json.dumps(payload))
+            if response.status_code != 429:
+                break
+            time.sleep(float(response.headers.get("Retry-After", 1)))
+
+        assert response.status_code == 200, f"({response.status_code}): {response.text}"
+        self.slack_thread_ts = response.json().get("data", {}).get("thread_ts")
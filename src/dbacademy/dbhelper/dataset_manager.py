@@ -1,11 +1,18 @@
 __all__ = ["DatasetManager"]
 
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Set, Callable
 from dbacademy.dbhelper.dbacademy_helper import DBAcademyHelper
 
 
 class DatasetManager:
 
+    # Written to the install path after a successful validation, recording the size and modification time of each file.
+    MANIFEST_FILE = "/_dbacademy_manifest.json"
+    # Written to the datasets path once the archive has been completely unpacked into it, recording each member's size and CRC.
+    UNPACKED_FILE = "/_dbacademy_unpacked.json"
+    # Bookkeeping files that validation neither expects from the remote repository nor removes.
+    INTERNAL_FILES = (MANIFEST_FILE, UNPACKED_FILE)
+
     @staticmethod
     def from_dbacademy_helper(da: DBAcademyHelper):
 
@@ -142,14 +149,36 @@ class DatasetManager:
         print(f"""|""")
         print(f"""| Downloading "{file}"...""", end="")
 
-        dbgems.dbutils.fs.cp(f"{self.data_source_uri}/{file}",
-                             f"{self.install_path}/{file}", True)
+        self.download_file(f"{self.data_source_uri}/{file}", f"{self.install_path}/{file}")
 
         print(dbgems.clock_stopped(download_start))
         print("| ")
 
         return self.install_dataset_done(install_start)
 
+    @staticmethod
+    def download_file(source_file: str, target_file: str) -> None:
+        """
+        Copies source_file to target_file and verifies its size, removing the copy if it is incomplete so that a failed
+        download is never mistaken for a complete one.  The copy is made in place rather than renamed from a temporary
+        file because a move on DBFS or object storage is a second full copy; an interrupted copy is instead caught by
+        the size check of the next validation, see validate_datasets().
+        """
+        from dbacademy import dbgems
+
+        try:
+            expected_size = dbgems.dbutils.fs.ls(source_file)[0].size
+        except Exception:
+            expected_size = None  # The source cannot be listed, e.g. a restricted bucket; trust the copy.
+
+        dbgems.dbutils.fs.cp(source_file, target_file, True)
+
+        if expected_size is not None:
+            actual_size = dbgems.dbutils.fs.ls(target_file)[0].size
+            if actual_size != expected_size:
+                dbgems.dbutils.fs.rm(target_file, True)
+                raise IOError(f"""Downloaded {actual_size} of {expected_size} bytes from "{source_file}".""")
+
     def install_dataset_done(self, install_start: int) -> None:
         from dbacademy import dbgems
 
@@ -160,34 +189,93 @@ class DatasetManager:
         print(f"""| Dataset installation completed {dbgems.clock_stopped(install_start)}\n""")
 
     def unpack_archive(self) -> None:
-        import shutil
+        import json
         from dbacademy import dbgems
-        from dbacademy.dbhelper.paths import Paths
 
         unpack_start = dbgems.clock_start()
         if self.archives_path is None:
             print(f"| archives_path = {self.archives_path}")
             return  # This is a classic install, nothing to unpack
 
+        # Kept with the datasets rather than the shared archive, each user unpacks into their own datasets path.
+        unpacked_file = f"{self.datasets_path}{DatasetManager.UNPACKED_FILE}"
         try:
-            files = list() if not Paths.exists(self.datasets_path) else dbgems.dbutils.fs.ls(self.datasets_path)
+            dbgems.dbutils.fs.head(unpacked_file, 1)
+            unpacked = True
         except:
-            files = list()
+            unpacked = False
 
-        if len(files) > 0:
+        if unpacked:
             print(f"""|""")
             print(f"""| Skipping the unpacking of datasets to "{self.datasets_path}" """)
         else:
+            # Also reached when a previous unpacking was interrupted, in which case only the missing or damaged members are extracted.
             print(f"""|""")
             print(f"""| Unpacking datasets to "{self.datasets_path}"...""", end="")
             archive_path = f"{self.archives_path}/archive.zip".replace("dbfs:/", '/dbfs/')
             dataset_path = self.datasets_path.replace("dbfs:/", '/dbfs/')
-            shutil.unpack_archive(archive_path, dataset_path)
+            members = DatasetManager.extract_archive(archive_path, dataset_path)
+            dbgems.dbutils.fs.put(unpacked_file, json.dumps(members), True)
             print(dbgems.clock_stopped(unpack_start))
 
-    def validate_datasets(self, fail_fast: bool) -> None:
+    @staticmethod
+    def extract_archive(archive_path: str, target_dir: str, max_workers: int = 8) -> Dict[str, Any]:
+        """
+        Extracts the zip archive into target_dir, distributing its members over max_workers concurrent readers, each with its own handle on the archive.
+        Members already present with the expected size and CRC (e.g. from an interrupted extraction) are not extracted again; the CRC of every extracted
+        member is verified by zipfile as it is read.
+
+        Returns:
+            The size and CRC of every member, keyed by name.
+        """
+        import os
+        import zlib
+        import zipfile
+        from dbacademy.common import FleetExecutor
+
+        with zipfile.ZipFile(archive_path) as archive:
+            members = [m for m in archive.infolist() if not m.is_dir()]
+
+        def is_extracted(member: zipfile.ZipInfo) -> bool:
+            path = os.path.join(target_dir, member.filename)
+            if not os.path.isfile(path) or os.path.getsize(path) != member.file_size:
+                return False
+            crc = 0
+            with open(path, "rb") as f:
+                while chunk := f.read(1024*1024):
+                    crc = zlib.crc32(chunk, crc)
+            return crc == member.CRC
+
+        def extract(shard: List[zipfile.ZipInfo]) -> None:
+            with zipfile.ZipFile(archive_path) as shard_archive:
+                for shard_member in shard:
+                    shard_archive.extract(shard_member, target_dir)
+
+        executor = FleetExecutor(max_workers=max_workers)
+        remaining = [m for m, extracted in zip(members, executor.map(is_extracted, members)) if not extracted]
+
+        # Balance the shards by size, assigning the largest members first to the least loaded shard.
+        shards: List[List[zipfile.ZipInfo]] = [list() for _ in range(max(1, max_workers))]
+        loads = [0] * len(shards)
+        for member in sorted(remaining, key=lambda m: m.file_size, reverse=True):
+            index = loads.index(min(loads))
+            shards[index].append(member)
+            loads[index] += member.file_size
+
+        # zipfile creates a member's parent directories unless they exist, which races between the shards.
+        for directory in {os.path.dirname(os.path.join(target_dir, m.filename)) for m in remaining}:
+            os.makedirs(directory, exist_ok=True)
+
+        executor.map(extract, [shard for shard in shards if len(shard) > 0])
+
+        return {m.filename: {"size": m.file_size, "crc": m.CRC} for m in members}
+
+    def validate_datasets(self, fail_fast: bool, deep: bool = False) -> None:
         """
         Validates the "install" of the datasets by recursively listing all files in the remote data repository as well as the local data repository, validating that each file exists but DOES NOT validate file size or checksum.
+
+        Once a full validation finds nothing to repair, a manifest of the install is written; subsequent validations list only the top level of the install and
+        compare it to the manifest, falling back to the full validation only if anything changed or if deep is True.
         """
         from dbacademy import dbgems
 
@@ -195,6 +283,11 @@ class DatasetManager:
         validation_start = dbgems.clock_start()
         print(f"| Validating local assets:")
 
+        if not deep and self.__validate_against_manifest():
+            print(f"| | Validated against manifest", end="...")
+            print(dbgems.clock_stopped(validation_start, " total"))
+            return
+
         self.__validate_and_repair()
 
         if self.fixes == 1:
@@ -215,16 +308,126 @@ class DatasetManager:
         print("| | Listing local files", end="...")
         start = dbgems.clock_start()
 
-        local_files = DatasetManager.list_r(self.install_path)
+        local_infos = DatasetManager.list_r_info(self.install_path)
+        local_files = set(local_infos) - set(DatasetManager.INTERNAL_FILES)
+        remote_files = set(self.__remote_files)
         print(dbgems.clock_stopped(start))
 
         # Process directories first
-        self.__del_extra_paths(local_files)
-        self.__add_extra_paths(local_files)
+        self.__del_extra_paths(sorted(local_files - remote_files))
+        self.__add_extra_paths(sorted(remote_files - local_files))
 
         # Then process individual files
-        self.__del_extra_files(local_files)
-        self.__add_extra_files(local_files)
+        self.__del_extra_files(sorted(local_files - remote_files))
+        self.__add_extra_files(sorted(remote_files - local_files))
+        self.__repair_changed_files(sorted(local_files & remote_files), local_infos)
+
+        if self.fixes == 0:
+            # The listing is known to be good, record it so that the next validation can skip the full listing.
+            self.write_manifest({path: info for path, info in local_infos.items() if path in local_files})
+
+    def __repair_changed_files(self, files: List[str], local_infos: Dict[str, Any]) -> None:
+        """
+        Re-downloads the files whose size or modification time differ from the manifest, e.g. a truncated archive, unless
+        their size still matches that of the remote file; without a remote size to compare to, that of the manifest is used.
+        Without a manifest, e.g. after an interrupted first download, every file is compared to the remote file.
+        :return: None
+        """
+        from dbacademy import dbgems
+        from dbacademy.common import FleetExecutor
+
+        manifest = self.read_manifest()
+        known_good = dict() if manifest is None else manifest.get("files", dict())
+
+        changed = [f for f in files if not f.endswith("/") and (manifest is None or (f in known_good and self._file_entry(local_infos[f]) != known_good[f]))]
+
+        def is_damaged(file: str) -> bool:
+            try:
+                expected_size = dbgems.dbutils.fs.ls(f"{self.data_source_uri}/{file[1:]}")[0].size
+            except Exception:
+                # The source cannot be listed, e.g. a restricted bucket.
+                expected_size = known_good.get(file, dict()).get("size", getattr(local_infos[file], "size", None))
+            return getattr(local_infos[file], "size", None) != expected_size
+
+        def restore(file: str) -> str:
+            start = dbgems.clock_start()
+            self.download_file(f"{self.data_source_uri}/{file[1:]}", f"{self.install_path}/{file[1:]}")
+            return f"| | restored changed file: {file}...{dbgems.clock_stopped(start)}"
+
+        damaged = [f for f, d in zip(changed, FleetExecutor(max_workers=8).map(is_damaged, changed)) if d]
+
+        self.__repair_files(restore, damaged)
+
+    @property
+    def manifest_path(self) -> str:
+        return f"{self.install_path}{DatasetManager.MANIFEST_FILE}"
+
+    @staticmethod
+    def _file_entry(info: Any) -> Dict[str, Any]:
+        return {"size": getattr(info, "size", None), "modificationTime": getattr(info, "modificationTime", None)}
+
+    def write_manifest(self, local_infos: Dict[str, Any]) -> None:
+        """
+        Records the relative path, size and modification time of every installed file; see validate_datasets()
+        """
+        import json
+        from dbacademy import dbgems
+
+        manifest = {
+            "version": 1,
+            "remote_files": sorted(self.__remote_files),
+            "files": {path: self._file_entry(info) for path, info in sorted(local_infos.items())}
+        }
+        try:
+            dbgems.dbutils.fs.put(self.manifest_path, json.dumps(manifest), True)
+        except Exception as e:
+            print(f"| | Unable to write the dataset manifest: {e}")
+
+    def read_manifest(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the manifest written by the last successful validation, or None if there isn't one or it is unreadable.
+        """
+        import json
+        from dbacademy import dbgems
+
+        try:
+            manifest = json.loads(dbgems.dbutils.fs.head(self.manifest_path, 16*1024*1024))
+        except Exception:
+            return None
+
+        if manifest.get("version") != 1 or manifest.get("remote_files") != sorted(self.__remote_files):
+            return None  # Written by a different version or for a different set of remote files.
+
+        return manifest
+
+    def __validate_against_manifest(self) -> bool:
+        """
+        Compares the top level of the install to the manifest, returning True if every entry is present and unchanged.
+        """
+        from dbacademy import dbgems
+
+        manifest = self.read_manifest()
+        if manifest is None:
+            return False
+
+        expected = {path: entry for path, entry in manifest.get("files", dict()).items()
+                    if path.rstrip("/").count("/") == 1}  # Top level entries only, e.g. "/archive.zip" or "/retail/"
+
+        try:
+            listed = dbgems.dbutils.fs.ls(self.install_path)
+        except Exception:
+            return False
+
+        prefix = self.install_path
+        actual = {info.path[len(prefix):]: self._file_entry(info) for info in listed}
+        for internal_file in DatasetManager.INTERNAL_FILES:
+            actual.pop(internal_file, None)
+
+        if set(actual) != set(expected):
+            return False
+
+        # Directories report no meaningful size, files must match exactly.
+        return all(path.endswith("/") or actual[path] == expected[path] for path in expected)
 
     def __dataset_not_fixed(self, test_file: str) -> bool:
         for repaired_path in self.repaired_paths:
@@ -232,15 +435,15 @@ class DatasetManager:
                 return False
         return True
 
-    def __del_extra_paths(self, local_files: List[str]) -> None:
+    def __del_extra_paths(self, extra_files: List[str]) -> None:
         """
         Removes extra directories (cascade effect vs one file at a time)
         :return: None
         """
         from dbacademy import dbgems
 
-        for file in local_files:
-            if file not in self.__remote_files and file.endswith("/") and self.__dataset_not_fixed(test_file=file):
+        for file in extra_files:
+            if file.endswith("/") and self.__dataset_not_fixed(test_file=file):
                 self.__fixes += 1
                 start = dbgems.clock_start()
                 self.repaired_paths.append(file)
@@ -248,15 +451,15 @@ class DatasetManager:
                 dbgems.dbutils.fs.rm(f"{self.install_path}/{file[1:]}", True)
                 print(dbgems.clock_stopped(start))
 
-    def __add_extra_paths(self, local_files: List[str]) -> None:
+    def __add_extra_paths(self, missing_files: List[str]) -> None:
         """
         Adds extra directories (cascade effect vs one file at a time)
         :return: None
         """
         from dbacademy import dbgems
 
-        for file in self.__remote_files:
-            if file not in local_files and file.endswith("/") and self.__dataset_not_fixed(test_file=file):
+        for file in missing_files:
+            if file.endswith("/") and self.__dataset_not_fixed(test_file=file):
                 self.__fixes += 1
                 start = dbgems.clock_start()
                 self.repaired_paths.append(file)
@@ -266,60 +469,80 @@ class DatasetManager:
                 dbgems.dbutils.fs.cp(source_file, target_file, True)
                 print(dbgems.clock_stopped(start))
 
-    def __del_extra_files(self, local_files: List[str]) -> None:
+    def __del_extra_files(self, extra_files: List[str]) -> None:
         """
-        Remove one file at a time (picking up what was not covered by processing directories)
+        Remove the individual files (picking up what was not covered by processing directories), several at a time
         :return: None
         """
         from dbacademy import dbgems
 
-        for file in local_files:
-            if file not in self.__remote_files and not file.endswith("/") and self.__dataset_not_fixed(test_file=file):
-                self.__fixes += 1
-                start = dbgems.clock_start()
-                print(f"| | removing extra file: {file}", end="...")
-                dbgems.dbutils.fs.rm(f"{self.install_path}/{file[1:]}", True)
-                print(dbgems.clock_stopped(start))
+        def remove(file: str) -> str:
+            start = dbgems.clock_start()
+            dbgems.dbutils.fs.rm(f"{self.install_path}/{file[1:]}", True)
+            return f"| | removed extra file: {file}...{dbgems.clock_stopped(start)}"
 
-    def __add_extra_files(self, local_files: List[str]) -> None:
+        self.__repair_files(remove, [f for f in extra_files if not f.endswith("/")])
+
+    def __add_extra_files(self, missing_files: List[str]) -> None:
         """
-        Add one file at a time (picking up what was not covered by processing directories)
+        Add the individual files (picking up what was not covered by processing directories), several at a time
         :return: None
         """
         from dbacademy import dbgems
 
-        for file in self.__remote_files:
-            if file not in local_files and not file.endswith("/") and self.__dataset_not_fixed(test_file=file):
-                self.__fixes += 1
-                start = dbgems.clock_start()
-                print(f"| | restoring missing file: {file}", end="...")
-                source_file = f"{self.data_source_uri}/{file[1:]}"
-                target_file = f"{self.install_path}/{file[1:]}"
-                dbgems.dbutils.fs.cp(source_file, target_file, True)
-                print(dbgems.clock_stopped(start))
+        def restore(file: str) -> str:
+            start = dbgems.clock_start()
+            self.download_file(f"{self.data_source_uri}/{file[1:]}", f"{self.install_path}/{file[1:]}")
+            return f"| | restored missing file: {file}...{dbgems.clock_stopped(start)}"
+
+        self.__repair_files(restore, [f for f in missing_files if not f.endswith("/")])
+
+    def __repair_files(self, repair: Callable[[str], str], files: List[str]) -> None:
+        from dbacademy.common import FleetExecutor
+
+        files = [f for f in files if self.__dataset_not_fixed(test_file=f)]
+        self.__fixes += len(files)
+
+        for message in FleetExecutor(max_workers=8).map(repair, files):
+            print(message)
 
     @classmethod
     def list_r(cls, path: str, prefix: Optional[str] = None, results: Optional[List[str]] = None) -> List[str]:
         """
         Utility method used by the dataset validation, this method performs a recursive list of the specified path and returns the sorted list of paths.
         """
-        from dbacademy import dbgems
-
-        if prefix is None:
-            prefix = path
-        if results is None:
-            results = list()
-
-        try:
-            files = dbgems.dbutils.fs.ls(path)
-        except:
-            files = []
-
-        for file in files:
-            data = file.path[len(prefix):]
-            results.append(data)
-            if file.isDir():
-                DatasetManager.list_r(file.path, prefix, results)
-
+        results = list() if results is None else results
+        results.extend(cls.list_r_info(path, prefix))
         results.sort()
         return results
+
+    @classmethod
+    def list_r_info(cls, path: str, prefix: Optional[str] = None, max_workers: int = 16) -> Dict[str, Any]:
+        """
+        Recursively lists the specified path, returning the FileInfo of every file and directory keyed by its path relative to prefix.
+        Each level of the tree is listed in parallel, directories being listed concurrently rather than one after another.
+        """
+        from dbacademy import dbgems
+        from dbacademy.common import FleetExecutor
+
+        prefix = path if prefix is None else prefix
+        executor = FleetExecutor(max_workers=max_workers)
+
+        def ls(directory: str) -> List[Any]:
+            try:
+                return dbgems.dbutils.fs.ls(directory)
+            except:
+                return []
+
+        infos: Dict[str, Any] = dict()
+        directories: Set[str] = {path}
+        while len(directories) > 0:
+            next_directories = set()
+            for files in executor.map(ls, sorted(directories)):
+                for file in files:
+                    infos[file.path[len(prefix):]] = file
+                    if file.isDir():
+                        next_directories.add(file.path)
+            directories = next_directories
+
+        return infos
@@ -1,6 +1,6 @@
 __all__ = ["WorkspaceHelper"]
 
-from typing import Callable, List, TypeVar, Optional, Union, Dict, Any
+from typing import Callable, List, TypeVar, Optional, Union, Dict, Any, Tuple
 from dbacademy.dbhelper import dbh_constants
 from dbacademy.dbhelper.lesson_config import LessonConfig
 from dbacademy.clients.databricks import DBAcademyRestClient
@@ -170,40 +170,103 @@ class WorkspaceHelper:
 
             print("-" * 80)
 
-    def install_courseware(self, courses_arg: str, subdirectory: str, usernames: List[str] = None) -> None:
-
+    def install_courseware(self, courses_arg: str, subdirectory: str, usernames: List[str] = None, max_workers: int = 8) -> Dict[str, Dict[str, str]]:
+        """
+        Installs each course into the folder of each user, skipping the users whose folder already has content.
+        :param courses_arg: The comma seperated course definitions, see parse_course_args()
+        :param subdirectory: The folder, relative to each user's home folder, into which the courses are installed
+        :param usernames: The users to install the courses for, all users if None
+        :param max_workers: The maximum number of courses installed concurrently
+        :return: the status of each course's install_dir, "Installed" or "Skipped", keyed by username
+        """
         usernames, course_defs = self.__parse_args(courses_arg, usernames)
 
-        for username in usernames:
-
-            print(f"Installing courses for {username}")
-
-            for course_def in course_defs:
-                print()
-
-                url, course, version, artifact, token = WorkspaceHelper.parse_course_args(course_def)
-                download_url = WorkspaceHelper.compose_courseware_url(url, course, version, artifact, token)
+        courses = list()
+        for course_def in course_defs or list():
+            url, course, version, artifact, token = WorkspaceHelper.parse_course_args(course_def)
+            courses.append((course, WorkspaceHelper.compose_courseware_url(url, course, version, artifact, token)))
+
+        return self.install_courses(courses, subdirectory, usernames, max_workers=max_workers)
+
+    def install_courses(self, courses: List[Tuple[str, str]], subdirectory: Optional[str], usernames: List[str], max_workers: int = 8) -> Dict[str, Dict[str, str]]:
+        """
+        Installs each course into the folder of each user, skipping the users whose folder already has content.
+
+        Each course's DBC is downloaded once, when first needed, into a temporary directory of this call's own and is then
+        imported for all users & courses in a single wave with up to max_workers imports in flight against this workspace.
+        Once the wave is over, the status of every install is printed and, should any have failed, an exception is raised.
+        :param courses: The name & download URL of each course, see compose_courseware_url()
+        :param subdirectory: The folder, relative to each user's home folder, into which the courses are installed
+        :param usernames: The users to install the courses for
+        :param max_workers: The maximum number of courses installed concurrently
+        :return: the status of each course's install_dir, "Installed" or "Skipped", keyed by username
+        """
+        import os
+        import tempfile
+        import threading
+        from dbacademy.common import FleetExecutor
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            download_locks = [threading.Lock() for _ in courses]
+            download_errors: Dict[int, Exception] = dict()
+
+            def download(index: int) -> str:
+                from urllib import request
+
+                dbc_file = os.path.join(temp_dir, f"course-{index}.dbc")
+                with download_locks[index]:
+                    if index in download_errors:
+                        # Don't download it again for every user, each would only wait to fail the same way.
+                        raise Exception(f"The download of {courses[index][0]} failed: {download_errors[index]}")
+                    if not os.path.exists(dbc_file):
+                        try:
+                            request.urlretrieve(courses[index][1], f"{dbc_file}.tmp")
+                            os.replace(f"{dbc_file}.tmp", dbc_file)
+                        except Exception as e:
+                            download_errors[index] = e
+                            raise
+                return dbc_file
+
+            def install(item: Tuple[str, int]) -> Tuple[str, str, str]:
+                username, index = item
+                course = courses[index][0]
 
                 if subdirectory is None:
                     install_dir = f"/Users/{username}/{course}"
                 else:
                     install_dir = f"/Users/{username}/{subdirectory}/{course}"
 
-                print(f" - {install_dir}")
+                try:
+                    files = self.__client.workspace.ls(install_dir)
+                    if files is not None and len(files) > 0:
+                        return username, install_dir, "Skipped"
 
-                files = self.__client.workspace.ls(install_dir)
-                count = 0 if files is None else len(files)
-                if count > 0:
-                    print(f" - Skipping, course already exists.")
-                    # for file in files or list():
-                    #     path = file.get("path")
-                    #     print(f" - {path}")
-                else:
-                    self.__client.workspace.import_dbc_files(install_dir, download_url)
-                    print(f" - Installed.")
+                    self.__client.workspace.import_dbc_files(install_dir, source_url=None, local_file_path=download(index))
+                    return username, install_dir, "Installed"
+
+                except Exception as e:
+                    # Reported with the others once the wave is over rather than abandoning the remaining installs.
+                    return username, install_dir, f"Failed: {e}"
+
+            items = [(username, index) for username in usernames for index in range(len(courses))]
+            results = FleetExecutor(max_workers=max_workers, max_per_host=FleetExecutor.MAX_PER_WORKSPACE).map(install, items, host=lambda _: self.__client.endpoint)
 
+        report = {username: dict() for username in usernames}
+        for username, install_dir, status in results:
+            report[username][install_dir] = status
+
+        for username, statuses in report.items():
+            print(f"Installing courses for {username}")
+            for install_dir, status in statuses.items():
+                print(f" - {install_dir}: {status}")
             print("-" * 80)
 
+        failed = [f"{install_dir}: {status}" for statuses in report.values() for install_dir, status in statuses.items() if status.startswith("Failed")]
+        if len(failed) > 0:
+            raise Exception(f"Failed to install {len(failed)} of {len(results)} courses:\n" + "\n".join(failed))
+
+        return report
+
     @staticmethod
     def compose_courseware_url(url: str, course: str, version: Optional[str], artifact: Optional[str], token: str) -> str:
         download_url = f"{url}?course={course}"
@@ -268,15 +331,14 @@ class WorkspaceHelper:
 
     @staticmethod
     def do_for_all_users(usernames: List[str], f: Callable[[str], T]) -> List[T]:
-        from multiprocessing.pool import ThreadPool
+        from dbacademy.common import FleetExecutor
 
         # if self.usernames is None:
         #     raise ValueError("DBAcademyHelper.workspace.usernames must be defined before calling DBAcademyHelper.workspace.do_for_all_users(). See also DBAcademyHelper.workspace.load_all_usernames()")
         if len(usernames) == 0:
             return []
 
-        with ThreadPool(len(usernames)) as pool:
-            return pool.map(f, usernames)
+        return FleetExecutor(max_workers=32).map(f, usernames)
 
     @property
     def org_id(self):
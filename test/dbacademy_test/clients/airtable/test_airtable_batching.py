@@ -0,0 +1,125 @@
+__all__ = ["TestAirtableBatching"]
+
+import threading
+import unittest
+from dbacademy.clients import airtable
+
+
+class FakeResponse:
+
+    def __init__(self, body):
+        self.status_code = 200
+        self.text = str(body)
+        self.__body = body
+
+    def json(self):
+        return self.__body
+
+
+class FakeAirtable:
+    """Serves an in-memory table to TablesAPI, recording each request."""
+
+    def __init__(self, count: int):
+        self.records = {f"rec{i:03d}": {"id": f"rec{i:03d}", "fields": {"name": f"ws-{i:03d}"}} for i in range(count)}
+        self.requests = list()
+        self.lock = threading.Lock()
+
+    def api(self, method, url, payload=None, **kwargs):
+        from urllib.parse import urlparse, parse_qs
+
+        with self.lock:
+            self.requests.append((method, url, payload))
+            query = parse_qs(urlparse(url).query)
+
+            if method == "GET":
+                records = sorted(self.records.values(), key=lambda r: r["id"])
+                if "filterByFormula" in query:
+                    records = [r for r in records if r.get("modified")]
+                offset = int(query.get("offset", ["0"])[0])
+                body = {"records": records[offset:offset + 100]}
+                if offset + 100 < len(records):
+                    body["offset"] = str(offset + 100)
+                return FakeResponse(body)
+
+            elif method == "POST":
+                created = list()
+                for r in payload["records"]:
+                    record = {"id": f"rec{len(self.records):03d}", "fields": r["fields"]}
+                    self.records[record["id"]] = record
+                    created.append(record)
+                return FakeResponse({"records": created})
+
+            elif method == "PATCH":
+                for r in payload["records"]:
+                    self.records[r["id"]] = {"id": r["id"], "fields": dict(self.records[r["id"]]["fields"], **r["fields"]), "modified": True}
+                return FakeResponse({"records": [self.records[r["id"]] for r in payload["records"]]})
+
+            elif method == "DELETE":
+                for record_id in query["records[]"]:
+                    del self.records[record_id]
+                return FakeResponse({"records": [{"id": i, "deleted": True} for i in query["records[]"]]})
+
+
+class TestAirtableBatching(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.fake = FakeAirtable(250)
+        client = airtable.from_args(access_token="token", base_id="appTest")
+        client.api = self.fake.api
+        self.tables_api = client.table("tblTest")
+
+    def test_iter_query(self):
+        records = self.tables_api.iter_query()
+        self.assertEqual("rec000", next(records)["id"])
+        self.assertEqual(1, len(self.fake.requests))  # Later pages are requested only when needed.
+
+        self.assertEqual(250, len(self.tables_api.query()))
+        self.assertEqual(4, len(self.fake.requests))
+
+    def test_batched_writes_and_cache(self):
+        cache = self.tables_api.cache(key_field="name")
+        cache.refresh()
+        self.assertEqual(250, len(cache))
+        self.fake.requests.clear()
+
+        created = self.tables_api.insert_many([{"name": f"new-{i}"} for i in range(25)])
+        self.assertEqual([f"new-{i}" for i in range(25)], [r["fields"]["name"] for r in created])
+        self.assertEqual(3, len(self.fake.requests))
+        self.assertIn("new-24", cache)
+
+        self.tables_api.update_many({f"rec{i:03d}": {"name": f"renamed-{i}"} for i in range(12)})
+        self.assertEqual("rec005", cache.get("renamed-5")["id"])
+        self.assertNotIn("ws-005", cache)
+
+        self.tables_api.delete_many([r["id"] for r in created])
+        self.assertEqual(3 + 2 + 3, len(self.fake.requests))
+        self.assertEqual(250, len(cache))
+
+        # Only the records modified since the last refresh are read again.
+        self.fake.requests.clear()
+        self.assertEqual(12, cache.refresh())
+        self.assertIn("LAST_MODIFIED_TIME", self.fake.requests[0][1])
+
+    def test_filtered_cache_holds_only_matching_records(self):
+        self.tables_api.update_many({"rec000": {"name": "matching"}})
+        cache = self.tables_api.cache(key_field="name", filter_by_formula="{modified}")
+        self.assertEqual(1, cache.refresh())
+
+        # Whether these match the formula is unknown, they are not added...
+        self.tables_api.insert_many([{"name": "new"}])
+        self.tables_api.update_many({"rec001": {"name": "other"}})
+        self.assertEqual(["matching"], [r["fields"]["name"] for r in cache.records()])
+
+        # ...but the records the cache already holds are kept up to date.
+        self.tables_api.update_many({"rec000": {"name": "renamed"}})
+        self.assertEqual("rec000", cache.get("renamed")["id"])
+        self.assertEqual(1, len(cache))
+
+    def test_base_limiter_is_shared(self):
+        other = airtable.from_args(access_token="token", base_id="appTest")
+        self.assertIs(self.tables_api._TablesAPI__client.base_limiter, other.base_limiter)
+        self.assertIsNot(other.base_limiter, airtable.from_args(access_token="token", base_id="appOther").base_limiter)
+
+
+if __name__ == '__main__':
+    unittest.main()
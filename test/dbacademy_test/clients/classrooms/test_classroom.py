@@ -0,0 +1,67 @@
+import threading
+import unittest
+
+from dbacademy.clients.rest.common import DatabricksApiException
+
+
+class FakeWorkspace:
+    """Imports DBCs into folders, ignoring those that already exist and failing for student 7."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.downloads = 0
+        self.folders = {"/Users/student-003@example.com/Lessons"}
+
+    def read_data_from_url(self, source_url, format="DBC"):
+        self.downloads += 1
+        return "UEsDBA=="
+
+    def import_from_data(self, content, workspace_path, format="DBC", *, language=None, if_exists="error"):
+        if "student-007" in workspace_path:
+            raise DatabricksApiException("INTERNAL_ERROR", 500)
+        with self.lock:
+            if workspace_path in self.folders and if_exists == "ignore":
+                return None
+            self.folders.add(workspace_path)
+            return dict()
+
+
+class FakeDatabricks:
+
+    endpoint = "https://example.com"
+
+    def __init__(self):
+        self.workspace = FakeWorkspace()
+
+
+class TestClassroom(unittest.TestCase):
+
+    def test_upload_dbc(self):
+        from dbacademy.clients.classrooms.classroom import Classroom
+
+        databricks = FakeDatabricks()
+        classroom = Classroom(num_students=10, username_pattern="student-{student_number:03d}@example.com", databricks_api=databricks)
+
+        with self.assertRaises(DatabricksApiException) as context:
+            classroom.upload_dbc("https://example.com/courses/Lessons.dbc", max_workers=4)
+
+        # Every other student was attempted before the failure was raised.
+        self.assertEqual(1, databricks.workspace.downloads)
+        self.assertIn("1 of 11 students: student-007@example.com", context.exception.message)
+        self.assertEqual(10, len(databricks.workspace.folders))
+
+    def test_upload_dbc_skips_existing(self):
+        from dbacademy.clients.classrooms.classroom import Classroom
+
+        databricks = FakeDatabricks()
+        classroom = Classroom(num_students=6, username_pattern="student-{student_number:03d}@example.com", databricks_api=databricks)
+
+        report = classroom.upload_dbc("https://example.com/courses/Lessons.dbc", max_workers=4)
+
+        self.assertEqual(7, len(report))
+        self.assertEqual("Skipped", report["student-003@example.com"])
+        self.assertEqual(6, len([s for s in report.values() if s == "Installed"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import threading
+import unittest
+
+from dbacademy.clients.rest.common import DatabricksApiException
+from dbacademy.clients.databricks.scim.provisioning import provision_users, entitlement_operations, UserProvisioningResult
+
+
+class FakeClient:
+
+    endpoint = "https://example.com"
+
+    def __init__(self, users_api):
+        self.users_api = users_api
+        self.calls = list()
+        self.lock = threading.Lock()
+
+    def api(self, method, url, data=None, *, _expected=None):
+        with self.lock:
+            self.calls.append((method, url))
+        return self.users_api.handle(method, url, data)
+
+
+class FakeUsersApi:
+    """Mimics the parts of ScimUsersClient used by provision_users over an in-memory directory."""
+
+    base_url = "https://example.com/api/2.0/preview/scim/v2/Users"
+
+    def __init__(self, users=None, *, hidden=(), failing=()):
+        self.users = {u["userName"]: u for u in users or list()}
+        self.hidden = set(hidden)    # Exist, but missing from list() as if created concurrently.
+        self.failing = set(failing)
+        self.client = FakeClient(self)
+        self.lock = threading.Lock()
+
+    def list(self):
+        return [u for name, u in self.users.items() if name not in self.hidden]
+
+    def get_by_username(self, username):
+        return self.users.get(username)
+
+    def handle(self, method, url, data):
+        with self.lock:
+            if method == "POST":
+                username = data["userName"]
+                if username in self.failing:
+                    raise DatabricksApiException("Bad user", 400)
+                if username in self.users:
+                    raise DatabricksApiException("Already exists", 409)
+                user = {"id": str(len(self.users)), "userName": username, "entitlements": data["entitlements"]}
+                self.users[username] = user
+                return user
+
+            user = next(u for u in self.users.values() if url.endswith(f"/{u['id']}"))
+            for op in data["Operations"]:
+                if op["op"] == "add":
+                    user["entitlements"].extend(op["value"])
+                else:
+                    name = op["path"].split('"')[1]
+                    user["entitlements"] = [e for e in user["entitlements"] if e["value"] != name]
+            return user
+
+
+REVOKED = {"allow-cluster-create": False, "databricks-sql-access": False, "workspace-access": False}
+
+
+class TestProvisioning(unittest.TestCase):
+
+    def test_entitlement_operations(self):
+        user = {"entitlements": [{"value": "workspace-access"}, {"value": "allow-cluster-create"}]}
+
+        self.assertEqual([], entitlement_operations(user, {"workspace-access": True}))
+        self.assertEqual([{"op": "remove", "path": 'entitlements[value eq "allow-cluster-create"]'},
+                          {"op": "add", "path": "entitlements", "value": [{"value": "databricks-sql-access"}]}],
+                         entitlement_operations(user, {"allow-cluster-create": False, "databricks-sql-access": True}))
+
+    def test_one_request_per_user(self):
+        api = FakeUsersApi([
+            {"id": "a", "userName": "correct@example.com", "entitlements": []},
+            {"id": "b", "userName": "drifted@example.com", "entitlements": [{"value": "workspace-access"}, {"value": "allow-cluster-create"}]},
+        ])
+        usernames = ["correct@example.com", "drifted@example.com"] + [f"user-{i}@example.com" for i in range(250)]
+
+        results = provision_users(api, usernames, entitlements=REVOKED, chunk_size=10)
+
+        self.assertEqual(usernames, [r.username for r in results])
+        self.assertEqual([UserProvisioningResult.UNCHANGED, UserProvisioningResult.UPDATED] + [UserProvisioningResult.CREATED]*250,
+                         [r.action for r in results])
+        self.assertEqual([], api.users["drifted@example.com"]["entitlements"])
+        self.assertEqual(251, len(api.client.calls))
+        self.assertEqual(1, len([c for c in api.client.calls if c[0] == "PATCH"]))
+
+    def test_grants_on_create(self):
+        api = FakeUsersApi()
+
+        results = provision_users(api, ["new@example.com"], entitlements={"workspace-access": True, "allow-cluster-create": False})
+
+        self.assertEqual([{"value": "workspace-access"}], results[0].user["entitlements"])
+        self.assertEqual([("POST", api.base_url)], api.client.calls)
+
+    def test_conflict_and_failure(self):
+        api = FakeUsersApi([{"id": "a", "userName": "racing@example.com", "entitlements": [{"value": "workspace-access"}]}],
+                           hidden=["racing@example.com"], failing=["bad@example.com"])
+
+        results = provision_users(api, ["racing@example.com", "bad@example.com", "good@example.com"], entitlements=REVOKED)
+
+        self.assertEqual([UserProvisioningResult.UPDATED, UserProvisioningResult.FAILED, UserProvisioningResult.CREATED],
+                         [r.action for r in results])
+        self.assertFalse(results[1].succeeded)
+        self.assertEqual(400, results[1].error.http_code)
+        self.assertEqual([], api.users["racing@example.com"]["entitlements"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from dbacademy.clients.databricks.inventory import FleetInventory, InventoryKind
+
+
+class FakeClient:
+    """Serves a mutable list of clusters and users, counting the listings."""
+
+    def __init__(self, clusters, users):
+        self.clusters = clusters
+        self.users = users
+        self.calls = {"clusters": 0, "users": 0}
+
+    def list_clusters(self):
+        self.calls["clusters"] += 1
+        return [dict(c) for c in self.clusters]
+
+    def list_users(self):
+        self.calls["users"] += 1
+        if self.users is None:
+            raise ConnectionError("unreachable")
+        return [dict(u) for u in self.users]
+
+
+KINDS = {
+    "clusters": InventoryKind("clusters", id_field="cluster_id", fetch=FakeClient.list_clusters, version_fields=["state"]),
+    "users": InventoryKind("users", id_field="id", fetch=FakeClient.list_users, max_age_seconds=3600),
+}
+
+
+class TestFleetInventory(unittest.TestCase):
+
+    def test_delta_refresh(self):
+        client = FakeClient([{"cluster_id": "a", "state": "RUNNING"}, {"cluster_id": "b", "state": "RUNNING"}], [{"id": 1, "userName": "x"}])
+
+        with FleetInventory(kinds=KINDS) as inventory:
+            first = {r.kind: r for r in inventory.refresh("ws-1", client)}
+            self.assertEqual((2, 0, 0), (first["clusters"].added, first["clusters"].changed, first["clusters"].removed))
+
+            client.clusters = [{"cluster_id": "a", "state": "TERMINATED", "uptime": 1}, {"cluster_id": "c", "state": "PENDING"}]
+            second = {r.kind: r for r in inventory.refresh("ws-1", client)}
+
+            self.assertEqual((1, 1, 1, 0), (second["clusters"].added, second["clusters"].changed, second["clusters"].removed, second["clusters"].unchanged))
+            self.assertTrue(second["users"].skipped)
+            self.assertEqual({"clusters": 2, "users": 1}, client.calls)
+
+            self.assertEqual(["TERMINATED", "PENDING"], [c["state"] for c in inventory.resources("clusters", "ws-1")])
+            self.assertEqual("x", inventory.get("ws-1", "users", 1)["userName"])
+
+            inventory.invalidate("ws-1", "users")
+            inventory.refresh("ws-1", client)
+            self.assertEqual(2, client.calls["users"])
+
+    def test_unversioned_fields_are_kept_current(self):
+        import time
+
+        client = FakeClient([{"cluster_id": "a", "state": "RUNNING", "cluster_name": "old"}], [])
+
+        with FleetInventory(kinds=KINDS) as inventory:
+            inventory.refresh("ws-1", client, kinds=["clusters"])
+            listed = time.time()
+
+            client.clusters = [{"cluster_id": "a", "state": "RUNNING", "cluster_name": "new"}]
+            result, = inventory.refresh("ws-1", client, kinds=["clusters"])
+
+            # A rename leaves the version as it was, so it is not counted as a change, but the snapshot is not left stale.
+            self.assertEqual((0, 0, 1), (result.added, result.changed, result.unchanged))
+            self.assertEqual("new", inventory.get("ws-1", "clusters", "a")["cluster_name"])
+            self.assertEqual([], inventory.resources("clusters", changed_since=listed))
+
+    def test_refresh_fleet(self):
+        import os
+        import tempfile
+
+        clients = [(f"ws-{i}", FakeClient([{"cluster_id": "a", "state": "RUNNING"}], [{"id": i}])) for i in range(10)]
+        clients[3][1].users = None
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "inventory.sqlite")
+            with FleetInventory(path, kinds=KINDS) as inventory:
+                results = inventory.refresh_fleet(clients, max_workers=4)
+                self.assertEqual(["ws-3"], [r.workspace for r in results if r.error is not None])
+
+            # The snapshot outlives the process, a later audit reads it without listing anything.
+            with FleetInventory(path, kinds=KINDS) as inventory:
+                self.assertEqual(9, len(inventory.resources("users")))
+                self.assertEqual(10, len(inventory.resources("clusters")))
+                self.assertEqual({"clusters": 1, "users": 1}, inventory.counts()["ws-0"])
+                self.assertTrue(all(r.skipped for r in inventory.refresh("ws-0", clients[0][1], kinds=["users"])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from dbacademy.clients.databricks.run_watcher import RunWatcher
+
+
+class FakeRunsClient:
+    """Serves runs that each terminate after a given number of polls of the workspace."""
+
+    def __init__(self, polls_until_done: dict):
+        self.client = object()
+        self.polls_until_done = dict(polls_until_done)
+        self.polls = 0
+        self.calls = {"get": 0, "list": 0}
+
+    def __state(self, run_id):
+        done = self.polls >= self.polls_until_done[run_id]
+        return {"run_id": run_id, "job_id": 1, "state": {"life_cycle_state": "TERMINATED" if done else "RUNNING"}}
+
+    def get(self, run_id):
+        self.calls["get"] += 1
+        if self.calls["list"] == 0:
+            self.polls += 1  # Polled individually, each get is a poll.
+        return self.__state(int(run_id))
+
+    def iter_list(self, active_only=False):
+        assert active_only
+        self.calls["list"] += 1
+        self.polls += 1
+        states = [self.__state(run_id) for run_id in self.polls_until_done]
+        return iter([s for s in states if s["state"]["life_cycle_state"] != "TERMINATED"])
+
+
+class TestRunWatcher(unittest.TestCase):
+
+    def test_many_runs_cost_one_listing_per_interval(self):
+        runs_client = FakeRunsClient({run_id: 1 + run_id % 5 for run_id in range(200)})
+        watcher = RunWatcher(min_interval_seconds=0, max_interval_seconds=0)
+        for run_id in range(200):
+            watcher.watch(runs_client, run_id, tag=f"test-{run_id}")
+
+        completed = list(watcher.completions())
+
+        self.assertEqual(200, len(completed))
+        self.assertEqual(0, len(watcher))
+        self.assertEqual(4, int(completed[-1][0][5:]) % 5)  # Among those needing the most polls.
+        self.assertEqual(5, runs_client.calls["list"])
+        self.assertEqual(200, runs_client.calls["get"])  # One final fetch per run.
+
+    def test_across_workspaces(self):
+        fast = FakeRunsClient({1: 1})
+        slow = FakeRunsClient({1: 3})
+        watcher = RunWatcher(min_interval_seconds=0, max_interval_seconds=0)
+        watcher.watch(slow, 1, tag="slow")
+        watcher.watch(fast, 1, tag="fast")
+
+        self.assertEqual(["fast", "slow"], [tag for tag, _ in watcher.completions()])
+        self.assertEqual({"get": 1, "list": 0}, fast.calls)
+        self.assertEqual({"get": 3, "list": 0}, slow.calls)
+
+    def test_on_poll_and_timeout(self):
+        polled = list()
+        watcher = RunWatcher(min_interval_seconds=0.01, max_interval_seconds=0.01, on_poll=lambda tag, run, delay: polled.append(tag))
+        watcher.watch(FakeRunsClient({7: 1000}), 7)
+
+        self.assertRaises(TimeoutError, lambda: watcher.wait_all(timeout_seconds=0.05))
+        self.assertEqual(7, polled[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import base64
+import json
+import os
+import tempfile
+import unittest
+from threading import Thread
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dbacademy.clients.rest.common import ApiClient
+from dbacademy.clients.rest.instrumentation import ApiMetrics
+from dbacademy.clients.databricks.workspace import WorkspaceClient
+
+DBC = bytes(range(256)) * 40_000  # About 10MB, several chunks
+
+
+class WorkspaceHandler(BaseHTTPRequestHandler):
+    """Serves a DBC for export and decodes imports, throttling the first import to exercise the retry."""
+
+    imports = list()
+    throttled = False
+
+    # noinspection PyPep8Naming
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(DBC)))
+        self.end_headers()
+        self.wfile.write(DBC)
+
+    # noinspection PyPep8Naming
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if not WorkspaceHandler.throttled:
+            WorkspaceHandler.throttled = True
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        WorkspaceHandler.imports.append(json.loads(body))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class TestWorkspaceStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("localhost", 0), WorkspaceHandler)
+        Thread(target=self.server.serve_forever, daemon=True).start()
+
+        client = ApiClient(f"http://localhost:{self.server.server_port}")
+        client.rate_limiter = None
+        self.workspace = WorkspaceClient(client)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_export_then_import(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dbc_file = os.path.join(temp_dir, "course.dbc")
+
+            self.assertEqual(len(DBC), self.workspace.export_dbc_to_file("/Repos/course", dbc_file))
+            self.assertEqual(["course.dbc"], os.listdir(temp_dir))
+
+            with open(dbc_file, "rb") as f:
+                self.assertEqual(DBC, f.read())
+
+            self.workspace.import_file("/Users/someone/course", dbc_file, file_format="DBC", overwrite=False)
+
+        # The spooled body was rewound for the retry, the import received the whole archive.
+        payload, = WorkspaceHandler.imports
+        self.assertEqual({"path": "/Users/someone/course", "overwrite": False, "format": "DBC"}, {k: v for k, v in payload.items() if k != "content"})
+        self.assertEqual(DBC, base64.b64decode(payload["content"]))
+
+    def test_export_with_metrics(self):
+        import tracemalloc
+
+        with tempfile.TemporaryDirectory() as temp_dir, ApiMetrics(ApiClient.instrumentation) as metrics:
+            dbc_file = os.path.join(temp_dir, "course.dbc")
+
+            tracemalloc.start()
+            try:
+                self.assertEqual(len(DBC), self.workspace.export_dbc_to_file("/Repos/course", dbc_file))
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            with open(dbc_file, "rb") as f:
+                self.assertEqual(DBC, f.read())
+
+        # The hook sized the streamed export from its Content-Length instead of reading the body ahead of the file.
+        self.assertLess(peak, len(DBC))
+        export, = metrics.summary()
+        self.assertEqual(len(DBC), export["bytes_in"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import base64
+import threading
+import unittest
+
+from dbacademy.clients.rest.common import DatabricksApiException
+from dbacademy.clients.dougrest.workspace import Workspace
+
+LIMIT = 3  # The number of notebooks that fit in one export
+
+
+class FakeDatabricks:
+    """
+    A workspace of notebooks whose exports fail when they hold more than LIMIT notebooks, whose export of
+    /Courses/B fails once, and which records every import & mkdirs.
+    """
+
+    endpoint = "https://example.com"
+
+    def __init__(self, notebooks=()):
+        self.notebooks = list(notebooks)
+        self.workspace = Workspace(self)
+        self.lock = threading.Lock()
+        self.exports = list()
+        self.imports = dict()
+        self.mkdirs = list()
+        self.flaky = {"/Courses/B"}
+
+    def objects(self, path):
+        return [n for n in self.notebooks if n == path or n.startswith(path.rstrip("/") + "/")]
+
+    def api(self, method, url, data):
+        path = data["path"]
+
+        if url.endswith("/list"):
+            depth = path.rstrip("/").count("/") + 1
+            children = {"/".join(n.split("/")[:depth+1]) for n in self.objects(path)}
+            return {"objects": [{"path": c, "object_type": "NOTEBOOK" if c in self.notebooks else "DIRECTORY"} for c in children]}
+
+        elif url.endswith("/export"):
+            with self.lock:
+                self.exports.append(path)
+                if path in self.flaky:
+                    self.flaky.remove(path)
+                    raise DatabricksApiException("TEMPORARILY_UNAVAILABLE", 503)
+            if len(self.objects(path)) > LIMIT:
+                raise DatabricksApiException("Export of the subtree exceeded the limit", 400)
+            return {"content": base64.b64encode("\n".join(self.objects(path)).encode()).decode()}
+
+        elif url.endswith("/import"):
+            with self.lock:
+                self.imports[path] = base64.b64decode(data["content"]).decode().split("\n")
+
+        elif url.endswith("/mkdirs"):
+            with self.lock:
+                self.mkdirs.append(path)
+
+
+class TestWorkspaceCopy(unittest.TestCase):
+
+    def test_copy_in_chunks(self):
+        notebooks = [f"/Courses/{d}/Lesson {i}" for d in "AB" for i in range(3)] + [f"/Courses/C/{s}/Lesson {i}" for s in "XY" for i in range(2)] + ["/Courses/Readme"]
+        source = FakeDatabricks(notebooks)
+        target = FakeDatabricks()
+
+        report = source.workspace.copy("/Courses/", "/Copy", target_connection=target, max_workers=4, max_chunk_size=LIMIT * Workspace.ESTIMATED_NOTEBOOK_SIZE)
+
+        # /Courses/C holds 4 notebooks, it is planned as two chunks; /Courses/B failed once & was retried on its own.
+        self.assertEqual({"/Copy/A", "/Copy/B", "/Copy/C/X", "/Copy/C/Y", "/Copy/Readme"}, set(target.imports))
+        self.assertEqual(sorted(n.replace("/Courses", "/Copy") for n in notebooks),
+                         sorted(n.replace("/Courses", "/Copy") for contents in target.imports.values() for n in contents))
+        self.assertEqual(["/Copy", "/Copy/C"], sorted(set(target.mkdirs)))
+        self.assertEqual(1, source.exports.count("/Courses"))
+        self.assertEqual(2, source.exports.count("/Courses/B"))
+        self.assertEqual(0, source.exports.count("/Courses/C"))
+
+        self.assertEqual(5, report.chunks)
+        self.assertEqual(1, report.retried)
+        self.assertEqual([], report.failed)
+        self.assertGreater(report.bytes, 0)
+        self.assertIn("5 chunks", str(report))
+
+    def test_copy_splits_underestimated_chunks(self):
+        notebooks = [f"/Courses/A/Lesson {i}" for i in range(5)] + ["/Courses/B/Lesson 0"]
+        source = FakeDatabricks(notebooks)
+        source.flaky = set()
+        target = FakeDatabricks()
+
+        # Every subtree is estimated to fit, /Courses/A is split into its notebooks once its export proves too large.
+        report = source.workspace.copy("/Courses", "/Copy", target_connection=target, max_chunk_size=100 * Workspace.ESTIMATED_NOTEBOOK_SIZE)
+
+        self.assertEqual({"/Copy/B"} | {f"/Copy/A/Lesson {i}" for i in range(5)}, set(target.imports))
+        self.assertIn("/Copy/A", target.mkdirs)
+        self.assertEqual(5, report.retried)
+
+    def test_copy_raises_what_cannot_be_copied(self):
+        source = FakeDatabricks([f"/Courses/A/Lesson {i}" for i in range(5)])
+        source.flaky = set()
+        source.api = lambda method, url, data, api=source.api: self.fail_lesson_2(api, method, url, data)
+
+        with self.assertRaises(DatabricksApiException):
+            source.workspace.copy("/Courses", "/Copy", target_connection=FakeDatabricks(), max_chunk_size=Workspace.ESTIMATED_NOTEBOOK_SIZE, retries=1)
+
+    @staticmethod
+    def fail_lesson_2(api, method, url, data):
+        if url.endswith("/export") and data["path"] == "/Courses/A/Lesson 2":
+            raise DatabricksApiException("INTERNAL_ERROR", 500)
+        return api(method, url, data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import json
+import asyncio
+import unittest
+from threading import Thread
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dbacademy.clients.rest.common import ApiClient, DatabricksApiException
+from dbacademy.clients.rest.async_client import AsyncApiClient
+from dbacademy.clients.rest.retry_policy import RetryPolicy
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+    """
+    Serves canned responses; /limited answers 429 until it has been called three times
+    and /unavailable answers every other call with 503 and a Retry-After header.
+    """
+
+    calls = dict()
+
+    # noinspection PyPep8Naming
+    def do_GET(self):
+        self.reply()
+
+    # noinspection PyPep8Naming
+    def do_POST(self):
+        self.reply()
+
+    def reply(self):
+        path = self.path.split("?")[0]
+        LocalHandler.calls[path] = LocalHandler.calls.get(path, 0) + 1
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode() if length else ""
+
+        if path == "/limited" and LocalHandler.calls[path] < 3:
+            self.send(429, {"error_code": "REQUEST_LIMIT_EXCEEDED"})
+        elif path == "/unavailable" and LocalHandler.calls[path] % 2 == 1:
+            self.send(503, {"error_code": "TEMPORARILY_UNAVAILABLE"}, {"Retry-After": "0"})
+        elif path == "/missing":
+            self.send(404, {"error_code": "RESOURCE_DOES_NOT_EXIST", "message": "Not here"})
+        else:
+            self.send(200, {"path": self.path, "body": body, "auth": self.headers.get("Authorization")})
+
+    def send(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAsyncApiClient(unittest.TestCase):
+
+    retried = list()
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("localhost", 0), LocalHandler)
+        Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.client = ApiClient(f"http://localhost:{cls.server.server_port}", token="abc")
+        cls.client.rate_limiter = None
+        cls.client.retry_policy = RetryPolicy(base_seconds=0.01, max_seconds=0.05, metrics_hook=cls.retried.append)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def run_async(self, *coroutines):
+        async def main():
+            try:
+                return await asyncio.gather(*coroutines)
+            finally:
+                await AsyncApiClient.close_shared_session()
+
+        return asyncio.run(main())
+
+    def test_get_matches_sync(self):
+        expected = self.client.api("GET", "/echo", path="/", recursive=True)
+        actual, = self.run_async(self.client.api_async("GET", "/echo", path="/", recursive=True))
+
+        self.assertEqual(expected, actual)
+        self.assertEqual("/echo?path=%2F&recursive=true", actual["path"])
+        self.assertEqual("Bearer abc", actual["auth"])
+
+    def test_post(self):
+        result, = self.run_async(self.client.api_async("POST", "echo", {"name": "x"}, count=2))
+        self.assertEqual({"name": "x", "count": 2}, json.loads(result["body"]))
+
+    def test_many_in_flight(self):
+        results = self.run_async(*[self.client.api_async("GET", f"/echo/{i}") for i in range(200)])
+        self.assertEqual([f"/echo/{i}" for i in range(200)], [r["path"] for r in results])
+
+    def test_result_types(self):
+        text, raw, response = self.run_async(self.client.api_async("GET", "/echo", _result_type=str),
+                                             self.client.api_async("GET", "/echo", _result_type=bytes),
+                                             self.client.api_async("GET", "/echo", _result_type=None))
+        self.assertEqual(json.loads(text), json.loads(raw.decode()))
+        self.assertIsNone(response)
+
+    def test_expected_404(self):
+        result, = self.run_async(self.client.api_async("GET", "/missing", _expected=404))
+        self.assertIsNone(result)
+
+    def test_not_found(self):
+        try:
+            self.run_async(self.client.api_async("GET", "/missing"))
+            self.fail("404 DatabricksApiException expected")
+        except DatabricksApiException as e:
+            self.assertEqual(404, e.http_code)
+            self.assertEqual("Not here", e.message)
+
+    def test_retry_on_429(self):
+        LocalHandler.calls["/limited"] = 0
+        result, = self.run_async(self.client.api_async("GET", "/limited"))
+        self.assertEqual("/limited", result["path"])
+        self.assertEqual(3, LocalHandler.calls["/limited"])
+
+    def test_retry_after_503(self):
+        LocalHandler.calls["/unavailable"] = 0
+        self.retried.clear()
+
+        self.assertEqual("/unavailable", self.client.api("GET", "/unavailable")["path"])
+        result, = self.run_async(self.client.api_async("GET", "/unavailable"))
+        self.assertEqual("/unavailable", result["path"])
+
+        self.assertEqual(4, LocalHandler.calls["/unavailable"])
+        self.assertEqual([(2, 1, 0, 200)] * 2, [(r.attempts, r.retries, r.sleep_seconds, r.status_code) for r in self.retried])
+
+
+if __name__ == '__main__':
+    unittest.main()
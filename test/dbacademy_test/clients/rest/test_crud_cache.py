@@ -0,0 +1,131 @@
+import unittest
+
+from dbacademy.clients.rest.crud import CRUD
+from dbacademy.clients.rest.common import DatabricksApiException
+
+
+class FakeCrud(CRUD):
+    """An in-memory CRUD counting the API calls that would have been made."""
+
+    def __init__(self, count: int = 100):
+        super().__init__(None, "/fake", "widget")
+        self.items = {i: {"widget_id": i, "widget_name": f"widget-{i}"} for i in range(count)}
+        self.calls = {"list": 0, "get": 0}
+
+    def _list(self, *, _expected=None):
+        self.calls["list"] += 1
+        return [dict(item) for item in self.items.values()]
+
+    def _get(self, item_id, *, _expected=None):
+        self.calls["get"] += 1
+        item = self.items.get(item_id)
+        if item is None and _expected != 404:
+            raise DatabricksApiException(f"{item_id} not found", 404)
+        return None if item is None else dict(item, widget_details="Only returned by get")
+
+    def _create(self, item, *, _expected=None):
+        item_id = max(self.items, default=-1) + 1
+        self.items[item_id] = dict(item, widget_id=item_id)
+        return item_id
+
+    def _update(self, item, *, _expected=None):
+        self.items[item["widget_id"]].update(item)
+        return item["widget_id"]
+
+    def _delete(self, item_id, *, _expected=None):
+        return self.items.pop(item_id, None)
+
+
+class TestCrudCache(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        crud = FakeCrud()
+
+        self.assertEqual("widget-7", crud.get_by_name("widget-7")["widget_name"])
+        self.assertEqual(7, crud.get_by_id(7)["widget_id"])
+        self.assertEqual(100, len(crud.list_names()))
+
+        self.assertEqual({"list": 2, "get": 1}, crud.calls)
+
+    def test_single_list_serves_lookups(self):
+        crud = FakeCrud().enable_cache(ttl_seconds=60)
+
+        for i in range(100):
+            self.assertEqual(i, crud.get_by_name(f"widget-{i}")["widget_id"])
+            self.assertEqual(i, crud._item_id({"widget_name": f"widget-{i}"}))
+        self.assertEqual(100, len(crud.list()))
+        self.assertEqual(100, len(crud.list_names()))
+
+        self.assertEqual({"list": 1, "get": 0}, crud.calls)
+
+    def test_get_by_id_returns_the_fetched_form(self):
+        crud = FakeCrud().enable_cache(ttl_seconds=60)
+        crud.list_names()
+
+        for _ in range(2):
+            for i in range(100):
+                self.assertEqual("Only returned by get", crud.get_by_id(i)["widget_details"])
+
+        # Each id is fetched once, the same shape as with the cache disabled.
+        self.assertEqual({"list": 1, "get": 100}, crud.calls)
+        self.assertEqual(crud.get_by_id(7), FakeCrud().get_by_id(7))
+
+    def test_missing(self):
+        crud = FakeCrud().enable_cache()
+
+        self.assertIsNone(crud.get_by_name("nothing", if_not_exists="ignore"))
+        self.assertRaises(DatabricksApiException, lambda: crud.get_by_name("nothing"))
+        self.assertIsNone(crud.get_by_id(1000, if_not_exists="ignore"))
+
+        # Unknown ids fall through to a direct fetch.
+        self.assertEqual({"list": 1, "get": 1}, crud.calls)
+
+    def test_cached_items_are_copies(self):
+        crud = FakeCrud().enable_cache()
+
+        crud.get_by_name("widget-1")["widget_name"] = "changed"
+
+        self.assertEqual("widget-1", crud.get_by_name("widget-1")["widget_name"])
+
+    def test_ttl(self):
+        crud = FakeCrud().enable_cache(ttl_seconds=0)
+
+        crud.get_by_name("widget-1")
+        crud.get_by_name("widget-2")
+
+        self.assertEqual(2, crud.calls["list"])
+
+    def test_invalidated_by_writes(self):
+        crud = FakeCrud(3).enable_cache()
+        self.assertEqual(["widget-0", "widget-1", "widget-2"], crud.list_names())
+
+        crud.create_by_example({"widget_name": "widget-new"})
+        self.assertEqual(3, crud.get_by_name("widget-new")["widget_id"])
+
+        crud.update({"widget_id": 3, "widget_name": "widget-renamed"})
+        self.assertIsNone(crud.get_by_name("widget-new", if_not_exists="ignore"))
+        self.assertEqual(3, crud.get_by_name("widget-renamed")["widget_id"])
+
+        crud.delete_by_id(3)
+        self.assertEqual(["widget-0", "widget-1", "widget-2"], crud.list_names())
+
+        self.assertEqual(4, crud.calls["list"])
+
+    def test_refresh_and_disable(self):
+        crud = FakeCrud(3).enable_cache()
+        crud.list_names()
+
+        crud.items[99] = {"widget_id": 99, "widget_name": "external"}
+        self.assertIsNone(crud.get_by_name("external", if_not_exists="ignore"))
+
+        crud.refresh()
+        self.assertEqual(99, crud.get_by_name("external")["widget_id"])
+
+        crud.disable_cache()
+        crud.list_names()
+        crud.list_names()
+        self.assertEqual(4, crud.calls["list"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from socket import gaierror
+
+from dbacademy.clients.rest.dns_cache import DnsCache
+
+
+class FakeResolver:
+
+    def __init__(self, *known: str):
+        self.known = set(known)
+        self.lookups = list()
+
+    def __call__(self, hostname: str) -> str:
+        self.lookups.append(hostname)
+        if hostname not in self.known:
+            raise gaierror(-2, "Name or service not known")
+        return "10.0.0.1"
+
+
+class TestDnsCache(unittest.TestCase):
+
+    def test_positive(self):
+        resolver = FakeResolver("example.com")
+        cache = DnsCache(resolver=resolver)
+
+        self.assertFalse(cache.resolved("example.com"))
+        for _ in range(5):
+            self.assertEqual("10.0.0.1", cache.resolve("Example.COM"))
+
+        self.assertTrue(cache.resolved("example.com"))
+        self.assertEqual(["example.com"], resolver.lookups)
+        self.assertEqual((5, 1), (cache.hits, cache.misses))
+
+    def test_negative(self):
+        resolver = FakeResolver()
+        cache = DnsCache(resolver=resolver)
+
+        for _ in range(3):
+            self.assertRaises(gaierror, lambda: cache.resolve("nowhere.com"))
+
+        self.assertFalse(cache.resolved("nowhere.com"))
+        self.assertEqual(["nowhere.com"], resolver.lookups)
+        self.assertEqual((2, 1), (cache.hits, cache.misses))
+
+    def test_expiry(self):
+        resolver = FakeResolver("example.com")
+        cache = DnsCache(ttl_seconds=0, negative_ttl_seconds=0, resolver=resolver)
+
+        cache.resolve("example.com")
+        cache.resolve("example.com")
+        self.assertRaises(gaierror, lambda: cache.resolve("nowhere.com"))
+        self.assertRaises(gaierror, lambda: cache.resolve("nowhere.com"))
+
+        self.assertEqual(["example.com", "example.com", "nowhere.com", "nowhere.com"], resolver.lookups)
+
+    def test_invalidate(self):
+        resolver = FakeResolver("a.com", "b.com")
+        cache = DnsCache(resolver=resolver)
+
+        cache.resolve("a.com")
+        cache.resolve("b.com")
+        cache.invalidate("A.com")
+        cache.resolve("a.com")
+        cache.resolve("b.com")
+        self.assertEqual(["a.com", "b.com", "a.com"], resolver.lookups)
+
+        cache.invalidate()
+        cache.resolve("b.com")
+        self.assertEqual(["a.com", "b.com", "a.com", "b.com"], resolver.lookups)
+
+
+if __name__ == '__main__':
+    unittest.main()
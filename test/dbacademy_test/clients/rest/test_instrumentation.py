@@ -0,0 +1,103 @@
+import json
+import unittest
+import requests
+from threading import Thread
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dbacademy.clients.rest.common import ApiClient
+from dbacademy.clients.rest.instrumentation import ApiMetrics, Instrumentation, LatencyHistogram, RequestRecord, endpoint_template
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+
+    # noinspection PyPep8Naming
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        data = json.dumps({"received": len(body)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_endpoint_template(self):
+        self.assertEqual("/api/2.0/preview/scim/v2/Users/{id}", endpoint_template("https://host.com/api/2.0/preview/scim/v2/Users/1234?x=y"))
+        self.assertEqual("/api/2.1/unity-catalog/metastores/{id}", endpoint_template("https://host.com/api/2.1/unity-catalog/metastores/0f4c0b6a-9b4d-4d3c-9d8e-6d0a0f5a1c2b"))
+        self.assertEqual("/api/2.0/workspace/list", endpoint_template("https://host.com/api/2.0/workspace/list?path=/Users"))
+        self.assertEqual("/api/2.0/sql/warehouses/{id}/start", endpoint_template("https://host.com/api/2.0/sql/warehouses/a1b2c3d4e5f6a7b8/start"))
+        self.assertEqual("/Users/{id}", endpoint_template("/Users/someone@example.com"))
+
+    def test_histogram(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.add(ms / 1000)
+
+        self.assertEqual(1000, histogram.count)
+        self.assertAlmostEqual(500.5, histogram.total_seconds, places=3)
+        self.assertAlmostEqual(0.5, histogram.percentile(50), delta=0.5 * 0.03)
+        self.assertAlmostEqual(0.95, histogram.percentile(95), delta=0.95 * 0.03)
+        self.assertAlmostEqual(0.99, histogram.percentile(99), delta=0.99 * 0.03)
+        self.assertLessEqual(histogram.percentile(100), 1.0)
+        self.assertEqual(0, LatencyHistogram().percentile(50))
+
+    def test_disabled(self):
+        instrumentation = Instrumentation()
+        self.assertFalse(instrumentation.enabled)
+        self.assertIsNone(instrumentation.before_request("GET", "https://host.com/x", {"params": {}}, 1))
+
+    def test_metrics(self):
+        instrumentation = Instrumentation()
+        calls = []
+        instrumentation.add_pre_request_hook(lambda method, url, attempt: calls.append((method, url, attempt)))
+
+        with ApiMetrics(instrumentation) as metrics:
+            for status_code, attempt in [(429, 1), (200, 2), (404, 1)]:
+                record = instrumentation.before_request("POST", "https://host.com/api/jobs/1", {"data": '{"a": 1}'}, attempt)
+                response = requests.Response()
+                response.status_code = status_code
+                response._content = b"12345"
+                instrumentation.after_request(record, response=response)
+
+            record = instrumentation.before_request("GET", "https://host.com/api/jobs/2", {"params": {}}, 1)
+            instrumentation.after_request(record, error=requests.exceptions.ConnectionError())
+
+        instrumentation.after_request(RequestRecord(method="GET", url="https://host.com/ignored", attempt=1, bytes_out=0))
+
+        self.assertEqual(4, len(calls))
+        rows = {(r["method"], r["endpoint"]): r for r in metrics.summary()}
+        self.assertEqual(2, len(rows))
+
+        post = rows[("POST", "/api/jobs/{id}")]
+        self.assertEqual((3, 2, 1, 1, 24, 15), (post["count"], post["errors"], post["retries"], post["throttled"], post["bytes_out"], post["bytes_in"]))
+
+        get = rows[("GET", "/api/jobs/{id}")]
+        self.assertEqual((1, 1, 0, 0), (get["count"], get["errors"], get["bytes_out"], get["bytes_in"]))
+
+        self.assertEqual(metrics.summary(), json.loads(metrics.to_json()))
+
+    def test_api_client_hooks(self):
+        server = ThreadingHTTPServer(("localhost", 0), EchoHandler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = ApiClient(f"http://localhost:{server.server_port}")
+            client.rate_limiter = None
+
+            with ApiMetrics() as metrics:
+                result = client.api("POST", "/api/2.0/jobs/runs/12345", {"run": "x"})
+
+            self.assertEqual(12, result["received"])
+            row, = metrics.summary()
+            self.assertEqual(("POST", "/api/2.0/jobs/runs/{id}", 1, 12, 16), (row["method"], row["endpoint"], row["count"], row["bytes_out"], row["bytes_in"]))
+            self.assertFalse(ApiClient.instrumentation.enabled)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import time
+import unittest
+from threading import current_thread
+
+from dbacademy.clients.rest.paging import iter_pages
+
+
+class FakeClient:
+    """Answers the runs & SCIM list endpoints from an in-memory list of 2,500 items."""
+
+    endpoint = "https://example.com"
+
+    def __init__(self):
+        self.requests = list()
+        self.items = [{"id": str(i), "run_id": i} for i in range(2500)]
+
+    def api(self, method, url, **params):
+        from urllib.parse import urlparse, parse_qs
+        self.requests.append(url)
+        params.update({k: v[0] for k, v in parse_qs(urlparse(url).query).items()})
+
+        if "/runs/list" in url:
+            offset, limit = int(params["offset"]), int(params["limit"])
+            return {"runs": self.items[offset:offset+limit], "has_more": offset + limit < len(self.items)}
+        else:
+            start, count = int(params["startIndex"]), int(params["count"])
+            return {"Resources": self.items[start-1:start-1+count], "totalResults": len(self.items)}
+
+
+class TestPaging(unittest.TestCase):
+
+    @staticmethod
+    def pages(last_page: int, fetched: list):
+        def fetch_page(page: int):
+            fetched.append(page)
+            return [f"{page}-{i}" for i in range(3)], page + 1 if page < last_page else None
+        return fetch_page
+
+    def test_lazy(self):
+        fetched = []
+        items = iter_pages(self.pages(5, fetched), 1)
+        self.assertEqual([], fetched)
+
+        self.assertEqual(["1-0", "1-1", "1-2", "2-0"], [next(items) for _ in range(4)])
+        self.assertEqual([1, 2], fetched)
+
+        self.assertEqual(11, len(list(items)))
+        self.assertEqual([1, 2, 3, 4, 5], fetched)
+
+    def test_no_pages(self):
+        self.assertEqual([], list(iter_pages(self.pages(5, []), None)))
+        self.assertEqual([], list(iter_pages(self.pages(5, []), None, prefetch=True)))
+
+    def test_prefetch(self):
+        fetched = []
+        threads = set()
+
+        def fetch_page(page: int):
+            threads.add(current_thread())
+            return self.pages(5, fetched)(page)
+
+        self.assertEqual(list(iter_pages(self.pages(5, []), 1)), list(iter_pages(fetch_page, 1, prefetch=True)))
+        self.assertEqual([1, 2, 3, 4, 5], fetched)
+        self.assertNotIn(current_thread(), threads)
+
+    def test_prefetch_stops_early(self):
+        fetched = []
+        items = iter_pages(self.pages(100, fetched), 1, prefetch=True)
+        self.assertEqual("1-0", next(items))
+        items.close()
+
+        time.sleep(0.3)
+        self.assertLessEqual(len(fetched), 3)  # The current page, one queued and one waiting to be queued.
+
+    def test_prefetch_error(self):
+        def fetch_page(page: int):
+            if page == 2:
+                raise ValueError("Page 2 failed")
+            return ["a"], page + 1
+
+        items = iter_pages(fetch_page, 1, prefetch=True)
+        self.assertEqual("a", next(items))
+        self.assertRaises(ValueError, lambda: next(items))
+
+    def test_runs(self):
+        from dbacademy.clients.databricks.runs import RunsClient
+
+        client = FakeClient()
+        runs = RunsClient(client)
+
+        self.assertEqual(client.items, runs.list())
+        self.assertEqual(3, len(client.requests))
+
+        client.requests.clear()
+        first = next(r for r in runs.iter_list_by_job_id(7) if r["run_id"] == 5)
+        self.assertEqual(5, first["run_id"])
+        self.assertEqual(["https://example.com/api/2.0/jobs/runs/list?limit=1000&offset=0&job_id=7"], client.requests)
+
+    def test_scim_users(self):
+        from dbacademy.clients.databricks.scim.users import ScimUsersClient
+
+        client = FakeClient()
+        users = ScimUsersClient(client)
+
+        self.assertEqual(client.items, users.list())
+        self.assertEqual(3, len(client.requests))  # No trailing request for an empty page
+
+        client.requests.clear()
+        self.assertEqual(client.items, list(users.iter_list(users_per_request=100, prefetch=True)))
+        self.assertEqual(25, len(client.requests))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from threading import Thread
+
+from dbacademy.clients.rest.common import ApiClient
+from dbacademy.clients.rest.rate_limiter import RateLimiter, TokenBucket
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_burst_then_paced(self):
+        bucket = TokenBucket(rate=10, burst=3)
+
+        self.assertEqual([0, 0, 0], [bucket.reserve() for _ in range(3)])
+        self.assertAlmostEqual(0.1, bucket.reserve(), delta=0.01)
+        self.assertAlmostEqual(0.2, bucket.reserve(), delta=0.01)
+
+    def test_drain(self):
+        bucket = TokenBucket(rate=10, burst=5)
+        bucket.drain()
+        self.assertAlmostEqual(0.1, bucket.reserve(), delta=0.01)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, lambda: TokenBucket(rate=0, burst=1))
+        self.assertRaises(ValueError, lambda: TokenBucket(rate=1, burst=0))
+
+    def test_threads_share_bucket(self):
+        bucket = TokenBucket(rate=100, burst=10)
+        waits = []
+
+        def reserve():
+            for _ in range(10):
+                waits.append(bucket.reserve())
+
+        threads = [Thread(target=reserve) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # 50 reservations, 10 free; the last one must wait for the other 39 to be refilled at 100/s.
+        self.assertEqual(10, len([w for w in waits if w == 0]))
+        self.assertAlmostEqual(0.4, max(waits), delta=0.05)
+
+    def test_read_and_write_buckets(self):
+        limiter = RateLimiter(read_qps=10, read_burst=1, write_qps=10, write_burst=1)
+
+        self.assertIs(limiter.bucket("Example.com", "GET"), limiter.bucket("example.com", "HEAD"))
+        self.assertIsNot(limiter.bucket("example.com", "GET"), limiter.bucket("example.com", "POST"))
+        self.assertIs(limiter.bucket("example.com", "POST"), limiter.bucket("example.com", "DELETE"))
+        self.assertIsNot(limiter.bucket("example.com", "GET"), limiter.bucket("other.com", "GET"))
+
+        self.assertEqual(0, limiter.reserve("example.com", "GET"))
+        self.assertEqual(0, limiter.reserve("example.com", "PATCH"))
+        self.assertGreater(limiter.reserve("example.com", "GET"), 0)
+
+    def test_configure(self):
+        limiter = RateLimiter()
+        limiter.configure("example.com", read_qps=2, write_burst=7)
+
+        self.assertEqual(2, limiter.bucket("example.com", "GET").rate)
+        self.assertEqual(limiter.read_burst, limiter.bucket("example.com", "GET").burst)
+        self.assertEqual(limiter.write_qps, limiter.bucket("example.com", "PUT").rate)
+        self.assertEqual(7, limiter.bucket("example.com", "PUT").burst)
+
+    def test_shared_by_clients(self):
+        client_a = ApiClient("https://example.com/api")
+        client_b = ApiClient("https://example.com/api", client=client_a)
+        self.assertIsNotNone(ApiClient.rate_limiter)
+        self.assertIs(client_a.rate_limiter, client_b.rate_limiter)
+
+
+if __name__ == '__main__':
+    unittest.main()
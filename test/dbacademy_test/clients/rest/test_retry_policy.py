@@ -0,0 +1,88 @@
+import unittest
+import requests
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+from dbacademy.clients.rest.retry_policy import RetryPolicy
+
+
+def response_of(status_code: int, text: str = "", headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = text.encode()
+    return response
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_is_retryable(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable(response_of(429)))
+        self.assertTrue(policy.is_retryable(response_of(503)))
+        self.assertTrue(policy.is_retryable(response_of(500, '{"error_code": "REQUEST_LIMIT_EXCEEDED"}')))
+        self.assertFalse(policy.is_retryable(response_of(500, '{"error_code": "INTERNAL_ERROR"}')))
+        self.assertFalse(policy.is_retryable(response_of(404)))
+        self.assertFalse(policy.is_retryable(response_of(200)))
+
+    def test_retry_after(self):
+        self.assertIsNone(RetryPolicy.retry_after(None))
+        self.assertIsNone(RetryPolicy.retry_after(response_of(429)))
+        self.assertIsNone(RetryPolicy.retry_after(response_of(429, headers={"Retry-After": "soon"})))
+        self.assertEqual(7, RetryPolicy.retry_after(response_of(429, headers={"Retry-After": "7"})))
+
+        when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        self.assertAlmostEqual(30, RetryPolicy.retry_after(response_of(503, headers={"Retry-After": when})), delta=2)
+
+    def test_backoff_bounds(self):
+        policy = RetryPolicy(base_seconds=1, max_seconds=10)
+        previous = 1
+        for _ in range(100):
+            delay = policy.backoff(previous)
+            self.assertGreaterEqual(delay, 1)
+            self.assertLessEqual(delay, min(10, previous * 3))
+            previous = delay
+
+    def test_honours_retry_after(self):
+        retry = RetryPolicy(base_seconds=1).begin("GET", "https://example.com", max_attempts=5)
+        retry.attempted()
+        self.assertEqual(12, retry.next_delay(response_of(429, headers={"Retry-After": "12"})))
+        self.assertEqual(12, retry.sleep_seconds)
+
+    def test_max_attempts(self):
+        retry = RetryPolicy(base_seconds=0.01, max_seconds=0.01).begin("GET", "https://example.com", max_attempts=3)
+        delays = []
+        for _ in range(4):
+            retry.attempted()
+            delays.append(retry.next_delay(response_of(429)))
+        self.assertEqual([0.01, 0.01, None, None], delays)
+
+    def test_policy_overrides_max_attempts(self):
+        retry = RetryPolicy(max_attempts=1).begin("GET", "https://example.com", max_attempts=25)
+        retry.attempted()
+        self.assertIsNone(retry.next_delay(response_of(429)))
+
+    def test_budget(self):
+        stats = []
+        retry = RetryPolicy(max_total_seconds=10, metrics_hook=stats.append).begin("POST", "https://example.com/x", max_attempts=25)
+
+        retry.attempted()
+        self.assertEqual(6, retry.next_delay(response_of(429, headers={"Retry-After": "6"})))
+        retry.attempted()
+        self.assertIsNone(retry.next_delay(response_of(429, headers={"Retry-After": "6"})))
+        retry.finish(response_of(429))
+
+        self.assertEqual(1, len(stats))
+        self.assertEqual(("POST", "https://example.com/x", 2, 1, 6, 429, True),
+                         (stats[0].method, stats[0].url, stats[0].attempts, stats[0].retries, stats[0].sleep_seconds, stats[0].status_code, stats[0].exhausted))
+
+    def test_hook_skips_first_time_success(self):
+        stats = []
+        retry = RetryPolicy(metrics_hook=stats.append).begin("GET", "https://example.com", max_attempts=25)
+        retry.attempted()
+        retry.finish(response_of(200))
+        self.assertEqual([], stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import threading
+import time
+import unittest
+
+from dbacademy.clients.rest.tree_walker import walk_tree
+from dbacademy.common import FleetExecutor, FleetLimiter
+
+
+class FakeTree:
+    """A workspace of 3 levels, 4 directories & 2 notebooks wide, whose listings each take 20ms."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.listed = list()
+        self.active = 0
+        self.max_active = 0
+
+    @staticmethod
+    def children(path):
+        depth = 0 if path == "/" else path.count("/")
+        if depth >= 3:
+            return []
+        prefix = "" if path == "/" else path
+        return ([{"path": f"{prefix}/dir{i}", "object_type": "DIRECTORY"} for i in range(4)] +
+                [{"path": f"{prefix}/nb{i}", "object_type": "NOTEBOOK"} for i in range(2)])
+
+    def list_dir(self, path):
+        with self.lock:
+            self.listed.append(path)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return self.children(path)
+
+    def serial_walk(self, path):
+        for entry in self.children(path):
+            yield entry
+            if entry["object_type"] == "DIRECTORY":
+                yield from self.serial_walk(entry["path"])
+
+
+class FakeApi:
+    """Answers the workspace list endpoint of either client from a FakeTree."""
+
+    endpoint = "https://example.com"
+
+    def __init__(self, tree):
+        self.tree = tree
+
+    def api(self, method, url, *args, **params):
+        path = args[0]["path"] if args else params["path"]
+        return {"objects": self.tree.list_dir(path)}
+
+
+class TestTreeWalker(unittest.TestCase):
+
+    def test_walk_tree(self):
+        tree = FakeTree()
+
+        start = time.time()
+        entries = list(walk_tree(tree.list_dir, tree.children("/"), max_workers=8))
+        duration = time.time() - start
+
+        # The same order as a serial walk, each of the 84 directories listed exactly once, but concurrently.
+        self.assertEqual(list(tree.serial_walk("/")), entries)
+        self.assertEqual(4 + 16 + 64, len(tree.listed))
+        self.assertEqual(len(tree.listed), len(set(tree.listed)))
+        self.assertGreater(tree.max_active, 1)
+        self.assertLessEqual(tree.max_active, 8)
+        self.assertLess(duration, 84 * 0.02)
+
+    def test_walk_tree_filters(self):
+        tree = FakeTree()
+
+        notebooks = list(walk_tree(tree.list_dir, tree.children("/"), object_types=["NOTEBOOK"], max_depth=2))
+
+        self.assertEqual(2 + 4 * 2, len(notebooks))
+        self.assertEqual({"NOTEBOOK"}, {n["object_type"] for n in notebooks})
+        self.assertEqual(4, len(tree.listed))  # The directories at the maximum depth are never listed
+
+    def test_walk_tree_abandoned(self):
+        tree = FakeTree()
+
+        walker = walk_tree(tree.list_dir, tree.children("/"), max_workers=2)
+        self.assertEqual("/dir0", next(walker)["path"])
+        walker.close()
+
+        time.sleep(0.1)
+        self.assertLessEqual(len(tree.listed), 4)
+        self.assertEqual(0, FleetExecutor.limiter.active)  # The slots of the listings never started were returned
+
+    def test_walk_tree_without_spare_capacity(self):
+        tree = FakeTree()
+        limiter, FleetExecutor.limiter = FleetExecutor.limiter, FleetLimiter(max_workers=1)
+        try:
+            # The only slot is taken, as by the item of a fan-out calling walk_tree(), so nothing is listed ahead.
+            self.assertTrue(FleetExecutor.limiter.try_acquire(None, None))
+            entries = list(walk_tree(tree.list_dir, tree.children("/"), max_workers=8))
+        finally:
+            FleetExecutor.limiter = limiter
+
+        self.assertEqual(list(tree.serial_walk("/")), entries)
+        self.assertEqual(1, tree.max_active)
+
+    def test_workspace_client_ls(self):
+        from dbacademy.clients.databricks.workspace import WorkspaceClient
+
+        tree = FakeTree()
+        notebooks = WorkspaceClient(FakeApi(tree)).ls("/", recursive=True)
+
+        self.assertEqual([e for e in tree.serial_walk("/") if e["object_type"] == "NOTEBOOK"], notebooks)
+
+    def test_dougrest_walk(self):
+        from dbacademy.clients.dougrest.workspace import Workspace
+
+        tree = FakeTree()
+        workspace = Workspace(FakeApi(tree))
+
+        self.assertEqual(list(tree.serial_walk("/")), list(workspace.walk("/")))
+        self.assertEqual(4, len(list(workspace.walk("/", object_types=["DIRECTORY"], max_depth=1))))
+
+
+if __name__ == '__main__':
+    unittest.main()
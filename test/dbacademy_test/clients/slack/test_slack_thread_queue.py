@@ -0,0 +1,61 @@
+import threading
+import unittest
+
+from dbacademy.clients import slack
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or dict()
+        self.text = str(body)
+        self.__body = body
+
+    def json(self):
+        return self.__body
+
+
+class FakeSession:
+    """Accepts every message, after rate limiting the first request and blocking until released."""
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.requests = list()
+
+    def post(self, url, headers, json):
+        self.released.wait()
+        self.requests.append((url.split(".")[-1], json))
+        if len(self.requests) == 1:
+            return FakeResponse(429, headers={"Retry-After": "0"})
+        return FakeResponse(200, {"ok": True, "channel": "C1", "ts": "1.0"})
+
+    def close(self):
+        pass
+
+
+class TestSlackThreadQueue(unittest.TestCase):
+
+    def test_asynchronous_sends_coalesce_summary_updates(self):
+        thread = slack.from_args(channel="C1", username="Test", access_token="token", asynchronous=True)
+        session = FakeSession()
+        thread._SlackThread__session = session
+
+        thread.send_msg("First")
+        for i in range(5):
+            self.assertIsNone(thread.send_error(f"Error {i}"))  # Returns immediately, nothing sent yet.
+
+        session.released.set()
+        self.assertTrue(thread.flush(timeout_seconds=5))
+
+        # The rate limited first message, then five errors but only one update of the first message.
+        self.assertEqual(["postMessage", "postMessage", "postMessage", "update"], [url for url, _ in session.requests[:4]])
+        self.assertEqual(1, len([url for url, _ in session.requests if url == "update"]))
+        self.assertEqual("| 5 Errors |\nFirst", session.requests[3][1]["attachments"][0]["text"])
+        self.assertEqual(8, len(session.requests))
+        self.assertEqual("1.0", session.requests[-1][1]["thread_ts"])
+        thread.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
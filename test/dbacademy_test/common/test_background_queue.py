@@ -0,0 +1,58 @@
+import threading
+import unittest
+
+from dbacademy.common import BackgroundQueue
+
+
+class TestBackgroundQueue(unittest.TestCase):
+
+    def test_runs_in_order_without_blocking(self):
+        gate = threading.Event()
+        calls = list()
+
+        queue = BackgroundQueue("test")
+        queue.submit(gate.wait)
+        for i in range(5):
+            queue.submit(lambda i=i: calls.append(i))
+
+        self.assertEqual([], calls)  # Still blocked behind the first function, yet submit() returned.
+        self.assertFalse(queue.flush(timeout_seconds=0.01))
+
+        gate.set()
+        self.assertTrue(queue.flush(timeout_seconds=5))
+        self.assertEqual([0, 1, 2, 3, 4], calls)
+        self.assertEqual(0, len(queue))
+        queue.close()
+
+    def test_coalesces_keyed_functions(self):
+        gate = threading.Event()
+        calls = list()
+
+        queue = BackgroundQueue("test")
+        queue.submit(gate.wait)
+        queue.submit(lambda: calls.append("post-1"))
+        for i in range(10):
+            queue.submit(lambda i=i: calls.append(f"update-{i}"), key="summary")
+        queue.submit(lambda: calls.append("post-2"))
+
+        gate.set()
+        queue.close()
+
+        self.assertEqual(["post-1", "update-9", "post-2"], calls)
+        self.assertRaises(RuntimeError, lambda: queue.submit(lambda: None))
+
+    def test_errors_do_not_stop_the_queue(self):
+        errors = list()
+        calls = list()
+
+        queue = BackgroundQueue("test", on_error=errors.append)
+        queue.submit(lambda: 1 / 0)
+        queue.submit(lambda: calls.append(True))
+        queue.close()
+
+        self.assertEqual([True], calls)
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+
+if __name__ == '__main__':
+    unittest.main()
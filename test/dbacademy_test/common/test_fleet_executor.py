@@ -0,0 +1,152 @@
+import threading
+import time
+import unittest
+
+from dbacademy.common import FleetExecutor, FleetLimiter, FleetProgress
+
+
+class Concurrency:
+    """Records the peak number of concurrent calls, overall and per host."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = dict()
+        self.peak = dict()
+        self.threads = set()
+
+    def __call__(self, item):
+        host = item[0]
+        with self.lock:
+            self.threads.add(threading.get_ident())
+            self.active[host] = self.active.get(host, 0) + 1
+            self.active["*"] = self.active.get("*", 0) + 1
+            for key in (host, "*"):
+                self.peak[key] = max(self.peak.get(key, 0), self.active[key])
+        time.sleep(0.002)
+        with self.lock:
+            self.active[host] -= 1
+            self.active["*"] -= 1
+        return item
+
+
+class TestFleetExecutor(unittest.TestCase):
+
+    def test_bounded(self):
+        items = [(f"host-{i % 3}", i) for i in range(300)]
+        calls = Concurrency()
+
+        results = FleetExecutor(max_workers=8, max_per_host=2).map(calls, items, host=lambda item: item[0])
+
+        self.assertEqual(items, results)
+        self.assertLessEqual(calls.peak["*"], 6)
+        self.assertLessEqual(len(calls.threads), 8)
+        for host in ("host-0", "host-1", "host-2"):
+            self.assertLessEqual(calls.peak[host], 2)
+
+    def test_generator_backpressure(self):
+        drawn = list()
+
+        def items():
+            for i in range(1000):
+                drawn.append(i)
+                yield i
+
+        def check(i):
+            # Never more than the running and look-ahead items are drawn ahead of those completed.
+            self.assertLess(len(drawn) - i, 10 * 2 + 2)
+            return i * 2
+
+        self.assertEqual([i * 2 for i in range(1000)], FleetExecutor(max_workers=10).map(check, items()))
+
+    def test_stops_on_first_error(self):
+        started = list()
+
+        def work(i):
+            started.append(i)
+            if i == 5:
+                raise ValueError("boom")
+            time.sleep(0.001)
+            return i
+
+        executor = FleetExecutor(max_workers=2)
+        self.assertRaises(ValueError, lambda: executor.map(work, range(1000)))
+        self.assertTrue(executor.cancelled)
+        self.assertLess(len(started), 20)
+
+    def test_progress(self):
+        progress = list()
+
+        FleetExecutor(max_workers=4, on_progress=progress.append).map(lambda i: i, list(range(10)))
+
+        self.assertEqual(10, len(progress))
+        self.assertIsInstance(progress[-1], FleetProgress)
+        self.assertEqual((10, 0, 10), (progress[-1].completed, progress[-1].failed, progress[-1].total))
+        self.assertEqual(0, progress[-1].eta_seconds)
+        self.assertEqual([], FleetExecutor().map(lambda i: i, []))
+
+    def test_nested_executors_share_the_limit(self):
+        limiter = FleetLimiter(max_workers=6)
+        calls = Concurrency()
+
+        def workspace(name):
+            # Each workspace fans out over its users, lending its own slot to them while it waits.
+            users = [(name, i) for i in range(20)]
+            return FleetExecutor(max_workers=8, max_per_host=2, limiter=limiter).map(calls, users, host=lambda user: user[0])
+
+        results = FleetExecutor(max_workers=8, limiter=limiter).map(workspace, [f"host-{i}" for i in range(10)])
+
+        self.assertEqual([[(f"host-{w}", i) for i in range(20)] for w in range(10)], results)
+        self.assertLessEqual(calls.peak["*"], 6)
+        for host in (f"host-{w}" for w in range(10)):
+            self.assertLessEqual(calls.peak[host], 2)
+        self.assertEqual(0, limiter.active)
+
+    def test_nested_executors_do_not_deadlock(self):
+        limiter = FleetLimiter(max_workers=1)
+
+        def nest(depth):
+            if depth == 0:
+                return 1
+            return sum(FleetExecutor(max_workers=4, limiter=limiter).map(nest, [depth - 1] * 3))
+
+        self.assertEqual(27, FleetExecutor(max_workers=4, limiter=limiter).map(nest, [3])[0])
+        self.assertEqual(0, limiter.active)
+
+    def test_host_limit_spans_executors(self):
+        limiter = FleetLimiter(max_workers=32)
+        calls = Concurrency()
+        items = [("host-0", i) for i in range(50)]
+
+        def fan_out(_):
+            return FleetExecutor(max_workers=8, max_per_host=3, limiter=limiter).map(calls, items, host=lambda item: item[0])
+
+        FleetExecutor(max_workers=4, limiter=limiter).map(fan_out, range(4))
+
+        self.assertLessEqual(calls.peak["host-0"], 3)
+
+    def test_concurrent_maps_cancel_independently(self):
+        executor = FleetExecutor(max_workers=4)
+        observed = dict()
+        failed = threading.Event()
+
+        def failing(i):
+            if i == 0:
+                failed.set()
+                raise ValueError("boom")
+            time.sleep(0.01)
+
+        def healthy(i):
+            failed.wait(1)
+            time.sleep(0.02)
+            observed[i] = executor.cancelled
+
+        thread = threading.Thread(target=lambda: self.assertRaises(ValueError, lambda: executor.map(failing, range(4))))
+        thread.start()
+        executor.map(healthy, range(4))
+        thread.join()
+
+        self.assertEqual({0: False, 1: False, 2: False, 3: False}, observed)
+
+
+if __name__ == '__main__':
+    unittest.main()
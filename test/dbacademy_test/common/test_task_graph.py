@@ -0,0 +1,126 @@
+import os
+import json
+import tempfile
+import threading
+import time
+import unittest
+
+from dbacademy.common import TaskGraph, TaskResult
+
+
+class TestTaskGraph(unittest.TestCase):
+
+    def test_dependencies_not_phases(self):
+        events = list()
+        lock = threading.Lock()
+
+        def step(name, seconds):
+            def action():
+                time.sleep(seconds)
+                with lock:
+                    events.append(name)
+                return name
+            return action
+
+        graph = TaskGraph(max_workers=4)
+        slow = graph.add("slow/users", step("slow/users", 0.3))
+        fast = graph.add("fast/users", step("fast/users", 0.0))
+        graph.add("slow/courseware", step("slow/courseware", 0.0), depends_on=[slow])
+        graph.add("fast/courseware", step("fast/courseware", 0.0), depends_on=[fast, None])
+
+        results = graph.run()
+
+        # The fast workspace's second step doesn't wait for the slow workspace's first.
+        self.assertLess(events.index("fast/courseware"), events.index("slow/users"))
+        self.assertLess(events.index("slow/users"), events.index("slow/courseware"))
+        self.assertEqual(["slow/users", "fast/users", "slow/courseware", "fast/courseware"], list(results))
+        self.assertTrue(all(r.status == TaskResult.SUCCEEDED for r in results.values()))
+        self.assertEqual("fast/courseware", results["fast/courseware"].value)
+        self.assertGreaterEqual(results["slow/users"].elapsed_seconds, 0.3)
+
+    def test_failure_skips_dependents_only(self):
+        def fail():
+            raise ValueError("boom")
+
+        graph = TaskGraph()
+        graph.add("a", fail)
+        graph.add("b", lambda: None, depends_on=["a"])
+        graph.add("c", lambda: None, depends_on=["b"])
+        graph.add("d", lambda: None)
+
+        completed = list()
+        graph.on_complete = completed.append
+        results = graph.run()
+
+        self.assertEqual(TaskResult.FAILED, results["a"].status)
+        self.assertIsInstance(results["a"].error, ValueError)
+        self.assertEqual(TaskResult.SKIPPED, results["b"].status)
+        self.assertEqual(TaskResult.SKIPPED, results["c"].status)
+        self.assertEqual(TaskResult.SUCCEEDED, results["d"].status)
+        self.assertEqual(4, len(completed))
+
+    def test_retry(self):
+
+        def failing(failures):
+            attempts = list()
+
+            def action():
+                attempts.append(1)
+                if len(attempts) <= failures:
+                    raise ConnectionError()
+            return action
+
+        graph = TaskGraph(max_attempts=3, retry_delay_seconds=0)
+        graph.add("flaky", failing(2))
+        graph.add("once", failing(1), max_attempts=1)
+
+        results = graph.run()
+
+        self.assertEqual(TaskResult.SUCCEEDED, results["flaky"].status)
+        self.assertEqual(3, results["flaky"].attempts)
+        self.assertEqual(TaskResult.FAILED, results["once"].status)
+        self.assertEqual(1, results["once"].attempts)
+
+    def test_resume(self):
+        runs = list()
+        failing = {"b"}
+
+        def action(key):
+            def run():
+                runs.append(key)
+                if key in failing:
+                    raise Exception(key)
+            return run
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_file = os.path.join(temp_dir, "state.json")
+
+            def build():
+                graph = TaskGraph(state_file=state_file)
+                graph.add("a", action("a"))
+                graph.add("b", action("b"), depends_on=["a"])
+                graph.add("c", action("c"), depends_on=["b"])
+                return graph
+
+            build().run()
+            self.assertEqual(["a", "b"], runs)
+            with open(state_file) as f:
+                self.assertEqual({"succeeded": ["a"]}, json.load(f))
+
+            failing.clear()
+            results = build().run()
+
+            self.assertEqual(["a", "b", "b", "c"], runs)
+            self.assertEqual(TaskResult.RESUMED, results["a"].status)
+            self.assertTrue(results["a"].succeeded)
+
+    def test_invalid(self):
+        graph = TaskGraph()
+        graph.add("a", lambda: None)
+
+        self.assertRaises(ValueError, lambda: graph.add("a", lambda: None))
+        self.assertRaises(ValueError, lambda: graph.add("b", lambda: None, depends_on=["z"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
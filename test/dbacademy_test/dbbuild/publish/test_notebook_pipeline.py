@@ -0,0 +1,111 @@
+import threading
+import unittest
+
+SOURCE = """# Databricks notebook source
+# INCLUDE_HEADER_FALSE
+# INCLUDE_FOOTER_FALSE
+
+# COMMAND ----------
+
+print("setup")
+
+# COMMAND ----------
+
+# ANSWER
+print("answer")
+
+# COMMAND ----------
+
+print("{{course_name}}")
+"""
+
+
+class FakeWorkspace:
+    """Serves a single python notebook, recording the notebooks imported."""
+
+    def __init__(self):
+        self.imported = dict()
+        self.lock = threading.Lock()
+
+    def get_status(self, path):
+        return {"language": "PYTHON", "path": path}
+
+    def export_notebook(self, path):
+        return SOURCE
+
+    def mkdirs(self, path):
+        pass
+
+    def import_notebook(self, language, path, source):
+        with self.lock:
+            self.imported[path] = source
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.fake_workspace = FakeWorkspace()
+
+    def workspace(self):
+        return self.fake_workspace
+
+
+class TestNotebookPipeline(unittest.TestCase):
+
+    @staticmethod
+    def create_notebook(client, include_solution: bool):
+        from dbacademy.dbbuild.build_config_class import BuildConfig
+        from dbacademy.dbbuild.publish.notebook_def_class import NotebookDef
+
+        build_config = BuildConfig(name="Unit Test", version="1.2.3", client=client)
+
+        return NotebookDef(build_config=build_config,
+                           path="Lesson 1",
+                           replacements={"course_name": "Unit Test", "built_on": "today"},
+                           include_solution=include_solution,
+                           test_round=2,
+                           ignored=False,
+                           order=0,
+                           i18n=False,
+                           i18n_language=None,
+                           ignoring=[],
+                           version="1.2.3")
+
+    def test_generate_then_import(self):
+        client = FakeClient()
+        notebook = self.create_notebook(client, include_solution=True)
+
+        language, students_source, solutions_source = notebook.generate(source_dir="/Repos/source",
+                                                                        i18n_resources_dir="/Repos/source/Resources",
+                                                                        debugging=False,
+                                                                        other_notebooks=[notebook])
+
+        self.assertEqual("python", language)
+        self.assertEqual(0, len(notebook.errors), notebook.errors)
+        self.assertEqual({}, client.fake_workspace.imported)  # Generating is free of side effects.
+        self.assertNotIn("print(\"answer\")", students_source)
+        self.assertIn("print(\"answer\")", solutions_source)
+        self.assertIn("print(\"Unit Test\")", students_source)
+        self.assertEqual({"course_name": "Unit Test"}, notebook.replacements_used)  # As recorded in the publishing manifest.
+
+        notebook.import_generated(target_dir="/Repos/target", language=language, students_source=students_source, solutions_source=solutions_source, verbose=False)
+
+        self.assertEqual({"/Repos/target/Lesson 1": students_source,
+                          "/Repos/target/Solutions/Lesson 1": solutions_source}, client.fake_workspace.imported)
+
+    def test_publish_without_solution(self):
+        client = FakeClient()
+        notebook = self.create_notebook(client, include_solution=False)
+
+        notebook.publish(source_dir="/Repos/source",
+                         target_dir="/Repos/target",
+                         i18n_resources_dir="/Repos/source/Resources",
+                         verbose=False,
+                         debugging=False,
+                         other_notebooks=[notebook])
+
+        self.assertEqual(["/Repos/target/Lesson 1"], list(client.fake_workspace.imported))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from dbacademy_test.dbbuild.publish import test_notebook_pipeline
+
+
+class TestNotebookScanning(unittest.TestCase):
+
+    def create_notebook(self, replacements=None):
+        notebook = test_notebook_pipeline.TestNotebookPipeline.create_notebook(test_notebook_pipeline.FakeClient(), include_solution=True)
+        notebook.replacements = replacements or dict()
+        return notebook
+
+    def test_replace_contents(self):
+        notebook = self.create_notebook({"course_name": "Unit Test", "version_number": "1.2.3", "unused": "-"})
+
+        contents = notebook.replace_contents("{{course_name}} v{{version_number}}, {{{course_name}}} & {{course_name}}")
+
+        self.assertEqual("Unit Test v1.2.3, {Unit Test} & Unit Test", contents)
+        self.assertEqual({"course_name": "Unit Test", "version_number": "1.2.3"}, notebook.replacements_used)
+        self.assertEqual([], notebook.errors)
+
+    def test_replace_contents_unresolved(self):
+        notebook = self.create_notebook({"course_name": "Unit Test"})
+
+        contents = notebook.replace_contents("{{course_name}} {{unknown}} :HINT::NOTE:")
+
+        self.assertEqual("Unit Test {{unknown}} :HINT::NOTE:", contents)
+        self.assertEqual(3, len(notebook.errors))
+        self.assertTrue(notebook.errors[0].message.startswith("A mustache pattern was detected after all replacements were processed"))
+        self.assertEqual("The deprecated :HINT: pattern was found after all replacements were processed.", notebook.errors[1].message)
+        self.assertEqual("The deprecated :NOTE: pattern was found after all replacements were processed.", notebook.errors[2].message)
+
+    def test_copyright_and_bdc_tokens(self):
+        from dbacademy.dbbuild.publish.notebook_def_class import StateVariables
+
+        notebook = self.create_notebook()
+        command = "print(\"IPYTHON_ONLY\")  # 2016 Databricks, Inc, 2021 Databricks, Inc, 2019 Databricks, Inc, 2021 Databricks, Inc"
+
+        notebook.update_command(state=StateVariables(), language="python", command=command, i=0, other_notebooks=[notebook], debugging=False)
+
+        self.assertEqual(["Cmd #1 | Found the token \"IPYTHON_ONLY\" ",
+                          "Cmd #1 | Found the token \"PYTHON_ONLY\" ",
+                          "Cmd #1 | Found copyright (2019 Databricks, Inc) ",
+                          "Cmd #1 | Found copyright (2021 Databricks, Inc) "], [e.message for e in notebook.errors])
+
+    def test_get_leading_comments(self):
+        notebook = self.create_notebook()
+
+        command = "# MAGIC %sql\n# MAGIC -- TODO\n# MAGIC --\n# MAGIC -- <FILL_IN>\n# MAGIC SELECT 1\n# MAGIC -- Not leading"
+
+        self.assertEqual(["TODO", "<FILL_IN>"], notebook.get_leading_comments("python", command))
+        self.assertEqual(["TODO"], notebook.parse_directives(0, ["TODO", "<FILL_IN>"]))
+        self.assertEqual(["a", "", "b"], list(notebook.iter_lines("a\n\nb")))
+
+
+if __name__ == '__main__':
+    unittest.main()
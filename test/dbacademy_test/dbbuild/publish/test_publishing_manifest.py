@@ -0,0 +1,68 @@
+import unittest
+
+from dbacademy.dbbuild.publish.publishing_manifest_class import PublishingManifest
+
+
+class TestPublishingManifest(unittest.TestCase):
+
+    @staticmethod
+    def create_manifest(path: str = "/tmp/unused.json") -> PublishingManifest:
+        manifest = PublishingManifest(path)
+        manifest.put("Lesson 1",
+                     inputs=PublishingManifest.fingerprint(include_solution=True, i18n_source=None),
+                     source_modified_at=100,
+                     replacements={"course_name": "Unit Test"},
+                     targets={"/target/Lesson 1": 200, "/target/Solutions/Lesson 1": 201},
+                     warnings=["Some warning"])
+        return manifest
+
+    def test_fingerprint(self):
+        self.assertEqual(PublishingManifest.fingerprint(a=1, b=[1, 2]), PublishingManifest.fingerprint(b=[1, 2], a=1))
+        self.assertNotEqual(PublishingManifest.fingerprint(a=1), PublishingManifest.fingerprint(a=2))
+
+    def test_is_unchanged(self):
+        manifest = self.create_manifest()
+        inputs = PublishingManifest.fingerprint(include_solution=True, i18n_source=None)
+        targets = {"/target/Lesson 1": {"modified_at": 200}, "/target/Solutions/Lesson 1": {"modified_at": 201}}
+        replacements = {"course_name": "Unit Test", "built_on": "today"}
+
+        def is_unchanged(**kwargs):
+            args = dict(inputs=inputs, source_modified_at=100, replacements=replacements, target_objects=targets)
+            args.update(kwargs)
+            return manifest.is_unchanged(args.pop("path", "Lesson 1"), **args)
+
+        # Replacements that the notebook never used, such as built_on here, don't count.
+        self.assertTrue(is_unchanged())
+
+        self.assertFalse(is_unchanged(path="Lesson 2"))
+        self.assertFalse(is_unchanged(source_modified_at=101))
+        self.assertFalse(is_unchanged(source_modified_at=None))
+        self.assertFalse(is_unchanged(inputs=PublishingManifest.fingerprint(include_solution=False, i18n_source=None)))
+        self.assertFalse(is_unchanged(replacements={"course_name": "Renamed"}))
+        self.assertFalse(is_unchanged(target_objects={"/target/Lesson 1": {"modified_at": 200}}))
+        self.assertFalse(is_unchanged(target_objects={"/target/Lesson 1": {"modified_at": 300}, "/target/Solutions/Lesson 1": {"modified_at": 201}}))
+
+    def test_save_and_load(self):
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "Manifests", "Unit Test - v1.2.3.json")
+
+            self.assertEqual(0, len(PublishingManifest.load(path)))
+
+            self.create_manifest(path).save()
+            loaded = PublishingManifest.load(path)
+            self.assertEqual(self.create_manifest().entries, loaded.entries)
+
+            loaded.remove("Lesson 1")
+            loaded.save()
+            self.assertEqual(0, len(PublishingManifest.load(path)))
+
+            with open(path, "w") as f:
+                f.write("{ truncated")
+            self.assertEqual(0, len(PublishingManifest.load(path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import threading
+import unittest
+from unittest import mock
+
+SOURCE = """# Databricks notebook source
+# INCLUDE_HEADER_TRUE
+
+# COMMAND ----------
+
+# DBTITLE 0,--i18n-a1b2
+# MAGIC %md
+# MAGIC Hello
+
+# COMMAND ----------
+
+print("{{version_number}}")
+"""
+
+RESOURCES = {
+    "japanese-v1.2.3": "# /Lesson 1\n<hr>--i18n-a1b2\nKonnichiwa\n",
+    "korean-v1.2.3": "# /Lesson 1\n<hr>--i18n-a1b2\nAnnyeonghaseyo\n",
+}
+
+
+class FakeWorkspace:
+    """Serves the published english notebooks and the resource folders, counting the exports."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.exports = dict()
+        self.imported = dict()
+
+    def __call__(self):
+        return self
+
+    def ls(self, path, recursive=False):
+        if path.endswith("/Resources"):
+            return [{"path": f"{path}/{lang}"} for lang in ["english-v1.2.3"] + list(RESOURCES)]
+        elif path.startswith("/Repos/english"):
+            return [{"path": f"{path}/{p}"} for p in ["Lesson 1", "Solutions/Lesson 1", "Includes/Setup"]]
+        else:
+            return []
+
+    def get_status(self, path):
+        return {"language": "PYTHON", "path": path}
+
+    def export_notebook(self, path):
+        with self.lock:
+            self.exports[path] = self.exports.get(path, 0) + 1
+        return SOURCE
+
+    def mkdirs(self, path):
+        pass
+
+    def import_notebook(self, language, notebook_path, content, overwrite):
+        with self.lock:
+            self.imported[notebook_path] = content
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.workspace = FakeWorkspace()
+
+
+class TestTranslator(unittest.TestCase):
+
+    @staticmethod
+    def create_translator(client):
+        from dbacademy.dbbuild.build_config_class import BuildConfig
+        from dbacademy.dbbuild.publish.publisher_class import Publisher
+        from dbacademy.dbbuild.publish.translator_class import Translator
+
+        build_config = BuildConfig(name="Unit Test", version="1.2.3", client=client, source_repo="/Repos/source")
+        build_config.notebooks = dict()
+
+        return Translator(Publisher(build_config, Publisher.PUBLISHING_MODE_MANUAL), i18n_language="japanese-v1.2.3")
+
+    @staticmethod
+    def prepare(translator):
+        translator.source_dir = "/Repos/english"
+        translator.target_dir = f"/Repos/{translator.common_language}"
+        translator._Translator__changes_in_source_repo = 0
+
+        loads = list()
+
+        def load_i18n_source(path):
+            loads.append(path)
+            return RESOURCES[translator.i18n_language]
+
+        translator._load_i18n_source = load_i18n_source
+        return loads
+
+    def test_generate_all(self):
+        from dbacademy.dbbuild.publish.translator_class import Translator
+
+        client = FakeClient()
+        translator = self.create_translator(client)
+        translators = translator.for_languages(["japanese-v1.2.3", "korean-v1.2.3"])
+        loads = [self.prepare(t) for t in translators]
+
+        with mock.patch("dbacademy.dbgems.get_workspace_url", return_value="https://example.com"):
+            results = Translator.generate_all(translators, max_workers=4)
+
+        self.assertEqual(2, len(results))
+
+        # Each source notebook is exported once for both languages, each resource is parsed once per language.
+        self.assertEqual({"/Repos/english/Lesson 1": 1, "/Repos/english/Solutions/Lesson 1": 1, "/Repos/english/Includes/Setup": 1}, client.workspace.exports)
+        self.assertEqual([["Lesson 1"], ["Lesson 1"]], loads)
+
+        japanese = client.workspace.imported["/Repos/japanese/Solutions/Lesson 1"]
+        self.assertIn("# MAGIC Konnichiwa", japanese)
+        self.assertIn("print(\"1.2.3-JA\")", japanese)
+        self.assertIn("# MAGIC Annyeonghaseyo", client.workspace.imported["/Repos/korean/Lesson 1"])
+        self.assertEqual(SOURCE, client.workspace.imported["/Repos/korean/Includes/Setup"])
+
+    def test_parse_i18n_source(self):
+        from dbacademy.dbbuild.publish.notebook_def_class import NotebookDef
+
+        name, guid_map = NotebookDef.parse_i18n_source("# /Lesson 1\n<hr>--i18n-a1\nOne\n<hr sandbox>--i18n-b2\nTwo\n")
+
+        self.assertEqual("Lesson 1", name)
+        self.assertEqual({"--i18n-a1": "One\n", "--i18n-b2": "Two\n"}, guid_map)
+
+
+if __name__ == '__main__':
+    unittest.main()
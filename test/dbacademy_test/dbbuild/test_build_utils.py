@@ -0,0 +1,76 @@
+import threading
+import unittest
+
+from dbacademy.dbbuild.build_utils_class import BuildUtils
+from dbacademy.dbbuild.digest_cache_class import DigestCache
+
+
+class FakeWorkspace:
+    """Exports every notebook as its own path, counting the exports."""
+
+    def __init__(self):
+        self.exports = list()
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self
+
+    def export_notebook(self, path):
+        with self.lock:
+            self.exports.append(path)
+        return f"# Databricks notebook source\n# {path}"
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.workspace = FakeWorkspace()
+
+
+class TestBuildUtils(unittest.TestCase):
+
+    @staticmethod
+    def index(paths, version):
+        return {p: {"full_path": f"/Workspace/Repos/x{p}", "cache_key": f"{version}:{p}", "digest": None, "size": None} for p in paths}
+
+    def test_load_sources_with_digest_cache(self):
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "digests.json")
+            paths = [f"/Lesson {i}" for i in range(20)]
+
+            def load(version):
+                client = FakeClient()
+                cache = DigestCache.load(cache_path)
+                results = BuildUtils.load_sources(client=client, results=self.index(paths, version), digest_cache=cache, max_workers=4)
+                cache.save()
+                return results, len(client.workspace.exports)
+
+            first, exports = load("v1")
+            self.assertEqual(20, exports)
+            self.assertEqual(len("# Databricks notebook source\n# /Repos/x/Lesson 0"), first["/Lesson 0"]["size"])
+
+            second, exports = load("v1")
+            self.assertEqual(0, exports)
+            self.assertEqual(first, second)
+
+            # A new version is exported again, and saving forgets the entries of the old one.
+            self.assertEqual(20, load("v2")[1])
+            self.assertEqual(20, len(DigestCache.load(cache_path)))
+
+    def test_compare_results(self):
+        def entry(digest, size):
+            return {"digest": digest, "size": size}
+
+        index_a = {"/A": entry("1", 10), "/B": entry("2", 1500), "/C": entry("3", 30)}
+        index_b = {"/A": entry("1", 10), "/B": entry("9", 1200), "/D": entry("4", 40)}
+
+        self.assertEqual(["Notebook deleted: `/C`",
+                          "Notebook added: `/D`",
+                          "Differences:      1,500 vs 1,200: /B"], BuildUtils.compare_results(index_a, index_b))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,248 @@
+import unittest
+
+
+class FileInfo:
+
+    def __init__(self, path: str, size: int, modification_time: int):
+        self.path = path
+        self.name = path.rstrip("/").split("/")[-1]
+        self.size = size
+        self.modificationTime = modification_time
+
+    def isDir(self):
+        return self.path.endswith("/")
+
+
+class FakeFs:
+    """An in-memory DBFS holding files as path -> (size, modification time)."""
+
+    def __init__(self, files):
+        self.files = dict(files)
+        self.calls = {"ls": 0, "put": 0, "head": 0, "rm": 0, "cp": 0}
+
+    def ls(self, path):
+        self.calls["ls"] += 1
+        if path in self.files:
+            return [FileInfo(path, *self.files[path])]  # Listing a file returns just that file.
+        path = path.rstrip("/") + "/"
+        children = dict()
+        for file, (size, mtime) in self.files.items():
+            if file.startswith(path) and file != path:
+                rest = file[len(path):]
+                if "/" in rest:
+                    directory = path + rest.split("/")[0] + "/"
+                    children[directory] = FileInfo(directory, 0, 0)
+                else:
+                    children[file] = FileInfo(file, size, mtime)
+        if len(children) == 0 and not any(f.startswith(path) for f in self.files):
+            raise FileNotFoundError(path)
+        return sorted(children.values(), key=lambda f: f.path)
+
+    def put(self, path, contents, overwrite):
+        self.calls["put"] += 1
+        self.files[path] = (len(contents), 0)
+        self.contents = contents
+
+    def head(self, path, max_bytes):
+        self.calls["head"] += 1
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        return self.contents
+
+    def rm(self, path, recurse):
+        self.calls["rm"] += 1
+        self.files = {f: v for f, v in self.files.items() if not f.startswith(path)}
+
+    def cp(self, source, target, recurse):
+        self.calls["cp"] += 1
+        self.files[target] = (100, 1)
+
+    def mv(self, source, target):
+        self.calls["cp"] += 1  # A move on DBFS is a copy & a delete
+        self.files[target] = self.files.pop(source)
+
+
+class FakeDbutils:
+
+    def __init__(self, fs):
+        self.fs = fs
+
+
+INSTALL_PATH = "dbfs:/mnt/dbacademy-datasets/course/v01"
+
+
+class TestDatasetManager(unittest.TestCase):
+
+    def setUp(self) -> None:
+        from dbacademy import dbgems
+
+        self.dbutils = dbgems.dbutils
+        self.fs = FakeFs({f"{INSTALL_PATH}/archive.zip": (100, 1)})
+        dbgems.dbutils = FakeDbutils(self.fs)
+
+    def tearDown(self) -> None:
+        from dbacademy import dbgems
+
+        dbgems.dbutils = self.dbutils
+
+    @staticmethod
+    def manager():
+        from dbacademy.dbhelper.dataset_manager import DatasetManager
+
+        return DatasetManager(_data_source_uri="wasbs://courseware/course/v01",
+                              _staging_source_uri=None,
+                              _datasets_path=None,
+                              _archives_path=None,
+                              _install_path=INSTALL_PATH,
+                              _install_min_time=None,
+                              _install_max_time=None)
+
+    def test_list_r(self):
+        from dbacademy.dbhelper.dataset_manager import DatasetManager
+
+        for i in range(3):
+            self.fs.files[f"{INSTALL_PATH}/retail/part-{i}.csv"] = (10, 1)
+        self.fs.files[f"{INSTALL_PATH}/retail/nested/part.csv"] = (10, 1)
+
+        self.assertEqual(["/archive.zip", "/retail/", "/retail/nested/", "/retail/nested/part.csv",
+                          "/retail/part-0.csv", "/retail/part-1.csv", "/retail/part-2.csv"],
+                         DatasetManager.list_r(INSTALL_PATH))
+
+    def test_manifest_skips_full_listing(self):
+        manager = self.manager()
+        manager.validate_datasets(fail_fast=True)
+        self.assertEqual(1, self.fs.calls["put"])
+
+        self.fs.calls["ls"] = 0
+        self.manager().validate_datasets(fail_fast=True)
+        self.assertEqual(1, self.fs.calls["ls"])
+        self.assertEqual(1, self.fs.calls["put"])
+
+    def test_changed_file_triggers_full_validation(self):
+        self.manager().validate_datasets(fail_fast=True)
+
+        self.fs.files[f"{INSTALL_PATH}/archive.zip"] = (50, 2)   # Truncated
+        self.fs.files[f"{INSTALL_PATH}/extra.txt"] = (1, 1)
+
+        manager = self.manager()
+        manager.validate_datasets(fail_fast=False)
+
+        # The truncated archive is downloaded again rather than recorded as the new known-good state.
+        self.assertEqual(2, manager.fixes)
+        self.assertNotIn(f"{INSTALL_PATH}/extra.txt", self.fs.files)
+        self.assertEqual((100, 1), self.fs.files[f"{INSTALL_PATH}/archive.zip"])
+
+    def test_interrupted_download_is_repaired(self):
+        self.fs.files["wasbs://courseware/course/v01/archive.zip"] = (100, 1)
+        self.fs.files[f"{INSTALL_PATH}/archive.zip"] = (40, 1)  # No manifest yet
+
+        manager = self.manager()
+        manager.validate_datasets(fail_fast=False)
+
+        self.assertEqual(1, manager.fixes)
+        self.assertEqual((100, 1), self.fs.files[f"{INSTALL_PATH}/archive.zip"])
+
+    def test_changed_file_matching_the_remote_is_kept(self):
+        self.fs.files["wasbs://courseware/course/v01/archive.zip"] = (120, 1)
+        self.fs.files[f"{INSTALL_PATH}/archive.zip"] = (120, 1)
+        self.manager().validate_datasets(fail_fast=True)
+
+        self.fs.files[f"{INSTALL_PATH}/archive.zip"] = (120, 2)  # Touched, but complete
+
+        manager = self.manager()
+        manager.validate_datasets(fail_fast=True)
+
+        self.assertEqual(0, manager.fixes)
+        self.assertEqual(0, self.fs.calls["cp"])
+
+    def test_deep(self):
+        self.manager().validate_datasets(fail_fast=True)
+        self.fs.calls["ls"] = 0
+
+        self.manager().validate_datasets(fail_fast=True, deep=True)
+
+        self.assertEqual(1, self.fs.calls["ls"])  # The full listing of a flat install is a single ls
+        self.assertEqual(2, self.fs.calls["put"])
+
+    def test_download_file(self):
+        from dbacademy.dbhelper.dataset_manager import DatasetManager
+
+        self.fs.files["wasbs://courseware/course/v01/archive.zip"] = (100, 1)
+        DatasetManager.download_file("wasbs://courseware/course/v01/archive.zip", f"{INSTALL_PATH}/copy.zip")
+        self.assertIn(f"{INSTALL_PATH}/copy.zip", self.fs.files)
+        self.assertEqual(1, self.fs.calls["cp"])  # Copied once, never moved
+
+        self.fs.files["wasbs://courseware/course/v01/archive.zip"] = (200, 1)  # The fake copy is always 100 bytes.
+        self.assertRaises(IOError, lambda: DatasetManager.download_file("wasbs://courseware/course/v01/archive.zip", f"{INSTALL_PATH}/short.zip"))
+        self.assertNotIn(f"{INSTALL_PATH}/short.zip", self.fs.files)
+
+    def test_extract_archive(self):
+        import os
+        import tempfile
+        import zipfile
+        from dbacademy.dbhelper.dataset_manager import DatasetManager
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive_path = os.path.join(temp_dir, "archive.zip")
+            target_dir = os.path.join(temp_dir, "datasets")
+            with zipfile.ZipFile(archive_path, "w") as archive:
+                for i in range(20):
+                    archive.writestr(f"retail/part-{i}.csv", f"row,{i}\n" * (i + 1))
+                archive.writestr("readme.md", "# Retail")
+
+            members = DatasetManager.extract_archive(archive_path, target_dir, max_workers=4)
+
+            self.assertEqual(21, len(members))
+            with open(os.path.join(target_dir, "retail", "part-3.csv")) as f:
+                self.assertEqual("row,3\n" * 4, f.read())
+
+            # Resume after damage: only the damaged member is extracted again.
+            with open(os.path.join(target_dir, "retail", "part-3.csv"), "w") as f:
+                f.write("row,X\n" * 4)
+            modified = os.path.getmtime(os.path.join(target_dir, "readme.md"))
+
+            DatasetManager.extract_archive(archive_path, target_dir, max_workers=4)
+
+            with open(os.path.join(target_dir, "retail", "part-3.csv")) as f:
+                self.assertEqual("row,3\n" * 4, f.read())
+            self.assertEqual(modified, os.path.getmtime(os.path.join(target_dir, "readme.md")))
+
+    def test_unpack_archive_per_user(self):
+        import os
+        import shutil
+        import tempfile
+        import zipfile
+        from dbacademy.dbhelper.dataset_manager import DatasetManager
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archives_path = os.path.join(temp_dir, "archives")
+            os.makedirs(archives_path)
+            with zipfile.ZipFile(os.path.join(archives_path, "archive.zip"), "w") as archive:
+                archive.writestr("retail/part-0.csv", "row,0\n")
+
+            def manager(user: str) -> DatasetManager:
+                return DatasetManager(_data_source_uri="wasbs://courseware/course/v01",
+                                      _staging_source_uri=None,
+                                      _datasets_path=os.path.join(temp_dir, user, "datasets"),
+                                      _archives_path=archives_path,
+                                      _install_path=archives_path,
+                                      _install_min_time=None,
+                                      _install_max_time=None)
+
+            first, second = manager("first"), manager("second")
+            extracted = {m: os.path.join(m.datasets_path, "retail", "part-0.csv") for m in (first, second)}
+
+            # Both users share the archive, each unpacks it into their own datasets path.
+            first.unpack_archive()
+            second.unpack_archive()
+            self.assertTrue(os.path.isfile(extracted[first]))
+            self.assertTrue(os.path.isfile(extracted[second]))
+
+            # Once a user's datasets are reset, as by the WorkspaceCleaner, they are unpacked again.
+            self.fs.rm(first.datasets_path, True)
+            shutil.rmtree(first.datasets_path)
+            first.unpack_archive()
+            self.assertTrue(os.path.isfile(extracted[first]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import base64
+import json
+import unittest
+from threading import Thread, Lock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DBC = b"PK\x03\x04 not really a zip"
+
+
+class CoursewareHandler(BaseHTTPRequestHandler):
+    """Serves the courseware download and the workspace endpoints, in which one user already has the course."""
+
+    lock = Lock()
+    downloads = 0
+    imports = dict()
+
+    @classmethod
+    def reset(cls):
+        cls.downloads = 0
+        cls.imports = dict()
+
+    def reply(self, status, body=b"{}"):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # noinspection PyPep8Naming
+    def do_GET(self):
+        if self.path.startswith("/download.dbc"):
+            with CoursewareHandler.lock:
+                CoursewareHandler.downloads += 1
+            if "missing-course" in self.path:
+                self.reply(404, b"Not Found")
+            else:
+                self.reply(200, DBC)
+        elif "/workspace/list" in self.path and "installed%40example.com" in self.path:
+            self.reply(200, json.dumps({"objects": [{"path": "/Users/installed@example.com/example-course/Lesson 1"}]}).encode())
+        else:
+            self.reply(404, json.dumps({"error_code": "RESOURCE_DOES_NOT_EXIST"}).encode())
+
+    # noinspection PyPep8Naming
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        if self.path.endswith("/workspace/import"):
+            if "failing" in body["path"]:
+                return self.reply(400, json.dumps({"error_code": "INVALID_PARAMETER_VALUE", "message": "Nope"}).encode())
+            with CoursewareHandler.lock:
+                CoursewareHandler.imports[body["path"]] = base64.b64decode(body["content"])
+
+        self.reply(200)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestWorkspaceHelper(unittest.TestCase):
+
+    def setUp(self):
+        CoursewareHandler.reset()
+        self.server = ThreadingHTTPServer(("localhost", 0), CoursewareHandler)
+        Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def endpoint(self):
+        return f"http://localhost:{self.server.server_port}"
+
+    def workspace_helper(self):
+        from dbacademy.clients.databricks import DBAcademyRestClient
+        from dbacademy.dbhelper.supporting.workspace_helper import WorkspaceHelper
+
+        client = DBAcademyRestClient(token="token", endpoint=self.endpoint, username=None, password=None, authorization_header=None,
+                                     client=None, verbose=False, throttle_seconds=0, error_handler=None)
+        client.rate_limiter = None
+        return WorkspaceHelper(client)
+
+    def test_install_courseware(self):
+        students = [f"student-{i}@example.com" for i in range(20)]
+        usernames = students + ["installed@example.com"]
+
+        report = self.workspace_helper().install_courseware(f"{self.endpoint}/download.dbc?course=example-course&token=secret", None, usernames=usernames, max_workers=8)
+
+        # Downloaded once, imported for every student & skipped for the user who had it.
+        self.assertEqual(1, CoursewareHandler.downloads)
+        self.assertEqual({f"/Users/{s}/example-course": DBC for s in students}, CoursewareHandler.imports)
+        self.assertEqual({"/Users/installed@example.com/example-course": "Skipped"}, report["installed@example.com"])
+        self.assertEqual({"Installed"}, {status for s in students for status in report[s].values()})
+
+    def test_install_courseware_failures(self):
+        students = [f"student-{i}@example.com" for i in range(5)]
+        courses = [("example-course", f"{self.endpoint}/download.dbc?course=example-course"),
+                   ("missing-course", f"{self.endpoint}/download.dbc?course=missing-course")]
+
+        with self.assertRaises(Exception) as context:
+            self.workspace_helper().install_courses(courses, "Courses", students + ["failing@example.com"], max_workers=4)
+
+        # Every other install was attempted first and the course that could not be downloaded was only downloaded once.
+        self.assertEqual(2, CoursewareHandler.downloads)
+        self.assertEqual({f"/Users/{s}/Courses/example-course": DBC for s in students}, CoursewareHandler.imports)
+        self.assertIn("Failed to install 7 of 12 courses", str(context.exception))
+        self.assertIn("/Users/failing@example.com/Courses/example-course: Failed: ", str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()